@@ -0,0 +1,57 @@
+'''
+Helpers for building, deploying and calling the Akita Inu contracts. The helpers live in
+submodules that are imported the first time one of their names is used, so importing the package
+or a single helper doesn't load algosdk, PyTeal or the other helpers until they are needed.
+
+    accounts      balances, account snapshots and app state
+    compilation   TEAL generation, compilation and build artifacts
+    registry      compiled programs, schemas and LogicSigAccounts loaded once per process
+    transactions  signed transaction builders and confirmation tracking
+    client        keep-alive algod client and developer config
+    params        cached suggested params
+'''
+import importlib
+
+# public name -> submodule defining it
+_EXPORTS = {}
+for _module, _names in {
+    'accounts': ['BALANCE_PER_ASSET', 'get_application_address', 'get_account_snapshot', 'get_asset_balance',
+                 'is_opted_into_asset', 'get_algo_balance', 'AccountSnapshot', 'AccountSnapshotCache',
+                 'get_min_algo_balance', 'generate_new_account', 'read_local_state', 'decode_local_state',
+                 'decode_global_state', 'read_global_state', 'read_app_global_state', 'pretty_print_state', 'get_key_from_state'],
+    'compilation': ['COMPILE_CACHE_DIR', 'check_build_dir', 'teal_version', 'algod_compiler_version',
+                    'compile_cache_path', 'compile_program', 'generate_teal', 'dump_teal_assembly',
+                    'load_compiled', 'write_schema', 'load_schema'],
+    'transactions': ['delete_all_apps', 'asset_id_from_create_txn', 'check_pending_txn',
+                     'wait_for_txn_confirmation', 'ConfirmationTracker', 'wait_for_txn_confirmations', 'sign_txn', 'send_transactions',
+                     'create_app_signed_txn', 'update_app_signed_txn', 'opt_in_app_signed_txn',
+                     'opt_in_asset_signed_txn', 'noop_app_signed_txn', 'close_out_app_signed_txn',
+                     'clear_state_out_app_signed_txn', 'delete_app_signed_txn', 'create_asa_signed_txn',
+                     'payment_signed_txn'],
+    'client': ['PooledAlgodClient', 'load_developer_config', 'get_algod_client'],
+    'params': ['SuggestedParamsProvider', 'suggested_params_provider', 'get_suggested_params', 'resolve_params'],
+    'assembler': ['assemble', 'TealAssemblyError'],
+    'registry': ['ProgramRegistry', 'program_registry', 'load_logic_sig'],
+}.items():
+    _EXPORTS.update(dict.fromkeys(_names, _module))
+del _module, _names
+
+_SUBMODULES = {'accounts', 'aio', 'artifacts', 'assembler', 'client', 'compilation', 'evaluator', 'params',
+               'payouts', 'registry', 'signing', 'templates', 'transactions'}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module('.' + _EXPORTS[name], __name__), name)
+    elif name in _SUBMODULES:
+        value = importlib.import_module('.' + name, __name__)
+    else:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS) | _SUBMODULES)
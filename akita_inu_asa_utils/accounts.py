@@ -0,0 +1,259 @@
+'''
+Account and application state helpers: balances and opt-ins read from indexed account
+snapshots, cached per round by AccountSnapshotCache, and decoding of app local and global state.
+'''
+import base64
+import time
+from functools import cached_property
+
+from algosdk import account, encoding, mnemonic
+
+from .params import ROUND_SECONDS
+
+BALANCE_PER_ASSET = 100000
+
+
+def get_application_address(app_id):
+    return encoding.encode_address(encoding.checksum(b'appID' + app_id.to_bytes(8, 'big')))
+
+
+def get_account_snapshot(client, public_key):
+    """
+        Returns an indexed view of an account, served from the cache if client is an AccountSnapshotCache
+            Args:
+                client (AlgodClient): algod client or AccountSnapshotCache
+                public_key (str): public key of the account
+            Returns:
+                AccountSnapshot: indexed account information
+    """
+    if isinstance(client, AccountSnapshotCache):
+        return client.snapshot(public_key)
+    return AccountSnapshot(client.account_info(public_key))
+
+
+def get_asset_balance(client, public_key, asset_id):
+    asset = get_account_snapshot(client, public_key).assets.get(asset_id)
+    if asset is None:
+        return 0
+    return asset['amount']
+
+
+def is_opted_into_asset(client, public_key, asset_id):
+    return asset_id in get_account_snapshot(client, public_key).assets
+
+
+def get_algo_balance(client, public_key):
+    return get_account_snapshot(client, public_key).amount
+
+
+class AccountSnapshot:
+    """
+        Indexed view over a single account_info payload. The asset, local state and created app
+        indexes are dicts keyed by id, each built once per payload the first time it is used.
+            Args:
+                account_info (dict): account information as returned by algod
+    """
+
+    def __init__(self, account_info):
+        self.info = account_info
+        self.address = account_info.get('address')
+        self.round = account_info.get('round', 0)
+        self.amount = account_info.get('amount', 0)
+
+    @cached_property
+    def assets(self):
+        return {asset['asset-id']: asset for asset in self.info.get('assets', [])}
+
+    @cached_property
+    def local_states(self):
+        return {app['id']: app for app in self.info.get('apps-local-state', [])}
+
+    @cached_property
+    def created_apps(self):
+        return {app['id']: app for app in self.info.get('created-apps', [])}
+
+
+class AccountSnapshotCache:
+    """
+        Wraps an algod client so account_info is fetched at most once per address per round, and
+        application_info (decoded by read_app_global_state) at most once per app per round.
+        Anything that takes a client (get_asset_balance, read_global_state, ...) can be given
+        the cache instead; every other client call is passed straight through. Rounds seen in
+        account_info, status and status_after_block responses invalidate older entries. When no
+        round has been seen for round_seconds, the next read looks it up with status, since
+        application_info responses don't carry one.
+            Args:
+                client (AlgodClient): client used to fetch account information
+                round_seconds (float): expected block time, how long an observed round is trusted
+    """
+
+    def __init__(self, client, round_seconds=ROUND_SECONDS):
+        self.client = client
+        self.round = 0
+        self.round_seconds = round_seconds
+        self._round_seen_at = None
+        self._snapshots = {}
+        self._app_states = {}
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+    def observe_round(self, round_number):
+        """
+            Records that the network has reached round_number, dropping older snapshots
+                Args:
+                    round_number (int): last round known to be committed
+        """
+        self._round_seen_at = time.monotonic()
+        if round_number > self.round:
+            self.round = round_number
+            self._snapshots = {address: snapshot for address, snapshot in self._snapshots.items()
+                               if snapshot.round >= round_number}
+            self._app_states = {}
+
+    def invalidate(self, address=None):
+        if address is None:
+            self._snapshots = {}
+            self._app_states = {}
+        else:
+            self._snapshots.pop(address, None)
+
+    def snapshot(self, address):
+        """
+            Returns the AccountSnapshot of address for the current round, fetching it if needed
+                Args:
+                    address (str): public key of the account
+                Returns:
+                    AccountSnapshot: indexed account information
+        """
+        snapshot = self._snapshots.get(address)
+        if snapshot is not None:
+            self._check_round()
+            snapshot = self._snapshots.get(address)
+        if snapshot is None or snapshot.round < self.round:
+            snapshot = AccountSnapshot(self.client.account_info(address))
+            self.observe_round(snapshot.round)
+            self._snapshots[address] = snapshot
+        return snapshot
+
+    def app_global_state(self, app_id):
+        """
+            Returns the decoded global state of app_id for the current round, fetching it if needed
+                Args:
+                    app_id (int): id of application
+                Returns:
+                    dict: global state keyed by decoded key name
+        """
+        self._check_round()
+        cached = self._app_states.get(app_id)
+        if cached is None or cached[0] < self.round:
+            app_info = self.client.application_info(app_id)
+            cached = (self.round, decode_global_state(app_info['params'].get('global-state', [])))
+            self._app_states[app_id] = cached
+        return dict(cached[1])
+
+    def _check_round(self):
+        # entries are tagged with the last round seen, which may be long gone
+        if self._round_seen_at is None or time.monotonic() - self._round_seen_at >= self.round_seconds:
+            self.status()
+
+    def account_info(self, address, **kwargs):
+        if kwargs:
+            return self.client.account_info(address, **kwargs)
+        return self.snapshot(address).info
+
+    def status(self, **kwargs):
+        status = self.client.status(**kwargs)
+        self.observe_round(status['last-round'])
+        return status
+
+    def status_after_block(self, block_num, **kwargs):
+        status = self.client.status_after_block(block_num, **kwargs)
+        self.observe_round(status['last-round'])
+        return status
+
+
+def get_min_algo_balance(number_assets):
+    return BALANCE_PER_ASSET + BALANCE_PER_ASSET * number_assets
+
+
+def generate_new_account():
+    private_key, address = account.generate_account()
+    return mnemonic.from_private_key(private_key), private_key, address
+
+
+# read user local state
+def read_local_state(client, addr, app_id):
+    return decode_local_state(get_account_snapshot(client, addr).local_states.get(app_id))
+
+
+def decode_local_state(local_state):
+    """
+        Decodes one apps-local-state entry of an account, byte values are left base64 encoded
+            Args:
+                local_state (dict): the app's entry, or None if the account isn't opted in
+            Returns:
+                dict: local state keyed by decoded key name, None if there is none
+    """
+    if local_state is None or 'key-value' not in local_state:
+        return None
+    output = {}
+    for key_value in local_state['key-value']:
+        if key_value['value']['type'] == 1:
+            value = key_value['value']['bytes']
+        else:
+            value = key_value['value']['uint']
+        output[base64.b64decode(key_value['key']).decode()] = value
+    return output
+
+
+def decode_global_state(global_state):
+    output = {}
+    for key_value in global_state:
+        if key_value['value']['type'] == 1:
+            value = base64.b64decode(key_value['value']['bytes'])
+        else:
+            value = key_value['value']['uint']
+        output[base64.b64decode(key_value['key']).decode()] = value
+    return output
+
+
+# read app global state
+def read_global_state(client, addr, app_id):
+    app = get_account_snapshot(client, addr).created_apps.get(app_id)
+    if app is None:
+        return None
+    return decode_global_state(app['params']['global-state'])
+
+
+def read_app_global_state(client, app_id):
+    """
+        Reads an application's global state through algod's application endpoint, without
+        fetching the creator's account. Cached per app and round when client is an AccountSnapshotCache
+            Args:
+                client (AlgodClient): algod client or AccountSnapshotCache
+                app_id (int): id of application
+            Returns:
+                dict: global state keyed by decoded key name
+    """
+    if isinstance(client, AccountSnapshotCache):
+        return client.app_global_state(app_id)
+    app_info = client.application_info(app_id)
+    return decode_global_state(app_info['params'].get('global-state', []))
+
+
+def pretty_print_state(state):
+    for keyvalue in state:
+        print(base64.b64decode(keyvalue['key']))
+        print(keyvalue['value'])
+    print("\n\n\n")
+
+
+def get_key_from_state(state, key):
+    for i in range(0, len(state)):
+        found_key = base64.b64decode(state[i]['key'])
+        if found_key == key:
+            if state[i]['value']['type'] == 1:
+                return base64.b64decode(state[i]['value']['bytes'])
+            elif state[i]['value']['type'] == 2:
+                return state[i]['value']['uint']
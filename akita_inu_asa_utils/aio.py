@@ -0,0 +1,290 @@
+'''
+Asyncio variants of the algod helpers in akita_inu_asa_utils. All requests of an AsyncAlgodClient
+go through one pooled aiohttp session, so a single event loop can drive many concurrent
+swap/faucet flows without a thread per in-flight request.
+'''
+import asyncio
+import base64
+import json
+import logging
+from urllib import parse
+
+import aiohttp
+from algosdk import constants, encoding, error
+from algosdk.future import transaction
+
+from akita_inu_asa_utils import AccountSnapshot, check_pending_txn, decode_global_state, decode_local_state
+
+API_VERSION_PATH_PREFIX = "/v2"
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncAlgodClient:
+    """
+        Async counterpart of algod.AlgodClient covering the endpoints used by the helpers
+            Args:
+                algod_token (str): algod API token
+                algod_address (str): algod address, e.g. http://localhost:4001
+                headers (dict): extra headers sent with every request
+                pool_size (int): maximum number of pooled keep-alive connections
+                timeout (float): total timeout in seconds of a single request
+    """
+
+    def __init__(self, algod_token, algod_address, headers=None, pool_size=100, timeout=30):
+        self.algod_token = algod_token
+        self.algod_address = algod_address.rstrip('/')
+        self.headers = headers
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    @property
+    def session(self):
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size),
+                timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return self._session
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def algod_request(self, method, requrl, params=None, data=None, headers=None, response_format="json"):
+        header = {"User-Agent": "py-algorand-sdk"}
+        if self.headers:
+            header.update(self.headers)
+        if headers:
+            header.update(headers)
+        if requrl not in constants.no_auth:
+            header[constants.algod_auth_header] = self.algod_token
+        if requrl not in constants.unversioned_paths:
+            requrl = API_VERSION_PATH_PREFIX + requrl
+        if params:
+            requrl = requrl + "?" + parse.urlencode(params)
+
+        async with self.session.request(method, self.algod_address + requrl, headers=header, data=data) as resp:
+            body = await resp.read()
+        if resp.status >= 400:
+            message = body.decode("utf-8")
+            try:
+                message = json.loads(message)["message"]
+            except Exception:
+                pass
+            raise error.AlgodHTTPError(message, resp.status)
+        if response_format == "json":
+            try:
+                return json.loads(body)
+            except Exception as e:
+                raise error.AlgodResponseError("Failed to parse JSON response from algod") from e
+        return body
+
+    async def status(self):
+        return await self.algod_request("GET", "/status")
+
+    async def status_after_block(self, block_num):
+        return await self.algod_request("GET", "/status/wait-for-block-after/" + str(block_num))
+
+    async def account_info(self, address):
+        return await self.algod_request("GET", "/accounts/" + address)
+
+    async def application_info(self, application_id):
+        return await self.algod_request("GET", "/applications/" + str(application_id))
+
+    async def pending_transaction_info(self, transaction_id):
+        return await self.algod_request("GET", "/transactions/pending/" + transaction_id, params={"format": "json"})
+
+    async def suggested_params(self):
+        res = await self.algod_request("GET", "/transactions/params")
+        return transaction.SuggestedParams(res["fee"],
+                                           res["last-round"],
+                                           res["last-round"] + 1000,
+                                           res["genesis-hash"],
+                                           res["genesis-id"],
+                                           False,
+                                           res["consensus-version"],
+                                           res["min-fee"])
+
+    async def compile(self, source):
+        return await self.algod_request("POST", "/teal/compile",
+                                        data=source.encode("utf-8"),
+                                        headers={"Content-Type": "application/x-binary"})
+
+    async def send_raw_transaction(self, txn):
+        res = await self.algod_request("POST", "/transactions",
+                                       data=base64.b64decode(txn),
+                                       headers={"Content-Type": "application/x-binary"})
+        return res["txId"]
+
+    async def send_transactions(self, txns):
+        serialized = b"".join(base64.b64decode(encoding.msgpack_encode(txn)) for txn in txns)
+        return await self.send_raw_transaction(base64.b64encode(serialized))
+
+
+async def get_account_snapshot(client, public_key):
+    return AccountSnapshot(await client.account_info(public_key))
+
+
+async def get_asset_balance(client, public_key, asset_id):
+    asset = (await get_account_snapshot(client, public_key)).assets.get(asset_id)
+    if asset is None:
+        return 0
+    return asset['amount']
+
+
+async def is_opted_into_asset(client, public_key, asset_id):
+    return asset_id in (await get_account_snapshot(client, public_key)).assets
+
+
+async def get_algo_balance(client, public_key):
+    return (await get_account_snapshot(client, public_key)).amount
+
+
+async def read_local_state(client, addr, app_id):
+    return decode_local_state((await get_account_snapshot(client, addr)).local_states.get(app_id))
+
+
+async def read_global_state(client, addr, app_id):
+    app = (await get_account_snapshot(client, addr)).created_apps.get(app_id)
+    if app is None:
+        return None
+    return decode_global_state(app['params']['global-state'])
+
+
+async def read_app_global_state(client, app_id):
+    app_info = await client.application_info(app_id)
+    return decode_global_state(app_info['params'].get('global-state', []))
+
+
+async def compile_program(client, source_code):
+    compile_response = await client.compile(source_code)
+    return base64.b64decode(compile_response['result'])
+
+
+async def wait_for_txn_confirmation(client, transaction_id, timeout):
+    """
+    Wait until the transaction is confirmed or rejected, or until 'timeout'
+    number of rounds have passed.
+    Args:
+        transaction_id (str): the transaction to wait for
+        timeout (int): maximum number of rounds to wait
+    Returns:
+        dict: pending transaction information, or throws an error if the transaction
+            is not confirmed or rejected in the next timeout rounds
+    """
+    start_round = (await client.status())["last-round"] + 1
+    current_round = start_round
+
+    while current_round < start_round + timeout:
+        try:
+            pending_txn = await client.pending_transaction_info(transaction_id)
+        except Exception:
+            return
+        if check_pending_txn(pending_txn) is not None:
+            return pending_txn
+        await client.status_after_block(current_round)
+        current_round += 1
+    raise Exception(
+        'pending tx not found in timeout rounds, timeout value = : {}'.format(timeout))
+
+
+class AsyncConfirmationTracker:
+    """
+        Async counterpart of ConfirmationTracker: any number of coroutines can await confirm()
+        while a single task checks the outstanding transactions and waits for each new round.
+            Args:
+                client (AsyncAlgodClient): algod client
+                timeout (int): default maximum number of rounds to wait per transaction
+    """
+
+    def __init__(self, client, timeout=5):
+        self.client = client
+        self.timeout = timeout
+        self.round = None
+        self._pending = {}
+        self._task = None
+
+    async def confirm(self, transaction_id, timeout=None):
+        """
+            Waits for a submitted transaction alongside every other tracked transaction
+                Args:
+                    transaction_id (str): the transaction to wait for
+                    timeout (int): maximum number of rounds to wait, defaults to the tracker's timeout
+                Returns:
+                    dict: pending transaction information
+        """
+        entry = self._pending.get(transaction_id)
+        if entry is None:
+            entry = [asyncio.get_running_loop().create_future(), self.timeout if timeout is None else timeout]
+            self._pending[transaction_id] = entry
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+        return await asyncio.shield(entry[0])
+
+    async def _run(self):
+        try:
+            while self._pending:
+                await asyncio.gather(*[self._check(transaction_id, entry)
+                                       for transaction_id, entry in list(self._pending.items())])
+                if self._pending:
+                    if self.round is None:
+                        self.round = (await self.client.status())["last-round"]
+                    self.round = (await self.client.status_after_block(self.round))["last-round"]
+        except Exception as e:
+            for transaction_id in list(self._pending):
+                self._resolve(transaction_id, exception=e)
+
+    async def _check(self, transaction_id, entry):
+        try:
+            pending_txn = await self.client.pending_transaction_info(transaction_id)
+        except Exception as e:
+            # as in ConfirmationTracker, a failed lookup only uses up the round
+            logger.warning("pending transaction lookup of %s failed: %s", transaction_id, e)
+            pending_txn = {}
+        try:
+            result = check_pending_txn(pending_txn)
+        except Exception as e:
+            self._resolve(transaction_id, exception=e)
+            return
+        if result is not None:
+            self._resolve(transaction_id, result=result)
+        else:
+            entry[1] -= 1
+            if entry[1] <= 0:
+                self._resolve(transaction_id, exception=Exception(
+                    'pending tx not found in timeout rounds, txid = : {}'.format(transaction_id)))
+
+    def _resolve(self, transaction_id, result=None, exception=None):
+        future = self._pending.pop(transaction_id)[0]
+        if future.done():
+            return
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
+
+
+async def send_transactions(client, transactions, tracker=None):
+    """
+        Sends a group of signed transactions and waits for its confirmation
+            Args:
+                client (AsyncAlgodClient): algod client
+                transactions (list): signed transactions
+                tracker (AsyncConfirmationTracker): shared tracker to wait with, if any
+            Returns:
+                str: id of the first transaction
+    """
+    transaction_id = await client.send_transactions(transactions)
+    if tracker is None:
+        await wait_for_txn_confirmation(client, transaction_id, 5)
+    else:
+        await tracker.confirm(transaction_id)
+    return transaction_id
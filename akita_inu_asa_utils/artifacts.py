@@ -0,0 +1,194 @@
+'''
+Build artifacts. Compiled programs are stored as raw bytecode in build/<name>.bin and described
+by build/manifest.json (file, size, sha256 and TEAL version of each program, and the app schemas),
+so loading a program is a memory-mapped read checked against the manifest instead of unpickling.
+
+Builds from before the manifest stored joblib pickles in build/<name>.compiled. Those are never
+unpickled when loading a program; migrate them once with
+
+    python -m akita_inu_asa_utils.artifacts [BUILD_DIR ...] [--remove]
+'''
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import sys
+import threading
+
+BUILD_DIR = 'build'
+MANIFEST = 'manifest.json'
+MANIFEST_FORMAT = 1
+PROGRAM_SUFFIX = '.bin'
+LEGACY_SUFFIX = '.compiled'
+SCHEMA_FILES = ('globalSchema', 'localSchema')
+
+_manifest_lock = threading.Lock()
+
+
+class ArtifactError(Exception):
+    pass
+
+
+def artifact_name(file_path):
+    """
+        Name of the artifact stored as file_path, e.g. approval for approval.bin or approval.compiled
+    """
+    name, suffix = os.path.splitext(file_path)
+    return name if suffix in (PROGRAM_SUFFIX, LEGACY_SUFFIX) else file_path
+
+
+def read_manifest(build_dir=BUILD_DIR):
+    """
+        Returns:
+            dict: manifest of build_dir, empty if it has none yet
+    """
+    try:
+        with open(os.path.join(build_dir, MANIFEST)) as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        manifest = {}
+    if manifest.get('format', MANIFEST_FORMAT) > MANIFEST_FORMAT:
+        raise ArtifactError("manifest format {} is newer than this version supports".format(manifest['format']))
+    manifest['format'] = MANIFEST_FORMAT
+    manifest.setdefault('programs', {})
+    manifest.setdefault('schemas', {})
+    return manifest
+
+
+def _replace(path, data):
+    temp_path = path + '.' + str(os.getpid()) + '.' + str(threading.get_ident()) + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+    os.replace(temp_path, path)
+
+
+def update_manifest(section, name, entry, build_dir=BUILD_DIR):
+    with _manifest_lock:
+        manifest = read_manifest(build_dir)
+        manifest[section][name] = entry
+        _replace(os.path.join(build_dir, MANIFEST),
+                 (json.dumps(manifest, indent=2, sort_keys=True) + '\n').encode())
+
+
+def write_program(name, bytecode, build_dir=BUILD_DIR):
+    """
+        Stores bytecode as build_dir/<name>.bin and records it in the manifest
+            Args:
+                name (str): artifact name, e.g. asa_faucet_approval
+                bytecode (bytes): compiled program
+                build_dir (str): build directory
+    """
+    os.makedirs(build_dir, exist_ok=True)
+    file_name = name + PROGRAM_SUFFIX
+    _replace(os.path.join(build_dir, file_name), bytecode)
+    update_manifest('programs', name, {
+        'file': file_name,
+        'size': len(bytecode),
+        'sha256': hashlib.sha256(bytecode).hexdigest(),
+        # the bytecode starts with its TEAL version
+        'teal_version': bytecode[0] if bytecode else 0,
+    }, build_dir)
+
+
+def read_program(name, build_dir=BUILD_DIR):
+    """
+        Loads a program stored by write_program
+            Args:
+                name (str): artifact name
+                build_dir (str): build directory
+            Returns:
+                bytes: compiled program
+    """
+    entry = read_manifest(build_dir)['programs'].get(name)
+    if entry is None:
+        if os.path.exists(os.path.join(build_dir, name + LEGACY_SUFFIX)):
+            raise ArtifactError("{} is a legacy joblib artifact, migrate it with python -m "
+                                "akita_inu_asa_utils.artifacts {}".format(name + LEGACY_SUFFIX, build_dir))
+        raise ArtifactError("no build artifact named " + name + " in " + build_dir)
+    path = os.path.join(build_dir, entry['file'])
+    if entry['size'] == 0:
+        # empty files can't be mapped
+        bytecode = b''
+    else:
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if len(mapped) != entry['size'] or hashlib.sha256(mapped).hexdigest() != entry['sha256']:
+                raise ArtifactError(path + " does not match its manifest entry, rebuild the contract")
+            bytecode = mapped[:]
+    return bytecode
+
+
+def write_schema(name, num_ints, num_bytes, build_dir=BUILD_DIR):
+    """
+        Writes a state schema to build_dir/<name> as before and records it in the manifest
+    """
+    os.makedirs(build_dir, exist_ok=True)
+    schema = {"num_ints": num_ints, "num_bytes": num_bytes}
+    with open(os.path.join(build_dir, name), 'w') as f:
+        json.dump(schema, f)
+    update_manifest('schemas', name, schema, build_dir)
+
+
+def read_schema(name, build_dir=BUILD_DIR):
+    """
+        Returns:
+            dict: num_ints and num_bytes of the schema, from the manifest or the schema file
+    """
+    schema = read_manifest(build_dir)['schemas'].get(name)
+    if schema is None:
+        with open(os.path.join(build_dir, name)) as f:
+            schema = json.load(f)
+    return schema
+
+
+def migrate_program(name, build_dir=BUILD_DIR, remove=False):
+    """
+        Converts the joblib pickle build_dir/<name>.compiled to a .bin artifact
+            Args:
+                remove (bool): delete the pickle once migrated
+            Returns:
+                bytes: compiled program
+    """
+    # only needed for artifacts from before the manifest
+    from joblib import load
+    legacy_path = os.path.join(build_dir, name + LEGACY_SUFFIX)
+    bytecode = load(legacy_path)
+    if not isinstance(bytecode, bytes):
+        raise ArtifactError(legacy_path + " does not hold compiled bytecode")
+    write_program(name, bytecode, build_dir)
+    if remove:
+        os.remove(legacy_path)
+    return bytecode
+
+
+def migrate_build_dir(build_dir=BUILD_DIR, remove=False):
+    """
+        Migrates every legacy .compiled artifact and schema file of build_dir to the manifest
+            Returns:
+                list<str>: names of the migrated programs
+    """
+    migrated = []
+    for file_name in sorted(os.listdir(build_dir)):
+        if file_name.endswith(LEGACY_SUFFIX):
+            migrate_program(artifact_name(file_name), build_dir, remove)
+            migrated.append(artifact_name(file_name))
+    for name in SCHEMA_FILES:
+        path = os.path.join(build_dir, name)
+        if os.path.exists(path):
+            with open(path) as f:
+                update_manifest('schemas', name, json.load(f), build_dir)
+    return migrated
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Migrate joblib .compiled build artifacts to .bin and a manifest")
+    parser.add_argument('build_dirs', nargs='*', default=[BUILD_DIR], help="build directories to migrate")
+    parser.add_argument('--remove', action='store_true', help="delete the .compiled files once migrated")
+    args = parser.parse_args(argv)
+    for build_dir in args.build_dirs:
+        for name in migrate_build_dir(build_dir, args.remove):
+            print("migrated " + os.path.join(build_dir, name + LEGACY_SUFFIX))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,512 @@
+'''
+In-process TEAL assembler producing the same bytecode as algod's /teal/compile for programs up to
+TEAL v5, so contracts can be compiled without a node. It follows go-algorand's assembler: named
+constants and fields, branch/callsub label resolution, and, from v4 on, the constant block
+optimization that keeps constants referenced more than once in intcblock/bytecblock (most
+referenced first) and turns single references into pushint/pushbytes.
+'''
+import base64
+
+from algosdk import encoding
+
+MAX_TEAL_VERSION = 5
+# first version where algod moves constants used once into pushint/pushbytes
+OPTIMIZE_CONSTANTS_VERSION = 4
+
+# name: (opcode, minimum TEAL version, immediate arguments)
+# immediates: u = uint8, T = txn field, G = global field, H = asset holding field,
+# P = asset params field, A = app params field, C = ecdsa curve, L = label
+OPCODES = {
+    'err': (0x00, 1, ''),
+    'sha256': (0x01, 1, ''),
+    'keccak256': (0x02, 1, ''),
+    'sha512_256': (0x03, 1, ''),
+    'ed25519verify': (0x04, 1, ''),
+    'ecdsa_verify': (0x05, 5, 'C'),
+    'ecdsa_pk_decompress': (0x06, 5, 'C'),
+    'ecdsa_pk_recover': (0x07, 5, 'C'),
+    '+': (0x08, 1, ''),
+    '-': (0x09, 1, ''),
+    '/': (0x0a, 1, ''),
+    '*': (0x0b, 1, ''),
+    '<': (0x0c, 1, ''),
+    '>': (0x0d, 1, ''),
+    '<=': (0x0e, 1, ''),
+    '>=': (0x0f, 1, ''),
+    '&&': (0x10, 1, ''),
+    '||': (0x11, 1, ''),
+    '==': (0x12, 1, ''),
+    '!=': (0x13, 1, ''),
+    '!': (0x14, 1, ''),
+    'len': (0x15, 1, ''),
+    'itob': (0x16, 1, ''),
+    'btoi': (0x17, 1, ''),
+    '%': (0x18, 1, ''),
+    '|': (0x19, 1, ''),
+    '&': (0x1a, 1, ''),
+    '^': (0x1b, 1, ''),
+    '~': (0x1c, 1, ''),
+    'mulw': (0x1d, 1, ''),
+    'addw': (0x1e, 2, ''),
+    'divmodw': (0x1f, 4, ''),
+    'intc': (0x21, 1, 'u'),
+    'intc_0': (0x22, 1, ''),
+    'intc_1': (0x23, 1, ''),
+    'intc_2': (0x24, 1, ''),
+    'intc_3': (0x25, 1, ''),
+    'bytec': (0x27, 1, 'u'),
+    'bytec_0': (0x28, 1, ''),
+    'bytec_1': (0x29, 1, ''),
+    'bytec_2': (0x2a, 1, ''),
+    'bytec_3': (0x2b, 1, ''),
+    'arg': (0x2c, 1, 'u'),
+    'arg_0': (0x2d, 1, ''),
+    'arg_1': (0x2e, 1, ''),
+    'arg_2': (0x2f, 1, ''),
+    'arg_3': (0x30, 1, ''),
+    'txn': (0x31, 1, 'T'),
+    'global': (0x32, 1, 'G'),
+    'gtxn': (0x33, 1, 'uT'),
+    'load': (0x34, 1, 'u'),
+    'store': (0x35, 1, 'u'),
+    'txna': (0x36, 2, 'Tu'),
+    'gtxna': (0x37, 2, 'uTu'),
+    'gtxns': (0x38, 3, 'T'),
+    'gtxnsa': (0x39, 3, 'Tu'),
+    'gload': (0x3a, 4, 'uu'),
+    'gloads': (0x3b, 4, 'u'),
+    'gaid': (0x3c, 4, 'u'),
+    'gaids': (0x3d, 4, ''),
+    'loads': (0x3e, 5, ''),
+    'stores': (0x3f, 5, ''),
+    'bnz': (0x40, 1, 'L'),
+    'bz': (0x41, 2, 'L'),
+    'b': (0x42, 2, 'L'),
+    'return': (0x43, 2, ''),
+    'assert': (0x44, 3, ''),
+    'pop': (0x48, 1, ''),
+    'dup': (0x49, 1, ''),
+    'dup2': (0x4a, 2, ''),
+    'dig': (0x4b, 3, 'u'),
+    'swap': (0x4c, 3, ''),
+    'select': (0x4d, 3, ''),
+    'cover': (0x4e, 5, 'u'),
+    'uncover': (0x4f, 5, 'u'),
+    'concat': (0x50, 2, ''),
+    'substring': (0x51, 2, 'uu'),
+    'substring3': (0x52, 2, ''),
+    'getbit': (0x53, 3, ''),
+    'setbit': (0x54, 3, ''),
+    'getbyte': (0x55, 3, ''),
+    'setbyte': (0x56, 3, ''),
+    'extract': (0x57, 5, 'uu'),
+    'extract3': (0x58, 5, ''),
+    'extract_uint16': (0x59, 5, ''),
+    'extract_uint32': (0x5a, 5, ''),
+    'extract_uint64': (0x5b, 5, ''),
+    'balance': (0x60, 2, ''),
+    'app_opted_in': (0x61, 2, ''),
+    'app_local_get': (0x62, 2, ''),
+    'app_local_get_ex': (0x63, 2, ''),
+    'app_global_get': (0x64, 2, ''),
+    'app_global_get_ex': (0x65, 2, ''),
+    'app_local_put': (0x66, 2, ''),
+    'app_global_put': (0x67, 2, ''),
+    'app_local_del': (0x68, 2, ''),
+    'app_global_del': (0x69, 2, ''),
+    'asset_holding_get': (0x70, 2, 'H'),
+    'asset_params_get': (0x71, 2, 'P'),
+    'app_params_get': (0x72, 5, 'A'),
+    'min_balance': (0x78, 3, ''),
+    'callsub': (0x88, 4, 'L'),
+    'retsub': (0x89, 4, ''),
+    'shl': (0x90, 4, ''),
+    'shr': (0x91, 4, ''),
+    'sqrt': (0x92, 4, ''),
+    'bitlen': (0x93, 4, ''),
+    'exp': (0x94, 4, ''),
+    'expw': (0x95, 4, ''),
+    'b+': (0xa0, 4, ''),
+    'b-': (0xa1, 4, ''),
+    'b/': (0xa2, 4, ''),
+    'b*': (0xa3, 4, ''),
+    'b<': (0xa4, 4, ''),
+    'b>': (0xa5, 4, ''),
+    'b<=': (0xa6, 4, ''),
+    'b>=': (0xa7, 4, ''),
+    'b==': (0xa8, 4, ''),
+    'b!=': (0xa9, 4, ''),
+    'b%': (0xaa, 4, ''),
+    'b|': (0xab, 4, ''),
+    'b&': (0xac, 4, ''),
+    'b^': (0xad, 4, ''),
+    'b~': (0xae, 4, ''),
+    'bzero': (0xaf, 4, ''),
+    'log': (0xb0, 5, ''),
+    'itxn_begin': (0xb1, 5, ''),
+    'itxn_field': (0xb2, 5, 'T'),
+    'itxn_submit': (0xb3, 5, ''),
+    'itxn': (0xb4, 5, 'T'),
+    'itxna': (0xb5, 5, 'Tu'),
+}
+INTCBLOCK = 0x20
+BYTECBLOCK = 0x26
+PUSHBYTES = 0x80
+PUSHINT = 0x81
+INTC_OPS = ['intc_0', 'intc_1', 'intc_2', 'intc_3']
+BYTEC_OPS = ['bytec_0', 'bytec_1', 'bytec_2', 'bytec_3']
+# ops that take an array index as extra immediate when written as txn/gtxn/gtxns/itxn
+ARRAY_FORMS = {'txn': 'txna', 'gtxn': 'gtxna', 'gtxns': 'gtxnsa', 'itxn': 'itxna'}
+
+TXN_FIELDS = ['Sender', 'Fee', 'FirstValid', 'FirstValidTime', 'LastValid', 'Note', 'Lease', 'Receiver',
+              'Amount', 'CloseRemainderTo', 'VotePK', 'SelectionPK', 'VoteFirst', 'VoteLast',
+              'VoteKeyDilution', 'Type', 'TypeEnum', 'XferAsset', 'AssetAmount', 'AssetSender',
+              'AssetReceiver', 'AssetCloseTo', 'GroupIndex', 'TxID', 'ApplicationID', 'OnCompletion',
+              'ApplicationArgs', 'NumAppArgs', 'Accounts', 'NumAccounts', 'ApprovalProgram',
+              'ClearStateProgram', 'RekeyTo', 'ConfigAsset', 'ConfigAssetTotal', 'ConfigAssetDecimals',
+              'ConfigAssetDefaultFrozen', 'ConfigAssetUnitName', 'ConfigAssetName', 'ConfigAssetURL',
+              'ConfigAssetMetadataHash', 'ConfigAssetManager', 'ConfigAssetReserve', 'ConfigAssetFreeze',
+              'ConfigAssetClawback', 'FreezeAsset', 'FreezeAssetAccount', 'FreezeAssetFrozen', 'Assets',
+              'NumAssets', 'Applications', 'NumApplications', 'GlobalNumUint', 'GlobalNumByteSlice',
+              'LocalNumUint', 'LocalNumByteSlice', 'ExtraProgramPages', 'Nonparticipation', 'Logs',
+              'NumLogs', 'CreatedAssetID', 'CreatedApplicationID']
+GLOBAL_FIELDS = ['MinTxnFee', 'MinBalance', 'MaxTxnLife', 'ZeroAddress', 'GroupSize', 'LogicSigVersion',
+                 'Round', 'LatestTimestamp', 'CurrentApplicationID', 'CreatorAddress',
+                 'CurrentApplicationAddress', 'GroupID']
+ASSET_HOLDING_FIELDS = ['AssetBalance', 'AssetFrozen']
+ASSET_PARAMS_FIELDS = ['AssetTotal', 'AssetDecimals', 'AssetDefaultFrozen', 'AssetUnitName', 'AssetName',
+                       'AssetURL', 'AssetMetadataHash', 'AssetManager', 'AssetReserve', 'AssetFreeze',
+                       'AssetClawback', 'AssetCreator']
+APP_PARAMS_FIELDS = ['AppApprovalProgram', 'AppClearStateProgram', 'AppGlobalNumUint', 'AppGlobalNumByteSlice',
+                     'AppLocalNumUint', 'AppLocalNumByteSlice', 'AppExtraProgramPages', 'AppCreator',
+                     'AppAddress']
+ECDSA_CURVES = ['Secp256k1']
+FIELDS = {'T': TXN_FIELDS, 'G': GLOBAL_FIELDS, 'H': ASSET_HOLDING_FIELDS, 'P': ASSET_PARAMS_FIELDS,
+          'A': APP_PARAMS_FIELDS, 'C': ECDSA_CURVES}
+
+# names accepted by the int pseudo-op
+NAMED_INTS = {
+    'NoOp': 0, 'OptIn': 1, 'CloseOut': 2, 'ClearState': 3, 'UpdateApplication': 4, 'DeleteApplication': 5,
+    'unknown': 0, 'pay': 1, 'keyreg': 2, 'acfg': 3, 'axfer': 4, 'afrz': 5, 'appl': 6,
+}
+STRING_ESCAPES = {'n': b'\n', 'r': b'\r', 't': b'\t', '\\': b'\\', '"': b'"'}
+
+
+class TealAssemblyError(Exception):
+    def __init__(self, line_number, message):
+        super().__init__('line {}: {}'.format(line_number, message))
+        self.line_number = line_number
+
+
+def varuint(value):
+    out = bytearray()
+    while value >= 0x80:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def fields_from_line(line):
+    """
+        Splits a TEAL line into whitespace separated fields, keeping quoted strings whole and dropping comments
+    """
+    fields = []
+    current = ''
+    in_string = False
+    i = 0
+    while i < len(line):
+        char = line[i]
+        if in_string:
+            current += char
+            if char == '\\' and i + 1 < len(line):
+                current += line[i + 1]
+                i += 1
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            current += char
+            in_string = True
+        elif line.startswith('//', i):
+            break
+        elif char.isspace():
+            if current:
+                fields.append(current)
+                current = ''
+        else:
+            current += char
+        i += 1
+    if current:
+        fields.append(current)
+    return fields
+
+
+def parse_string_literal(literal):
+    out = bytearray()
+    body = literal[1:-1]
+    i = 0
+    while i < len(body):
+        char = body[i]
+        if char != '\\':
+            out += char.encode('utf-8')
+            i += 1
+            continue
+        escape = body[i + 1]
+        if escape == 'x':
+            out.append(int(body[i + 2:i + 4], 16))
+            i += 4
+        else:
+            out += STRING_ESCAPES[escape]
+            i += 2
+    return bytes(out)
+
+
+def parse_byte_literal(args):
+    """
+        Parses one byte constant from the start of args
+            Returns:
+                tuple: the bytes and the number of fields consumed
+    """
+    arg = args[0]
+    if arg.startswith('"') and arg.endswith('"') and len(arg) > 1:
+        return parse_string_literal(arg), 1
+    if arg.startswith('0x'):
+        return bytes.fromhex(arg[2:]), 1
+    for prefix, decode in (('base64', base64.b64decode), ('b64', base64.b64decode),
+                           ('base32', base32_decode), ('b32', base32_decode)):
+        if arg == prefix:
+            return decode(args[1]), 2
+        if arg.startswith(prefix + '(') and arg.endswith(')'):
+            return decode(arg[len(prefix) + 1:-1]), 1
+    raise ValueError('unknown byte constant "{}"'.format(arg))
+
+
+def base32_decode(value):
+    return base64.b32decode(value + '=' * (-len(value) % 8))
+
+
+def parse_uint(arg):
+    if arg in NAMED_INTS:
+        return NAMED_INTS[arg]
+    if arg.startswith(('0x', '0X')):
+        value = int(arg[2:], 16)
+    elif arg.startswith('0') and len(arg) > 1:
+        value = int(arg[1:], 8)
+    else:
+        value = int(arg, 10)
+    if not 0 <= value < 2 ** 64:
+        raise ValueError('{} is not a uint64'.format(arg))
+    return value
+
+
+class Instruction:
+    """
+        One parsed line: an opcode with encoded immediates, a constant reference (int/byte pseudo-ops)
+        or a branch to a label
+    """
+
+    def __init__(self, line_number, opcode=None, immediates=b'', label=None, int_value=None, byte_value=None):
+        self.line_number = line_number
+        self.opcode = opcode
+        self.immediates = immediates
+        self.label = label
+        self.int_value = int_value
+        self.byte_value = byte_value
+
+
+class Assembler:
+    def __init__(self, source):
+        self.source = source
+        self.version = 1
+        self.instructions = []
+        self.labels = {}
+        self.explicit_intc = None
+        self.explicit_bytec = None
+
+    def assemble(self):
+        for line_number, line in enumerate(self.source.splitlines(), 1):
+            try:
+                self.parse_line(line_number, line)
+            except TealAssemblyError:
+                raise
+            except (ValueError, KeyError, IndexError) as e:
+                raise TealAssemblyError(line_number, str(e))
+        intc, bytec = self.constant_blocks()
+        return varuint(self.version) + self.constant_block_prefix(intc, bytec) + self.emit(intc, bytec)
+
+    def parse_line(self, line_number, line):
+        fields = fields_from_line(line)
+        if not fields:
+            return
+        if fields[0] == '#pragma':
+            if fields[1] != 'version':
+                raise TealAssemblyError(line_number, 'unknown pragma ' + fields[1])
+            self.version = int(fields[2])
+            if not 1 <= self.version <= MAX_TEAL_VERSION:
+                raise TealAssemblyError(line_number, 'unsupported TEAL version {}'.format(self.version))
+            return
+        if fields[0].endswith(':'):
+            label = fields[0][:-1]
+            if label in self.labels:
+                raise TealAssemblyError(line_number, 'duplicate label ' + label)
+            self.labels[label] = len(self.instructions)
+            fields = fields[1:]
+            if not fields:
+                return
+        self.parse_op(line_number, fields[0], fields[1:])
+
+    def parse_op(self, line_number, name, args):
+        append = self.instructions.append
+        if name == 'int':
+            append(Instruction(line_number, int_value=parse_uint(args[0])))
+        elif name == 'byte':
+            append(Instruction(line_number, byte_value=self.single_byte_literal(line_number, args)))
+        elif name == 'addr':
+            append(Instruction(line_number, byte_value=encoding.decode_address(args[0])))
+        elif name == 'method':
+            signature = self.single_byte_literal(line_number, args)
+            append(Instruction(line_number, byte_value=encoding.checksum(signature)[:4]))
+        elif name == 'intcblock':
+            values = [parse_uint(arg) for arg in args]
+            self.explicit_intc = values
+            append(Instruction(line_number, INTCBLOCK, varuint(len(values)) + b''.join(map(varuint, values))))
+        elif name == 'bytecblock':
+            values = []
+            while args:
+                value, consumed = parse_byte_literal(args)
+                values.append(value)
+                args = args[consumed:]
+            self.explicit_bytec = values
+            append(Instruction(line_number, BYTECBLOCK,
+                               varuint(len(values)) + b''.join(varuint(len(value)) + value for value in values)))
+        elif name == 'pushint':
+            self.check_version(line_number, name, 3)
+            append(Instruction(line_number, PUSHINT, varuint(parse_uint(args[0]))))
+        elif name == 'pushbytes':
+            self.check_version(line_number, name, 3)
+            value = self.single_byte_literal(line_number, args)
+            append(Instruction(line_number, PUSHBYTES, varuint(len(value)) + value))
+        else:
+            if name in ARRAY_FORMS and len(args) == len(OPCODES[name][2]) + 1:
+                name = ARRAY_FORMS[name]
+            if name not in OPCODES:
+                raise TealAssemblyError(line_number, 'unknown opcode ' + name)
+            opcode, min_version, immediate_kinds = OPCODES[name]
+            self.check_version(line_number, name, min_version)
+            if len(args) != len(immediate_kinds):
+                raise TealAssemblyError(line_number, '{} expects {} immediate arguments'.format(
+                    name, len(immediate_kinds)))
+            if immediate_kinds == 'L':
+                append(Instruction(line_number, opcode, label=args[0]))
+                return
+            immediates = bytearray()
+            for kind, arg in zip(immediate_kinds, args):
+                if kind == 'u':
+                    value = parse_uint(arg)
+                    if value > 255:
+                        raise TealAssemblyError(line_number, '{} immediate {} is not a uint8'.format(name, arg))
+                    immediates.append(value)
+                elif arg in FIELDS[kind]:
+                    immediates.append(FIELDS[kind].index(arg))
+                else:
+                    raise TealAssemblyError(line_number, '{} unknown field {}'.format(name, arg))
+            append(Instruction(line_number, opcode, bytes(immediates)))
+
+    def single_byte_literal(self, line_number, args):
+        value, consumed = parse_byte_literal(args)
+        if consumed != len(args):
+            raise TealAssemblyError(line_number, 'expected a single byte constant')
+        return value
+
+    def check_version(self, line_number, name, min_version):
+        if self.version < min_version:
+            raise TealAssemblyError(line_number, '{} requires TEAL version >= {}'.format(name, min_version))
+
+    def constant_blocks(self):
+        """
+            Decides the intcblock and bytecblock the int/byte pseudo-ops refer to
+            Returns:
+                tuple: int constants and byte constants, in block order
+        """
+        return (self.constant_block([i.int_value for i in self.instructions if i.int_value is not None],
+                                    self.explicit_intc),
+                self.constant_block([i.byte_value for i in self.instructions if i.byte_value is not None],
+                                    self.explicit_bytec))
+
+    def constant_block(self, references, explicit_block):
+        if explicit_block is not None:
+            return explicit_block
+        frequencies = {}
+        for value in references:
+            frequencies[value] = frequencies.get(value, 0) + 1
+        if self.version < OPTIMIZE_CONSTANTS_VERSION:
+            return list(frequencies)
+        # stable sort, so constants used equally often stay in order of first reference
+        ordered = sorted(frequencies, key=lambda value: -frequencies[value])
+        return [value for value in ordered if frequencies[value] > 1]
+
+    def constant_block_prefix(self, intc, bytec):
+        prefix = b''
+        if intc and self.explicit_intc is None:
+            prefix += bytes([INTCBLOCK]) + varuint(len(intc)) + b''.join(map(varuint, intc))
+        if bytec and self.explicit_bytec is None:
+            prefix += bytes([BYTECBLOCK]) + varuint(len(bytec)) + b''.join(
+                varuint(len(value)) + value for value in bytec)
+        return prefix
+
+    def encode_constant(self, instruction, intc, bytec):
+        if instruction.int_value is not None:
+            block, value, short_ops, long_op, push = intc, instruction.int_value, INTC_OPS, 'intc', PUSHINT
+            pushed = varuint(value)
+        else:
+            block, value, short_ops, long_op, push = bytec, instruction.byte_value, BYTEC_OPS, 'bytec', PUSHBYTES
+            pushed = varuint(len(value)) + value
+        if value not in block:
+            if self.explicit_intc is not None and push == PUSHINT or \
+                    self.explicit_bytec is not None and push == PUSHBYTES:
+                raise TealAssemblyError(instruction.line_number, 'constant missing from the explicit constant block')
+            return bytes([push]) + pushed
+        index = block.index(value)
+        if index < len(short_ops):
+            return bytes([OPCODES[short_ops[index]][0]])
+        return bytes([OPCODES[long_op][0], index])
+
+    def emit(self, intc, bytec):
+        prefix_length = len(varuint(self.version)) + len(self.constant_block_prefix(intc, bytec))
+        encoded = []
+        for instruction in self.instructions:
+            if instruction.opcode is None:
+                encoded.append(self.encode_constant(instruction, intc, bytec))
+            elif instruction.label is not None:
+                encoded.append(bytes([instruction.opcode, 0, 0]))
+            else:
+                encoded.append(bytes([instruction.opcode]) + instruction.immediates)
+
+        positions = []
+        pc = prefix_length
+        for chunk in encoded:
+            positions.append(pc)
+            pc += len(chunk)
+        positions.append(pc)
+
+        for index, instruction in enumerate(self.instructions):
+            if instruction.label is None:
+                continue
+            if instruction.label not in self.labels:
+                raise TealAssemblyError(instruction.line_number, 'reference to undefined label ' + instruction.label)
+            offset = positions[self.labels[instruction.label]] - (positions[index] + 3)
+            if offset < 0 and self.version < 4:
+                raise TealAssemblyError(instruction.line_number, 'backward branches require TEAL version >= 4')
+            encoded[index] = bytes([instruction.opcode]) + offset.to_bytes(2, 'big', signed=True)
+        return b''.join(encoded)
+
+
+def assemble(source_code):
+    """
+        Assembles TEAL source into program bytecode without contacting algod
+            Args:
+                source_code (str): TEAL source
+            Returns:
+                bytes: the same bytecode algod's /teal/compile returns
+    """
+    return Assembler(source_code).assemble()
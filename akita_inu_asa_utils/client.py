@@ -0,0 +1,180 @@
+'''
+Keep-alive algod client. PooledAlgodClient is a drop-in algod.AlgodClient whose requests reuse
+persistent HTTP connections from a pool instead of opening a new one per call, and which
+keeps per-endpoint latency counters.
+
+Only idempotent requests are retried when a pooled connection turns out to be stale; a POST such
+as send_transactions may already have reached algod, so its connection error is raised instead.
+'''
+import http.client
+import json
+import queue
+import re
+import threading
+import time
+from urllib import parse
+
+from algosdk import constants, error
+from algosdk.v2client import algod
+
+# path segments that identify a resource rather than an endpoint (round numbers, app/asset ids,
+# account addresses and transaction ids), folded together in the latency counters
+RESOURCE_SEGMENT = re.compile(r'/(\d+|[A-Z2-7]{52}|[A-Z2-7]{58})(?=/|$)')
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError)
+IDEMPOTENT_METHODS = ('GET', 'HEAD')
+# algod holds status/wait-for-block-after open for up to a minute before answering
+LONG_POLL_PATH = '/status/wait-for-block-after/'
+LONG_POLL_SECONDS = 60
+
+
+class PooledAlgodClient(algod.AlgodClient):
+    """
+        AlgodClient keeping up to pool_size idle keep-alive connections for reuse
+            Args:
+                algod_token (str): algod API token
+                algod_address (str): algod address, e.g. http://localhost:4001
+                headers (dict): extra headers sent with every request
+                pool_size (int): maximum number of idle connections kept open
+                timeout (float): socket timeout in seconds, on top of the minute algod may hold a wait
+                    for the next block
+    """
+
+    def __init__(self, algod_token, algod_address, headers=None, pool_size=10, timeout=30):
+        super().__init__(algod_token, algod_address, headers)
+        url = parse.urlsplit(algod_address)
+        self._connection_class = http.client.HTTPSConnection if url.scheme == 'https' else http.client.HTTPConnection
+        self._netloc = url.netloc
+        self._base_path = url.path.rstrip('/')
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+        self._latencies = {}
+        self._latency_lock = threading.Lock()
+
+    def algod_request(self, method, requrl, params=None, data=None, headers=None, response_format="json"):
+        header = {"User-Agent": "py-algorand-sdk"}
+        if self.headers:
+            header.update(self.headers)
+        if headers:
+            header.update(headers)
+        if requrl not in constants.no_auth:
+            header[constants.algod_auth_header] = self.algod_token
+        timeout = self.timeout + LONG_POLL_SECONDS if requrl.startswith(LONG_POLL_PATH) else self.timeout
+        if requrl not in constants.unversioned_paths:
+            requrl = algod.api_version_path_prefix + requrl
+        endpoint = method + " " + RESOURCE_SEGMENT.sub('/{}', requrl)
+        if params:
+            requrl = requrl + "?" + parse.urlencode(params)
+
+        start = time.perf_counter()
+        status, body = self._send(method, self._base_path + requrl, data, header, timeout)
+        self._record_latency(endpoint, time.perf_counter() - start)
+
+        if status >= 400:
+            message = body.decode("utf-8")
+            try:
+                message = json.loads(message)["message"]
+            except Exception:
+                pass
+            raise error.AlgodHTTPError(message, status)
+        if response_format == "json":
+            try:
+                return json.loads(body)
+            except Exception as e:
+                raise error.AlgodResponseError("Failed to parse JSON response from algod") from e
+        return body
+
+    def _send(self, method, path, data, header, timeout):
+        connection = self._acquire()
+        try:
+            try:
+                response = self._round_trip(connection, method, path, data, header, timeout)
+            except STALE_CONNECTION_ERRORS:
+                if method not in IDEMPOTENT_METHODS:
+                    raise
+                # the server dropped an idle keep-alive connection, retry once on a fresh one
+                connection.close()
+                connection = self._connection_class(self._netloc, timeout=timeout)
+                response = self._round_trip(connection, method, path, data, header, timeout)
+        except Exception:
+            connection.close()
+            raise
+        status, body, will_close = response
+        if will_close:
+            connection.close()
+        else:
+            self._release(connection)
+        return status, body
+
+    @staticmethod
+    def _round_trip(connection, method, path, data, header, timeout):
+        # pooled connections are shared by requests with different timeouts
+        connection.timeout = timeout
+        if connection.sock is not None:
+            connection.sock.settimeout(timeout)
+        connection.request(method, path, body=data, headers=header)
+        response = connection.getresponse()
+        return response.status, response.read(), response.will_close
+
+    def _acquire(self):
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            return self._connection_class(self._netloc, timeout=self.timeout)
+
+    def _release(self, connection):
+        try:
+            self._pool.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def _record_latency(self, endpoint, seconds):
+        with self._latency_lock:
+            stats = self._latencies.setdefault(endpoint, {'count': 0, 'total_seconds': 0.0, 'max_seconds': 0.0})
+            stats['count'] += 1
+            stats['total_seconds'] += seconds
+            stats['max_seconds'] = max(stats['max_seconds'], seconds)
+
+    def latency_stats(self):
+        """
+            Returns:
+                dict: per endpoint ("GET /v2/accounts/{}") request count, total and max latency in seconds
+        """
+        with self._latency_lock:
+            return {endpoint: dict(stats) for endpoint, stats in self._latencies.items()}
+
+    def close(self):
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+def load_developer_config(file_path='DeveloperConfig.json'):
+    fp = open(file_path)
+    return json.load(fp)
+
+
+_algod_clients = {}
+_algod_clients_lock = threading.Lock()
+
+
+def get_algod_client(token, address, pool_size=10, timeout=30):
+    """
+        Returns the process-wide keep-alive client for this algod node, creating it on first use
+            Args:
+                token (str): algod API token
+                address (str): algod address
+                pool_size (int): maximum number of idle connections kept open
+                timeout (float): socket timeout in seconds
+            Returns:
+                PooledAlgodClient: shared client
+    """
+    key = (token, address, pool_size, timeout)
+    with _algod_clients_lock:
+        client = _algod_clients.get(key)
+        if client is None:
+            client = PooledAlgodClient(token, address, pool_size=pool_size, timeout=timeout)
+            _algod_clients[key] = client
+    return client
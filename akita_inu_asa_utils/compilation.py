@@ -0,0 +1,166 @@
+'''
+Build helpers: TEAL generation memoized per program function, compilation with algod (cached
+under build/compile_cache) or the local assembler, and the build/ artifacts and schemas.
+'''
+import base64
+import hashlib
+import os
+import re
+import threading
+import weakref
+
+from . import artifacts
+from .registry import program_registry
+
+COMPILE_CACHE_DIR = 'compile_cache'
+
+
+def check_build_dir():
+    if not os.path.exists('build'):
+        os.mkdir('build')
+
+
+def teal_version(source_code):
+    match = re.match(r'\s*#pragma version (\d+)', source_code)
+    return 'teal' + (match.group(1) if match else '1')
+
+
+_compiler_versions = weakref.WeakKeyDictionary()
+_compiler_versions_lock = threading.Lock()
+
+
+def algod_compiler_version(client):
+    """
+        Identifies the assembler of a node, fetched once per client, so compile cache entries don't
+        outlive a node upgrade
+            Args:
+                client (AlgodClient): algod client
+            Returns:
+                str: algod build version
+    """
+    with _compiler_versions_lock:
+        version = _compiler_versions.get(client)
+    if version is None:
+        build = client.versions()['build']
+        version = '{}.{}.{}-{}'.format(build['major'], build['minor'], build['build_number'], build['commit_hash'])
+        with _compiler_versions_lock:
+            _compiler_versions[client] = version
+    return version
+
+
+def compile_cache_path(source_code, compiler_version=None):
+    """
+        Location in build/ of the cached bytecode of source_code
+            Args:
+                source_code (str): TEAL source
+                compiler_version (str): compiler version the cache entry is tied to, defaults to the
+                    TEAL version declared in the source, which only identifies the local assembler
+            Returns:
+                str: path of the cache entry
+    """
+    if compiler_version is None:
+        compiler_version = teal_version(source_code)
+    digest = hashlib.sha256((compiler_version + '\0' + source_code).encode('utf-8')).hexdigest()
+    return os.path.join('build', COMPILE_CACHE_DIR, digest + '.bin')
+
+
+def compile_program(client, source_code, file_path=None, compiler_version=None, use_cache=True):
+    """
+        Compiles TEAL source with algod, reusing bytecode cached under build/compile_cache when the
+        same source was already compiled by the same node build
+            Args:
+                client (AlgodClient): algod client, or None to assemble locally without a node
+                source_code (str): TEAL source
+                file_path (str): artifact in build/ to write the bytecode to (e.g. approval.bin), if None
+                    the bytecode is returned
+                compiler_version (str): see compile_cache_path, defaults to the node's build version
+                use_cache (bool): set to False to always compile with algod
+            Returns:
+                bytes: compiled program when file_path is None
+    """
+    compiled = None
+    if client is None:
+        from .assembler import assemble
+        # local assembly is cheaper than a cache lookup
+        compiled = assemble(source_code)
+    elif use_cache:
+        if compiler_version is None:
+            compiler_version = algod_compiler_version(client)
+        cache_path = compile_cache_path(source_code, compiler_version)
+        if os.path.exists(cache_path):
+            with open(cache_path, 'rb') as f:
+                compiled = f.read()
+    if compiled is None:
+        compile_response = client.compile(source_code)
+        compiled = base64.b64decode(compile_response['result'])
+        if use_cache:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            temp_path = cache_path + '.' + str(os.getpid()) + '.tmp'
+            with open(temp_path, 'wb') as f:
+                f.write(compiled)
+            os.replace(temp_path, cache_path)
+    if file_path == None:
+        return compiled
+    else:
+        check_build_dir()
+        artifacts.write_program(artifacts.artifact_name(file_path), compiled)
+
+
+_generated_teal = {}
+_generated_teal_lock = threading.Lock()
+
+
+def generate_teal(program_fn_pointer, *args, **kwargs):
+    """
+        Runs a PyTeal program function once per parameter set and returns the memoized TEAL afterwards
+            Args:
+                program_fn_pointer (function): function returning TEAL source, e.g. approval_program
+                args: hashable arguments passed on to the program function
+            Returns:
+                str: TEAL source
+    """
+    key = (program_fn_pointer, args, tuple(sorted(kwargs.items())))
+    with _generated_teal_lock:
+        teal = _generated_teal.get(key)
+    if teal is None:
+        teal = program_fn_pointer(*args, **kwargs)
+        with _generated_teal_lock:
+            _generated_teal[key] = teal
+    return teal
+
+
+def dump_teal_assembly(file_path, program_fn_pointer):
+    """
+        Writes TEAL to build/file_path
+            Args:
+                file_path (str): file in build/ to write to
+                program_fn_pointer (function or str): program function (generated through generate_teal)
+                    or already generated TEAL source
+    """
+    check_build_dir()
+    if isinstance(program_fn_pointer, str):
+        compiled = program_fn_pointer
+    else:
+        compiled = generate_teal(program_fn_pointer)
+    with open('build/' + file_path, 'w') as f:
+        f.write(compiled)
+
+
+def load_compiled(file_path):
+    try:
+        compiled = program_registry().program(file_path)
+    except (OSError, ValueError, artifacts.ArtifactError) as e:
+        print(e)
+        print("Error reading source file...exiting")
+        exit(-1)
+    return compiled
+
+
+def write_schema(file_path, num_ints, num_bytes):
+    artifacts.write_schema(file_path, num_ints, num_bytes)
+
+
+def load_schema(file_path):
+    from algosdk.future import transaction
+    stateJSON = program_registry().schema(file_path)
+    return transaction.StateSchema(stateJSON['num_ints'], stateJSON['num_bytes'])
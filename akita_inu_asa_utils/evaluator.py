@@ -0,0 +1,1741 @@
+'''
+Pure-Python TEAL v5 evaluator with a simulated ledger, for running the contracts' programs in unit
+tests and fuzzers without a node. Ledger.evaluate applies a transaction group atomically: logic
+signatures and approval/clear programs are executed, payments, asset transfers, app calls and
+inner transactions are applied, and on any failure the ledger is left untouched.
+
+Programs are taken as bytecode or TEAL source (assembled locally) and decoded once per distinct
+program. Authorization (signatures, rekeying) is not checked and consensus rules outside the
+AVM (fees, validity windows) are only applied where the programs can observe them.
+'''
+import base64
+import functools
+import hashlib
+
+from algosdk import encoding
+from algosdk.future import transaction
+
+from .assembler import (OPCODES, FIELDS, INTCBLOCK, BYTECBLOCK, PUSHBYTES, PUSHINT,
+                        assemble)
+
+MAX_UINT64 = 2 ** 64 - 1
+MAX_STACK_DEPTH = 1000
+MAX_BYTE_MATH_SIZE = 64
+MAX_KEY_LENGTH = 64
+MAX_KEY_VALUE_LENGTH = 128
+APP_BUDGET = 700
+LOGIC_SIG_BUDGET = 20000
+MIN_TXN_FEE = 1000
+MIN_BALANCE = 100000
+MAX_TXN_LIFE = 1000
+MAX_INNER_TXNS = 16
+ASSET_MIN_BALANCE = 100000
+APP_PAGE_MIN_BALANCE = 100000
+SCHEMA_MIN_BALANCE = 25000
+SCHEMA_UINT_MIN_BALANCE = 3500
+SCHEMA_BYTES_MIN_BALANCE = 25000
+ZERO_ADDRESS = bytes(32)
+LOGIC_SIG_VERSION = 5
+
+OP_COSTS = {'sha256': 35, 'keccak256': 130, 'sha512_256': 45, 'ed25519verify': 1900, 'b+': 10, 'b-': 10,
+            'b/': 20, 'b*': 20, 'b%': 20, 'b|': 6, 'b&': 6, 'b^': 6, 'b~': 4, 'sqrt': 4, 'expw': 10}
+TYPE_ENUMS = {'unknown': 0, 'pay': 1, 'keyreg': 2, 'acfg': 3, 'axfer': 4, 'afrz': 5, 'appl': 6}
+TYPE_NAMES = {value: name for name, value in TYPE_ENUMS.items()}
+NO_OP, OPT_IN, CLOSE_OUT, CLEAR_STATE, UPDATE_APPLICATION, DELETE_APPLICATION = range(6)
+
+ADDRESS_FIELDS = {'Sender', 'Receiver', 'CloseRemainderTo', 'AssetSender', 'AssetReceiver', 'AssetCloseTo',
+                  'RekeyTo', 'ConfigAssetManager', 'ConfigAssetReserve', 'ConfigAssetFreeze',
+                  'ConfigAssetClawback', 'FreezeAssetAccount', 'Lease', 'TxID', 'VotePK', 'SelectionPK',
+                  'ConfigAssetMetadataHash'}
+BYTES_FIELDS = {'Note', 'Type', 'ApprovalProgram', 'ClearStateProgram', 'ConfigAssetUnitName', 'ConfigAssetName',
+                'ConfigAssetURL'}
+ARRAY_FIELDS = {'ApplicationArgs': 'NumAppArgs', 'Accounts': 'NumAccounts', 'Assets': 'NumAssets',
+                'Applications': 'NumApplications', 'Logs': 'NumLogs'}
+INNER_TYPES = {'pay', 'axfer', 'acfg', 'afrz'}
+
+
+class LogicError(Exception):
+    """
+        Raised when a program fails or rejects, or a transaction can't be applied to the ledger
+    """
+
+    def __init__(self, message, group_index=None, pc=None):
+        location = ''
+        if group_index is not None:
+            location += 'transaction {}: '.format(group_index)
+        if pc is not None:
+            location += 'pc {}: '.format(pc)
+        super().__init__(location + message)
+        self.group_index = group_index
+        self.pc = pc
+
+
+def to_public_key(address):
+    if isinstance(address, str):
+        return decode_address(address)
+    return bytes(address)
+
+
+@functools.lru_cache(maxsize=4096)
+def decode_address(address):
+    return encoding.decode_address(address)
+
+
+def application_public_key(app_id):
+    return encoding.checksum(b'appID' + app_id.to_bytes(8, 'big'))
+
+
+def default_field(name):
+    if name in ADDRESS_FIELDS:
+        return ZERO_ADDRESS
+    if name in BYTES_FIELDS:
+        return b''
+    if name in ARRAY_FIELDS:
+        return []
+    return 0
+
+
+def txn_fields(txn):
+    """
+        Converts an algosdk transaction into the TEAL fields the evaluator works on
+            Args:
+                txn (Transaction): unsigned, signed or logic sig transaction, or a dict of TEAL fields
+            Returns:
+                dict: TEAL field name to value, addresses as 32 byte public keys
+    """
+    if isinstance(txn, dict):
+        fields = dict(txn)
+        for name in ADDRESS_FIELDS.intersection(fields):
+            fields[name] = to_public_key(fields[name])
+        if 'Accounts' in fields:
+            fields['Accounts'] = [to_public_key(address) for address in fields['Accounts']]
+        if 'Type' in fields and 'TypeEnum' not in fields:
+            fields['TypeEnum'] = TYPE_ENUMS[fields['Type'].decode()]
+        return fields
+    if isinstance(txn, (transaction.SignedTransaction, transaction.LogicSigTransaction)):
+        txn = txn.transaction
+    fields = TxnFields(Sender=to_public_key(txn.sender), Fee=txn.fee, FirstValid=txn.first_valid_round,
+                       LastValid=txn.last_valid_round, Note=txn.note or b'', TypeEnum=TYPE_ENUMS[txn.type])
+    fields.transaction = txn
+    if txn.lease:
+        fields['Lease'] = txn.lease
+    if txn.rekey_to:
+        fields['RekeyTo'] = to_public_key(txn.rekey_to)
+    if txn.group:
+        fields['GroupID'] = txn.group
+    if isinstance(txn, transaction.PaymentTxn):
+        fields.update(Receiver=to_public_key(txn.receiver), Amount=txn.amt)
+        if txn.close_remainder_to:
+            fields['CloseRemainderTo'] = to_public_key(txn.close_remainder_to)
+    elif isinstance(txn, transaction.AssetTransferTxn):
+        fields.update(AssetReceiver=to_public_key(txn.receiver), AssetAmount=txn.amount, XferAsset=txn.index)
+        if txn.close_assets_to:
+            fields['AssetCloseTo'] = to_public_key(txn.close_assets_to)
+        if txn.revocation_target:
+            fields['AssetSender'] = to_public_key(txn.revocation_target)
+    elif isinstance(txn, transaction.AssetConfigTxn):
+        fields.update(ConfigAsset=txn.index or 0, ConfigAssetTotal=txn.total or 0,
+                      ConfigAssetDecimals=txn.decimals or 0,
+                      ConfigAssetDefaultFrozen=int(bool(txn.default_frozen)),
+                      ConfigAssetUnitName=(txn.unit_name or '').encode(),
+                      ConfigAssetName=(txn.asset_name or '').encode(), ConfigAssetURL=(txn.url or '').encode(),
+                      ConfigAssetMetadataHash=txn.metadata_hash or ZERO_ADDRESS)
+        for name, address in (('ConfigAssetManager', txn.manager), ('ConfigAssetReserve', txn.reserve),
+                              ('ConfigAssetFreeze', txn.freeze), ('ConfigAssetClawback', txn.clawback)):
+            if address:
+                fields[name] = to_public_key(address)
+    elif isinstance(txn, transaction.AssetFreezeTxn):
+        fields.update(FreezeAsset=txn.index, FreezeAssetAccount=to_public_key(txn.target),
+                      FreezeAssetFrozen=int(bool(txn.new_freeze_state)))
+    elif isinstance(txn, transaction.ApplicationCallTxn):
+        fields.update(ApplicationID=txn.index or 0, OnCompletion=int(txn.on_complete),
+                      ApplicationArgs=list(txn.app_args or []),
+                      Accounts=[to_public_key(address) for address in txn.accounts or []],
+                      Assets=list(txn.foreign_assets or []), Applications=list(txn.foreign_apps or []),
+                      ApprovalProgram=txn.approval_program or b'', ClearStateProgram=txn.clear_program or b'',
+                      ExtraProgramPages=txn.extra_pages or 0)
+        if txn.global_schema:
+            fields.update(GlobalNumUint=txn.global_schema.num_uints or 0,
+                          GlobalNumByteSlice=txn.global_schema.num_byte_slices or 0)
+        if txn.local_schema:
+            fields.update(LocalNumUint=txn.local_schema.num_uints or 0,
+                          LocalNumByteSlice=txn.local_schema.num_byte_slices or 0)
+    return fields
+
+
+class TxnFields(dict):
+    """
+        Fields of an algosdk transaction, the TxID is only computed if a program reads it
+    """
+    transaction = None
+
+
+def get_field(fields, name):
+    if name in fields:
+        return fields[name]
+    if name == 'TxID' and getattr(fields, 'transaction', None) is not None:
+        fields['TxID'] = base64.b32decode(fields.transaction.get_txid() + '====')
+        return fields['TxID']
+    if name == 'Type':
+        return TYPE_NAMES.get(fields.get('TypeEnum', 0), 'unknown').encode()
+    if name in ARRAY_FIELDS.values():
+        array = next(array for array, count in ARRAY_FIELDS.items() if count == name)
+        return len(fields.get(array, []))
+    return default_field(name)
+
+
+def get_array_field(fields, name, index):
+    if name == 'Accounts':
+        array = [fields['Sender']] + fields.get('Accounts', [])
+    elif name == 'Applications':
+        array = [fields.get('ApplicationID', 0)] + fields.get('Applications', [])
+    elif name in ARRAY_FIELDS:
+        array = fields.get(name, [])
+    else:
+        raise LogicError('{} is not an array field'.format(name))
+    if index >= len(array):
+        raise LogicError('invalid {} index {}'.format(name, index))
+    return array[index]
+
+
+def read_varuint(data, pc):
+    value = 0
+    shift = 0
+    while True:
+        if pc >= len(data):
+            raise LogicError('truncated varuint', pc=pc)
+        byte = data[pc]
+        value |= (byte & 0x7f) << shift
+        pc += 1
+        if byte < 0x80:
+            return value, pc
+        shift += 7
+
+
+OPS_BY_CODE = {opcode: (name, kinds) for name, (opcode, _, kinds) in OPCODES.items()}
+OPS_BY_CODE.update({INTCBLOCK: ('intcblock', ''), BYTECBLOCK: ('bytecblock', ''),
+                    PUSHINT: ('pushint', ''), PUSHBYTES: ('pushbytes', '')})
+
+
+class Program:
+    """
+        Bytecode decoded into (handler, immediates, cost) instructions, branch targets resolved to
+        instruction indexes
+    """
+
+    def __init__(self, bytecode):
+        self.bytecode = bytecode
+        self.version, pc = read_varuint(bytecode, 0)
+        if not 1 <= self.version <= LOGIC_SIG_VERSION:
+            raise LogicError('unsupported program version {}'.format(self.version))
+        decoded = []
+        while pc < len(bytecode):
+            start = pc
+            opcode = bytecode[pc]
+            if opcode not in OPS_BY_CODE:
+                raise LogicError('invalid opcode 0x{:02x}'.format(opcode), pc=pc)
+            name, kinds = OPS_BY_CODE[opcode]
+            pc += 1
+            if name == 'intcblock':
+                count, pc = read_varuint(bytecode, pc)
+                immediates = []
+                for _ in range(count):
+                    value, pc = read_varuint(bytecode, pc)
+                    immediates.append(value)
+            elif name == 'bytecblock':
+                count, pc = read_varuint(bytecode, pc)
+                immediates = []
+                for _ in range(count):
+                    length, pc = read_varuint(bytecode, pc)
+                    immediates.append(bytes(bytecode[pc:pc + length]))
+                    pc += length
+            elif name == 'pushint':
+                immediates, pc = read_varuint(bytecode, pc)
+            elif name == 'pushbytes':
+                length, pc = read_varuint(bytecode, pc)
+                immediates = bytes(bytecode[pc:pc + length])
+                pc += length
+            elif kinds == 'L':
+                offset = int.from_bytes(bytecode[pc:pc + 2], 'big', signed=True)
+                pc += 2
+                immediates = pc + offset
+            else:
+                immediates = []
+                for kind in kinds:
+                    value = bytecode[pc]
+                    pc += 1
+                    if kind != 'u':
+                        if value >= len(FIELDS[kind]):
+                            raise LogicError('invalid field {} for {}'.format(value, name), pc=start)
+                        value = FIELDS[kind][value]
+                    immediates.append(value)
+                immediates = tuple(immediates)
+            if pc > len(bytecode):
+                raise LogicError('truncated {}'.format(name), pc=start)
+            decoded.append((start, name, immediates))
+
+        indexes = {start: index for index, (start, _, _) in enumerate(decoded)}
+        indexes[len(bytecode)] = len(decoded)
+        self.pcs = [start for start, _, _ in decoded]
+        self.instructions = []
+        for index, (start, name, immediates) in enumerate(decoded):
+            if name in OPCODES and OPCODES[name][2] == 'L':
+                if immediates not in indexes:
+                    raise LogicError('branch target {} is not an instruction'.format(immediates), pc=start)
+                if self.version < 4 and immediates < start:
+                    raise LogicError('backward branch in version {}'.format(self.version), pc=start)
+                immediates = indexes[immediates]
+                if name == 'callsub':
+                    # callsub also needs the instruction retsub returns to
+                    immediates = (immediates, index + 1)
+            if name not in HANDLERS:
+                raise LogicError('{} is not supported by the evaluator'.format(name), pc=start)
+            self.instructions.append((HANDLERS[name], immediates, OP_COSTS.get(name, 1)))
+
+
+_programs = {}
+
+
+def load_program(program):
+    """
+        Returns the decoded Program of bytecode or TEAL source, decoding each distinct program once
+    """
+    if isinstance(program, str):
+        program = assemble(program)
+    program = bytes(program)
+    decoded = _programs.get(program)
+    if decoded is None:
+        decoded = Program(program)
+        _programs[program] = decoded
+    return decoded
+
+
+class AccountState:
+    def __init__(self, balance=0):
+        self.balance = balance
+        # asset id -> [amount, frozen]
+        self.assets = {}
+        # app id -> {key: value}
+        self.local_states = {}
+        # app id -> local schema, kept since the app may be deleted before the account clears its state
+        self.local_schemas = {}
+        self.created_apps = set()
+        self.created_assets = set()
+
+    def copy(self):
+        account = AccountState(self.balance)
+        account.assets = {asset_id: list(holding) for asset_id, holding in self.assets.items()}
+        account.local_states = {app_id: dict(state) for app_id, state in self.local_states.items()}
+        account.local_schemas = dict(self.local_schemas)
+        account.created_apps = set(self.created_apps)
+        account.created_assets = set(self.created_assets)
+        return account
+
+
+class AppState:
+    def __init__(self, creator, approval_program, clear_program, global_schema=(0, 0), local_schema=(0, 0),
+                 extra_pages=0):
+        self.creator = creator
+        self.approval_program = approval_program
+        self.clear_program = clear_program
+        self.global_schema = tuple(global_schema)
+        self.local_schema = tuple(local_schema)
+        self.extra_pages = extra_pages
+        self.global_state = {}
+
+    def copy(self):
+        app = AppState(self.creator, self.approval_program, self.clear_program, self.global_schema,
+                       self.local_schema, self.extra_pages)
+        app.global_state = dict(self.global_state)
+        return app
+
+
+class TxnResult:
+    """
+        Outcome of one applied transaction: its fields, logs, executed inner transactions, program
+        cost and, for creations, the new application/asset id
+    """
+
+    def __init__(self, fields):
+        self.fields = fields
+        self.logs = []
+        self.inner_txns = []
+        self.cost = 0
+        self.created_app_id = None
+        self.created_asset_id = None
+
+
+class Ledger:
+    """
+        In-memory accounts, assets and applications that transaction groups are evaluated against
+            Args:
+                latest_timestamp (int): value of Global.latest_timestamp
+                round (int): value of Global.round
+                first_id (int): first id handed out to created assets and applications
+    """
+
+    def __init__(self, latest_timestamp=0, round=1, first_id=1000):
+        self.latest_timestamp = latest_timestamp
+        self.round = round
+        self.next_id = first_id
+        self.accounts = {}
+        self.apps = {}
+        # asset id -> params, keyed by the AssetParams field names
+        self.assets = {}
+        self._touched = set()
+        self._fee_credit = 0
+
+    def account(self, address):
+        public_key = to_public_key(address)
+        account = self.accounts.get(public_key)
+        if account is None:
+            account = AccountState()
+            self.accounts[public_key] = account
+        return account
+
+    def fund(self, address, amount):
+        self.account(address).balance += amount
+
+    def balance(self, address):
+        return self.account(address).balance
+
+    def asset_balance(self, address, asset_id):
+        holding = self.account(address).assets.get(asset_id)
+        return 0 if holding is None else holding[0]
+
+    def create_asset(self, creator, total, decimals=0, default_frozen=False, unit_name=b'', asset_name=b'',
+                     url=b'', manager=None, reserve=None, freeze=None, clawback=None):
+        """
+            Creates an asset without a transaction, the creator holds the whole supply
+                Returns:
+                    int: asset id
+        """
+        asset_id = self._new_id()
+        creator = to_public_key(creator)
+        params = {'AssetTotal': total, 'AssetDecimals': decimals, 'AssetDefaultFrozen': int(default_frozen),
+                  'AssetUnitName': unit_name, 'AssetName': asset_name, 'AssetURL': url,
+                  'AssetMetadataHash': ZERO_ADDRESS, 'AssetCreator': creator}
+        for name, address in (('AssetManager', manager), ('AssetReserve', reserve), ('AssetFreeze', freeze),
+                              ('AssetClawback', clawback)):
+            params[name] = ZERO_ADDRESS if address is None else to_public_key(address)
+        self.assets[asset_id] = params
+        account = self.account(creator)
+        account.assets[asset_id] = [total, False]
+        account.created_assets.add(asset_id)
+        return asset_id
+
+    def opt_in_asset(self, address, asset_id):
+        self.account(address).assets.setdefault(asset_id, [0, bool(self.assets[asset_id]['AssetDefaultFrozen'])])
+
+    def create_app(self, creator, approval_program, clear_program, global_schema=(0, 0), local_schema=(0, 0),
+                   global_state=None):
+        """
+            Installs an application without running its approval program
+                Returns:
+                    int: application id
+        """
+        app_id = self._new_id()
+        creator = to_public_key(creator)
+        app = AppState(creator, bytes(load_program(approval_program).bytecode),
+                       bytes(load_program(clear_program).bytecode), global_schema, local_schema)
+        app.global_state.update(global_state or {})
+        self.apps[app_id] = app
+        self.account(creator).created_apps.add(app_id)
+        return app_id
+
+    def global_state(self, app_id):
+        """
+            Returns:
+                dict: global state of the app with decoded keys, like read_app_global_state
+        """
+        return {key.decode(): value for key, value in self.apps[app_id].global_state.items()}
+
+    def local_state(self, address, app_id):
+        state = self.account(address).local_states.get(app_id)
+        if state is None:
+            return None
+        return {key.decode(): value for key, value in state.items()}
+
+    def min_balance(self, address):
+        account = self.account(address)
+        total = MIN_BALANCE + ASSET_MIN_BALANCE * len(account.assets)
+        for app_id in account.created_apps:
+            app = self.apps[app_id]
+            total += APP_PAGE_MIN_BALANCE * (1 + app.extra_pages) + schema_min_balance(app.global_schema)
+        for schema in account.local_schemas.values():
+            total += APP_PAGE_MIN_BALANCE + schema_min_balance(schema)
+        return total
+
+    def evaluate(self, transactions, logic_sig_args=None):
+        """
+            Applies a transaction group atomically
+                Args:
+                    transactions (list): algosdk transactions (signed, unsigned or logic sig) or TEAL field dicts
+                    logic_sig_args (dict): group index -> (program, args) for dict transactions signed by a
+                        logic signature
+                Returns:
+                    list<TxnResult>: one result per transaction
+        """
+        group = []
+        logic_sigs = dict(logic_sig_args or {})
+        for index, txn in enumerate(transactions):
+            fields = txn_fields(txn)
+            fields['GroupIndex'] = index
+            group.append(fields)
+            if isinstance(txn, transaction.LogicSigTransaction):
+                logic_sigs[index] = (txn.lsig.logic, txn.lsig.args or [])
+        budget = [APP_BUDGET * sum(1 for fields in group if fields.get('TypeEnum') == TYPE_ENUMS['appl'])]
+        # fees paid above the minimum cover the fees of inner transactions
+        self._fee_credit = sum(get_field(fields, 'Fee') for fields in group) - MIN_TXN_FEE * len(group)
+
+        saved = self._save()
+        results = []
+        try:
+            for index, fields in enumerate(group):
+                if index in logic_sigs:
+                    program, args = logic_sigs[index]
+                    EvalContext(self, group, index, load_program(program), args=args).run()
+                results.append(self._apply_top_level(group, index, budget))
+        except LogicError as e:
+            self._restore(saved)
+            if e.group_index is None:
+                raise LogicError(str(e), group_index=len(results)) from e
+            raise
+        except Exception:
+            self._restore(saved)
+            raise
+        return results
+
+    def _new_id(self):
+        new_id = self.next_id
+        self.next_id += 1
+        return new_id
+
+    def _save(self):
+        return ({public_key: account.copy() for public_key, account in self.accounts.items()},
+                {app_id: app.copy() for app_id, app in self.apps.items()},
+                {asset_id: dict(params) for asset_id, params in self.assets.items()},
+                self.next_id)
+
+    def _restore(self, saved):
+        self.accounts, self.apps, self.assets, self.next_id = saved
+
+    def _apply_top_level(self, group, index, budget):
+        fields = group[index]
+        result = TxnResult(fields)
+        self._touched = set()
+        self._debit(fields['Sender'], get_field(fields, 'Fee'))
+        self._apply(fields, result, group=group, budget=budget)
+        for public_key in self._touched:
+            account = self.accounts.get(public_key)
+            if account is None or is_empty(account):
+                continue
+            if account.balance < self.min_balance(public_key):
+                raise LogicError('account {} balance {} below min {}'.format(
+                    encoding.encode_address(public_key), account.balance, self.min_balance(public_key)))
+        return result
+
+    def _apply(self, fields, result, group=None, budget=None):
+        type_enum = fields.get('TypeEnum', 0)
+        if type_enum == TYPE_ENUMS['pay']:
+            self._pay(fields)
+        elif type_enum == TYPE_ENUMS['axfer']:
+            self._asset_transfer(fields)
+        elif type_enum == TYPE_ENUMS['acfg']:
+            self._asset_config(fields, result)
+        elif type_enum == TYPE_ENUMS['afrz']:
+            self._asset_freeze(fields)
+        elif type_enum == TYPE_ENUMS['appl']:
+            self._app_call(group, fields['GroupIndex'], result, budget)
+        elif type_enum != TYPE_ENUMS['keyreg']:
+            raise LogicError('unknown transaction type {}'.format(type_enum))
+
+    def _debit(self, public_key, amount):
+        account = self.account(public_key)
+        if account.balance < amount:
+            raise LogicError('overspend by {}: balance {}, needed {}'.format(
+                encoding.encode_address(public_key), account.balance, amount))
+        account.balance -= amount
+        self._touched.add(public_key)
+
+    def _credit(self, public_key, amount):
+        self.account(public_key).balance += amount
+        self._touched.add(public_key)
+
+    def _pay(self, fields):
+        sender = fields['Sender']
+        self._debit(sender, fields.get('Amount', 0))
+        self._credit(fields.get('Receiver', ZERO_ADDRESS), fields.get('Amount', 0))
+        close_to = fields.get('CloseRemainderTo', ZERO_ADDRESS)
+        if close_to != ZERO_ADDRESS:
+            account = self.account(sender)
+            if account.assets or account.local_states or account.created_apps:
+                raise LogicError('cannot close account with assets or applications')
+            self._credit(close_to, account.balance)
+            del self.accounts[sender]
+            self._touched.discard(sender)
+
+    def _holding(self, public_key, asset_id):
+        holding = self.account(public_key).assets.get(asset_id)
+        if holding is None:
+            raise LogicError('{} is not opted into asset {}'.format(encoding.encode_address(public_key), asset_id))
+        return holding
+
+    def _asset_transfer(self, fields):
+        asset_id = fields.get('XferAsset', 0)
+        if asset_id not in self.assets:
+            raise LogicError('asset {} does not exist'.format(asset_id))
+        sender = fields['Sender']
+        receiver = fields.get('AssetReceiver', ZERO_ADDRESS)
+        amount = fields.get('AssetAmount', 0)
+        source = fields.get('AssetSender', ZERO_ADDRESS)
+        clawback = source != ZERO_ADDRESS
+        if clawback:
+            if sender != self.assets[asset_id]['AssetClawback']:
+                raise LogicError('clawback from a sender that is not the clawback address')
+        else:
+            source = sender
+            if amount == 0 and source == receiver and asset_id not in self.account(sender).assets:
+                self.opt_in_asset(sender, asset_id)
+                self._touched.add(sender)
+                return
+        from_holding = self._holding(source, asset_id)
+        # a pure close out (no amount, no receiver) doesn't need an opted in receiver
+        if amount > 0 or receiver != ZERO_ADDRESS:
+            to_holding = self._holding(receiver, asset_id)
+            if not clawback and (from_holding[1] or to_holding[1]):
+                raise LogicError('asset {} is frozen'.format(asset_id))
+            if from_holding[0] < amount:
+                raise LogicError('underflow on asset {}: balance {}, needed {}'.format(
+                    asset_id, from_holding[0], amount))
+            from_holding[0] -= amount
+            to_holding[0] += amount
+        close_to = fields.get('AssetCloseTo', ZERO_ADDRESS)
+        if close_to != ZERO_ADDRESS:
+            if source == self.assets[asset_id]['AssetCreator']:
+                raise LogicError('cannot close asset {}: sender is the creator'.format(asset_id))
+            self._holding(close_to, asset_id)[0] += from_holding[0]
+            del self.account(source).assets[asset_id]
+        self._touched.update((source, receiver))
+
+    def _asset_config(self, fields, result):
+        if fields.get('ConfigAsset', 0) != 0:
+            raise LogicError('only asset creation is supported for acfg')
+        asset_id = self.create_asset(
+            fields['Sender'], fields.get('ConfigAssetTotal', 0), fields.get('ConfigAssetDecimals', 0),
+            bool(fields.get('ConfigAssetDefaultFrozen', 0)), fields.get('ConfigAssetUnitName', b''),
+            fields.get('ConfigAssetName', b''), fields.get('ConfigAssetURL', b''),
+            fields.get('ConfigAssetManager'), fields.get('ConfigAssetReserve'), fields.get('ConfigAssetFreeze'),
+            fields.get('ConfigAssetClawback'))
+        self.assets[asset_id]['AssetMetadataHash'] = fields.get('ConfigAssetMetadataHash', ZERO_ADDRESS)
+        fields['CreatedAssetID'] = asset_id
+        result.created_asset_id = asset_id
+        self._touched.add(fields['Sender'])
+
+    def _asset_freeze(self, fields):
+        asset_id = fields.get('FreezeAsset', 0)
+        if asset_id not in self.assets or fields['Sender'] != self.assets[asset_id]['AssetFreeze']:
+            raise LogicError('sender is not the freeze address of asset {}'.format(asset_id))
+        self._holding(fields.get('FreezeAssetAccount', ZERO_ADDRESS), asset_id)[1] = \
+            bool(fields.get('FreezeAssetFrozen', 0))
+
+    def _app_call(self, group, index, result, budget):
+        fields = group[index]
+        sender = fields['Sender']
+        on_completion = fields.get('OnCompletion', NO_OP)
+        app_id = fields.get('ApplicationID', 0)
+        if app_id == 0:
+            app_id = self._new_id()
+            app = AppState(sender, fields.get('ApprovalProgram', b''), fields.get('ClearStateProgram', b''),
+                           (fields.get('GlobalNumUint', 0), fields.get('GlobalNumByteSlice', 0)),
+                           (fields.get('LocalNumUint', 0), fields.get('LocalNumByteSlice', 0)),
+                           fields.get('ExtraProgramPages', 0))
+            self.apps[app_id] = app
+            self.account(sender).created_apps.add(app_id)
+            fields['CreatedApplicationID'] = app_id
+            result.created_app_id = app_id
+        elif app_id not in self.apps:
+            if on_completion == CLEAR_STATE and app_id in self.account(sender).local_states:
+                self._close_local_state(sender, app_id)
+                return
+            raise LogicError('application {} does not exist'.format(app_id))
+        app = self.apps[app_id]
+        self._touched.update((sender, application_public_key(app_id)))
+
+        local_states = self.account(sender).local_states
+        if on_completion == OPT_IN:
+            if app_id in local_states:
+                raise LogicError('already opted into application {}'.format(app_id))
+            local_states[app_id] = {}
+            self.account(sender).local_schemas[app_id] = app.local_schema
+        elif on_completion in (CLOSE_OUT, CLEAR_STATE) and app_id not in local_states:
+            raise LogicError('not opted into application {}'.format(app_id))
+
+        if on_completion == CLEAR_STATE:
+            saved = self._save()
+            try:
+                context = EvalContext(self, group, index, load_program(app.clear_program), app_id=app_id,
+                                      budget=budget, result=result)
+                context.run()
+            except LogicError:
+                # a failing clear program only discards its own state changes
+                self._restore(saved)
+            self._close_local_state(sender, app_id)
+            return
+
+        EvalContext(self, group, index, load_program(app.approval_program), app_id=app_id, budget=budget,
+                    result=result).run()
+        self._check_schema(fields, app_id)
+        if on_completion == CLOSE_OUT:
+            self._close_local_state(sender, app_id)
+        elif on_completion == UPDATE_APPLICATION:
+            app.approval_program = fields.get('ApprovalProgram', b'')
+            app.clear_program = fields.get('ClearStateProgram', b'')
+        elif on_completion == DELETE_APPLICATION:
+            del self.apps[app_id]
+            self.account(app.creator).created_apps.discard(app_id)
+
+    def _close_local_state(self, public_key, app_id):
+        account = self.account(public_key)
+        account.local_states.pop(app_id, None)
+        account.local_schemas.pop(app_id, None)
+
+    def _check_schema(self, fields, app_id):
+        app = self.apps[app_id]
+        check_schema(app.global_state, app.global_schema, 'global')
+        for public_key in [fields['Sender']] + fields.get('Accounts', []):
+            state = self.account(public_key).local_states.get(app_id)
+            if state is not None:
+                check_schema(state, app.local_schema, 'local')
+
+
+def is_empty(account):
+    return not (account.balance or account.assets or account.local_states or account.created_apps)
+
+
+def schema_min_balance(schema):
+    num_uints, num_byte_slices = schema
+    return (SCHEMA_MIN_BALANCE + SCHEMA_UINT_MIN_BALANCE) * num_uints + \
+        (SCHEMA_MIN_BALANCE + SCHEMA_BYTES_MIN_BALANCE) * num_byte_slices
+
+
+def check_schema(state, schema, kind):
+    num_uints = sum(1 for value in state.values() if isinstance(value, int))
+    num_byte_slices = len(state) - num_uints
+    if num_uints > schema[0] or num_byte_slices > schema[1]:
+        raise LogicError('{} state ({} uints, {} byte slices) exceeds schema {}'.format(
+            kind, num_uints, num_byte_slices, schema))
+
+
+class EvalContext:
+    """
+        Execution state of one program run
+            Args:
+                ledger (Ledger): ledger the program reads and writes
+                group (list<dict>): fields of every transaction in the group
+                index (int): group index of the transaction the program runs for
+                program (Program): decoded program
+                app_id (int): application id, None when running a logic signature
+                args (list<bytes>): logic signature arguments
+                budget (list<int>): shared remaining opcode budget of the group's app calls
+                result (TxnResult): collects logs and inner transactions
+    """
+
+    def __init__(self, ledger, group, index, program, app_id=None, args=None, budget=None, result=None):
+        self.ledger = ledger
+        self.group = group
+        self.index = index
+        self.txn = group[index]
+        self.program = program
+        self.app_id = app_id
+        self.args = args or []
+        self.budget = budget if budget is not None else [LOGIC_SIG_BUDGET]
+        self.result = result if result is not None else TxnResult(self.txn)
+        self.stack = []
+        self.scratch = [0] * 256
+        self.call_stack = []
+        self.intc = []
+        self.bytec = []
+        self.inner = None
+        self.inner_count = 0
+        self.last_inner = None
+
+    @property
+    def application_mode(self):
+        return self.app_id is not None
+
+    def run(self):
+        instructions = self.program.instructions
+        end = len(instructions)
+        position = 0
+        try:
+            while position < end:
+                handler, immediates, cost = instructions[position]
+                self.budget[0] -= cost
+                self.result.cost += cost
+                if self.budget[0] < 0:
+                    raise LogicError('dynamic cost budget exceeded')
+                jump = handler(self, immediates)
+                position = position + 1 if jump is None else jump
+                if len(self.stack) > MAX_STACK_DEPTH:
+                    raise LogicError('stack overflow')
+        except LogicError as e:
+            if e.pc is not None:
+                raise
+            pc = self.program.pcs[position] if position < end else len(self.program.bytecode)
+            raise LogicError(str(e), group_index=self.index, pc=pc) from e
+        if len(self.stack) != 1:
+            raise LogicError('stack must contain exactly one value at the end, found {}'.format(len(self.stack)),
+                             group_index=self.index)
+        if not isinstance(self.stack[0], int):
+            raise LogicError('program ended with a byte slice on the stack', group_index=self.index)
+        if self.stack[0] == 0:
+            raise LogicError('rejected by logic', group_index=self.index)
+
+    def pop(self):
+        if not self.stack:
+            raise LogicError('stack underflow')
+        return self.stack.pop()
+
+    def pop_uint(self):
+        value = self.pop()
+        if not isinstance(value, int):
+            raise LogicError('expected uint64, got bytes')
+        return value
+
+    def pop_bytes(self):
+        value = self.pop()
+        if not isinstance(value, bytes):
+            raise LogicError('expected bytes, got uint64')
+        return value
+
+    def push(self, value):
+        if isinstance(value, bool):
+            value = int(value)
+        elif isinstance(value, int):
+            if not 0 <= value <= MAX_UINT64:
+                raise LogicError('uint64 overflow')
+        elif len(value) > 4096:
+            raise LogicError('byte slice longer than 4096')
+        self.stack.append(value)
+
+    def require_mode(self, application):
+        if self.application_mode != application:
+            raise LogicError('opcode not allowed in {} mode'.format(
+                'application' if self.application_mode else 'signature'))
+
+    # references to accounts, assets and applications
+
+    def account_reference(self, value):
+        txn = self.txn
+        if isinstance(value, int):
+            return get_array_field(txn, 'Accounts', value)
+        if value == txn['Sender'] or value in txn.get('Accounts', []):
+            return value
+        if value == application_public_key(self.app_id):
+            return value
+        if value in (application_public_key(app_id) for app_id in txn.get('Applications', [])):
+            return value
+        raise LogicError('invalid account reference {}'.format(encoding.encode_address(value)
+                                                              if len(value) == 32 else value))
+
+    def app_reference(self, value):
+        if value == 0:
+            return self.app_id
+        applications = self.txn.get('Applications', [])
+        if value <= len(applications):
+            return applications[value - 1]
+        if value == self.app_id or value in applications:
+            return value
+        raise LogicError('invalid application reference {}'.format(value))
+
+    def asset_reference(self, value):
+        assets = self.txn.get('Assets', [])
+        if value < len(assets):
+            return assets[value]
+        if value in assets:
+            return value
+        raise LogicError('invalid asset reference {}'.format(value))
+
+    def current_app(self):
+        return self.ledger.apps[self.app_id]
+
+    def global_field(self, name):
+        if name == 'MinTxnFee':
+            return MIN_TXN_FEE
+        if name == 'MinBalance':
+            return MIN_BALANCE
+        if name == 'MaxTxnLife':
+            return MAX_TXN_LIFE
+        if name == 'ZeroAddress':
+            return ZERO_ADDRESS
+        if name == 'GroupSize':
+            return len(self.group)
+        if name == 'LogicSigVersion':
+            return LOGIC_SIG_VERSION
+        if name == 'Round':
+            return self.ledger.round
+        if name == 'LatestTimestamp':
+            self.require_mode(True)
+            return self.ledger.latest_timestamp
+        if name == 'GroupID':
+            return self.txn.get('GroupID', ZERO_ADDRESS)
+        self.require_mode(True)
+        if name == 'CurrentApplicationID':
+            return self.app_id
+        if name == 'CreatorAddress':
+            return self.current_app().creator
+        if name == 'CurrentApplicationAddress':
+            return application_public_key(self.app_id)
+        raise LogicError('unknown global field {}'.format(name))
+
+
+HANDLERS = {}
+
+
+def op(*names):
+    def register(handler):
+        for name in names:
+            HANDLERS[name] = handler
+        return handler
+    return register
+
+
+def binary_uint_op(name, function):
+    def handler(context, immediates):
+        b = context.pop_uint()
+        a = context.pop_uint()
+        context.push(function(a, b))
+    HANDLERS[name] = handler
+
+
+def checked_div(a, b):
+    if b == 0:
+        raise LogicError('division by zero')
+    return a // b
+
+
+def checked_mod(a, b):
+    if b == 0:
+        raise LogicError('modulo by zero')
+    return a % b
+
+
+def checked_sub(a, b):
+    if b > a:
+        raise LogicError('- would result negative')
+    return a - b
+
+
+def checked_exp(a, b):
+    if a == 0 and b == 0:
+        raise LogicError('0^0 is undefined')
+    if a > 1 and b > 64:
+        raise LogicError('exp overflow')
+    return a ** b
+
+
+def checked_shift(a, b):
+    if b > 63:
+        raise LogicError('shift amount {} > 63'.format(b))
+    return b
+
+
+for _name, _function in (('+', lambda a, b: a + b), ('-', checked_sub), ('/', checked_div),
+                         ('*', lambda a, b: a * b), ('%', checked_mod), ('<', lambda a, b: a < b),
+                         ('>', lambda a, b: a > b), ('<=', lambda a, b: a <= b), ('>=', lambda a, b: a >= b),
+                         ('&&', lambda a, b: bool(a and b)), ('||', lambda a, b: bool(a or b)),
+                         ('|', lambda a, b: a | b), ('&', lambda a, b: a & b), ('^', lambda a, b: a ^ b),
+                         ('exp', checked_exp),
+                         ('shl', lambda a, b: (a << checked_shift(a, b)) & MAX_UINT64),
+                         ('shr', lambda a, b: a >> checked_shift(a, b))):
+    binary_uint_op(_name, _function)
+
+
+def pop_comparable(context):
+    b = context.pop()
+    a = context.pop()
+    if type(a) != type(b):
+        raise LogicError('cannot compare uint64 to bytes')
+    return a, b
+
+
+@op('==')
+def equal(context, immediates):
+    a, b = pop_comparable(context)
+    context.push(a == b)
+
+
+@op('!=')
+def not_equal(context, immediates):
+    a, b = pop_comparable(context)
+    context.push(a != b)
+
+
+@op('!')
+def logical_not(context, immediates):
+    context.push(context.pop_uint() == 0)
+
+
+@op('~')
+def bitwise_not(context, immediates):
+    context.push(context.pop_uint() ^ MAX_UINT64)
+
+
+@op('mulw')
+def mulw(context, immediates):
+    b = context.pop_uint()
+    a = context.pop_uint()
+    product = a * b
+    context.push(product >> 64)
+    context.push(product & MAX_UINT64)
+
+
+@op('addw')
+def addw(context, immediates):
+    b = context.pop_uint()
+    a = context.pop_uint()
+    total = a + b
+    context.push(total >> 64)
+    context.push(total & MAX_UINT64)
+
+
+@op('divmodw')
+def divmodw(context, immediates):
+    divisor = context.pop_uint()
+    divisor += context.pop_uint() << 64
+    dividend = context.pop_uint()
+    dividend += context.pop_uint() << 64
+    if divisor == 0:
+        raise LogicError('division by zero')
+    quotient, remainder = divmod(dividend, divisor)
+    for value in (quotient >> 64, quotient & MAX_UINT64, remainder >> 64, remainder & MAX_UINT64):
+        context.push(value)
+
+
+@op('expw')
+def expw(context, immediates):
+    b = context.pop_uint()
+    a = context.pop_uint()
+    if a == 0 and b == 0:
+        raise LogicError('0^0 is undefined')
+    result = a ** b if a < 2 or b <= 128 else 2 ** 128
+    if result >= 2 ** 128:
+        raise LogicError('expw overflow')
+    context.push(result >> 64)
+    context.push(result & MAX_UINT64)
+
+
+@op('sqrt')
+def sqrt(context, immediates):
+    value = context.pop_uint()
+    root = int(value ** 0.5)
+    while root * root > value:
+        root -= 1
+    while (root + 1) * (root + 1) <= value:
+        root += 1
+    context.push(root)
+
+
+@op('bitlen')
+def bitlen(context, immediates):
+    value = context.pop()
+    if isinstance(value, bytes):
+        value = int.from_bytes(value, 'big')
+    context.push(value.bit_length())
+
+
+@op('len')
+def length(context, immediates):
+    context.push(len(context.pop_bytes()))
+
+
+@op('itob')
+def itob(context, immediates):
+    context.push(context.pop_uint().to_bytes(8, 'big'))
+
+
+@op('btoi')
+def btoi(context, immediates):
+    value = context.pop_bytes()
+    if len(value) > 8:
+        raise LogicError('btoi arg too long')
+    context.push(int.from_bytes(value, 'big'))
+
+
+@op('sha256')
+def sha256(context, immediates):
+    context.push(hashlib.sha256(context.pop_bytes()).digest())
+
+
+@op('sha512_256')
+def sha512_256(context, immediates):
+    context.push(encoding.checksum(context.pop_bytes()))
+
+
+@op('keccak256')
+def keccak256(context, immediates):
+    from Cryptodome.Hash import keccak
+    context.push(keccak.new(data=context.pop_bytes(), digest_bits=256).digest())
+
+
+@op('ed25519verify')
+def ed25519verify(context, immediates):
+    from nacl.exceptions import BadSignatureError
+    from nacl.signing import VerifyKey
+    public_key = context.pop_bytes()
+    signature = context.pop_bytes()
+    data = context.pop_bytes()
+    message = b'ProgData' + encoding.checksum(b'Program' + context.program.bytecode) + data
+    try:
+        VerifyKey(public_key).verify(message, signature)
+        context.push(1)
+    except (BadSignatureError, ValueError):
+        context.push(0)
+
+
+@op('err')
+def err(context, immediates):
+    raise LogicError('err opcode executed')
+
+
+@op('return')
+def return_op(context, immediates):
+    context.stack = [context.pop()]
+    return len(context.program.instructions)
+
+
+@op('assert')
+def assert_op(context, immediates):
+    if context.pop_uint() == 0:
+        raise LogicError('assert failed')
+
+
+@op('intcblock')
+def intcblock(context, immediates):
+    context.intc = immediates
+
+
+@op('bytecblock')
+def bytecblock(context, immediates):
+    context.bytec = immediates
+
+
+def constant(block_name, index):
+    def handler(context, immediates):
+        block = getattr(context, block_name)
+        position = immediates[0] if index is None else index
+        if position >= len(block):
+            raise LogicError('{} index {} beyond block of size {}'.format(block_name, position, len(block)))
+        context.push(block[position])
+    return handler
+
+
+HANDLERS['intc'] = constant('intc', None)
+HANDLERS['bytec'] = constant('bytec', None)
+for _index in range(4):
+    HANDLERS['intc_{}'.format(_index)] = constant('intc', _index)
+    HANDLERS['bytec_{}'.format(_index)] = constant('bytec', _index)
+
+
+@op('pushint', 'pushbytes')
+def push_immediate(context, immediates):
+    context.push(immediates)
+
+
+def argument(index):
+    def handler(context, immediates):
+        context.require_mode(False)
+        position = immediates[0] if index is None else index
+        if position >= len(context.args):
+            raise LogicError('arg {} out of range'.format(position))
+        context.push(bytes(context.args[position]))
+    return handler
+
+
+HANDLERS['arg'] = argument(None)
+for _index in range(4):
+    HANDLERS['arg_{}'.format(_index)] = argument(_index)
+
+
+def read_txn_field(context, fields, name, array_index=None):
+    if array_index is not None:
+        return get_array_field(fields, name, array_index)
+    if name in ARRAY_FIELDS:
+        raise LogicError('{} needs an array index'.format(name))
+    if name == 'GroupIndex':
+        return fields['GroupIndex']
+    return get_field(fields, name)
+
+
+def group_txn(context, group_index):
+    if group_index >= len(context.group):
+        raise LogicError('gtxn lookup {} beyond group of size {}'.format(group_index, len(context.group)))
+    return context.group[group_index]
+
+
+@op('txn')
+def txn_op(context, immediates):
+    context.push(read_txn_field(context, context.txn, immediates[0]))
+
+
+@op('txna')
+def txna(context, immediates):
+    context.push(read_txn_field(context, context.txn, immediates[0], immediates[1]))
+
+
+@op('gtxn')
+def gtxn(context, immediates):
+    context.push(read_txn_field(context, group_txn(context, immediates[0]), immediates[1]))
+
+
+@op('gtxna')
+def gtxna(context, immediates):
+    context.push(read_txn_field(context, group_txn(context, immediates[0]), immediates[1], immediates[2]))
+
+
+@op('gtxns')
+def gtxns(context, immediates):
+    context.push(read_txn_field(context, group_txn(context, context.pop_uint()), immediates[0]))
+
+
+@op('gtxnsa')
+def gtxnsa(context, immediates):
+    context.push(read_txn_field(context, group_txn(context, context.pop_uint()), immediates[0], immediates[1]))
+
+
+@op('global')
+def global_op(context, immediates):
+    context.push(context.global_field(immediates[0]))
+
+
+@op('load')
+def load(context, immediates):
+    context.push(context.scratch[immediates[0]])
+
+
+@op('store')
+def store(context, immediates):
+    context.scratch[immediates[0]] = context.pop()
+
+
+@op('loads')
+def loads(context, immediates):
+    slot = context.pop_uint()
+    if slot > 255:
+        raise LogicError('invalid scratch slot {}'.format(slot))
+    context.push(context.scratch[slot])
+
+
+@op('stores')
+def stores(context, immediates):
+    value = context.pop()
+    slot = context.pop_uint()
+    if slot > 255:
+        raise LogicError('invalid scratch slot {}'.format(slot))
+    context.scratch[slot] = value
+
+
+@op('bnz')
+def bnz(context, immediates):
+    if context.pop_uint() != 0:
+        return immediates
+
+
+@op('bz')
+def bz(context, immediates):
+    if context.pop_uint() == 0:
+        return immediates
+
+
+@op('b')
+def branch(context, immediates):
+    return immediates
+
+
+@op('callsub')
+def callsub(context, immediates):
+    target, return_position = immediates
+    context.call_stack.append(return_position)
+    return target
+
+
+@op('retsub')
+def retsub(context, immediates):
+    if not context.call_stack:
+        raise LogicError('retsub with empty call stack')
+    return context.call_stack.pop()
+
+
+@op('pop')
+def pop(context, immediates):
+    context.pop()
+
+
+@op('dup')
+def dup(context, immediates):
+    value = context.pop()
+    context.push(value)
+    context.push(value)
+
+
+@op('dup2')
+def dup2(context, immediates):
+    b = context.pop()
+    a = context.pop()
+    for value in (a, b, a, b):
+        context.push(value)
+
+
+@op('dig')
+def dig(context, immediates):
+    depth = immediates[0]
+    if depth >= len(context.stack):
+        raise LogicError('dig {} with stack size {}'.format(depth, len(context.stack)))
+    context.push(context.stack[-1 - depth])
+
+
+@op('swap')
+def swap(context, immediates):
+    b = context.pop()
+    a = context.pop()
+    context.push(b)
+    context.push(a)
+
+
+@op('select')
+def select(context, immediates):
+    condition = context.pop_uint()
+    b = context.pop()
+    a = context.pop()
+    context.push(b if condition != 0 else a)
+
+
+@op('cover')
+def cover(context, immediates):
+    depth = immediates[0]
+    if depth >= len(context.stack):
+        raise LogicError('cover {} with stack size {}'.format(depth, len(context.stack)))
+    value = context.stack.pop()
+    context.stack.insert(len(context.stack) - depth, value)
+
+
+@op('uncover')
+def uncover(context, immediates):
+    depth = immediates[0]
+    if depth >= len(context.stack):
+        raise LogicError('uncover {} with stack size {}'.format(depth, len(context.stack)))
+    context.stack.append(context.stack.pop(-1 - depth))
+
+
+@op('concat')
+def concat(context, immediates):
+    b = context.pop_bytes()
+    a = context.pop_bytes()
+    context.push(a + b)
+
+
+def extract_range(value, start, end):
+    if start > end or end > len(value):
+        raise LogicError('extraction range {}:{} out of bounds for length {}'.format(start, end, len(value)))
+    return value[start:end]
+
+
+@op('substring')
+def substring(context, immediates):
+    context.push(extract_range(context.pop_bytes(), immediates[0], immediates[1]))
+
+
+@op('substring3')
+def substring3(context, immediates):
+    end = context.pop_uint()
+    start = context.pop_uint()
+    context.push(extract_range(context.pop_bytes(), start, end))
+
+
+@op('extract')
+def extract(context, immediates):
+    value = context.pop_bytes()
+    start, count = immediates
+    end = len(value) if count == 0 else start + count
+    context.push(extract_range(value, start, end))
+
+
+@op('extract3')
+def extract3(context, immediates):
+    count = context.pop_uint()
+    start = context.pop_uint()
+    context.push(extract_range(context.pop_bytes(), start, start + count))
+
+
+def extract_uint(size):
+    def handler(context, immediates):
+        start = context.pop_uint()
+        context.push(int.from_bytes(extract_range(context.pop_bytes(), start, start + size), 'big'))
+    return handler
+
+
+HANDLERS['extract_uint16'] = extract_uint(2)
+HANDLERS['extract_uint32'] = extract_uint(4)
+HANDLERS['extract_uint64'] = extract_uint(8)
+
+
+@op('getbit')
+def getbit(context, immediates):
+    index = context.pop_uint()
+    value = context.pop()
+    if isinstance(value, int):
+        if index > 63:
+            raise LogicError('getbit index {} beyond uint64'.format(index))
+        context.push((value >> index) & 1)
+    else:
+        if index >= len(value) * 8:
+            raise LogicError('getbit index {} beyond byte slice'.format(index))
+        context.push((value[index // 8] >> (7 - index % 8)) & 1)
+
+
+@op('setbit')
+def setbit(context, immediates):
+    bit = context.pop_uint()
+    index = context.pop_uint()
+    value = context.pop()
+    if bit > 1:
+        raise LogicError('setbit value > 1')
+    if isinstance(value, int):
+        if index > 63:
+            raise LogicError('setbit index {} beyond uint64'.format(index))
+        context.push(value | (1 << index) if bit else value & ~(1 << index))
+    else:
+        if index >= len(value) * 8:
+            raise LogicError('setbit index {} beyond byte slice'.format(index))
+        data = bytearray(value)
+        mask = 1 << (7 - index % 8)
+        data[index // 8] = data[index // 8] | mask if bit else data[index // 8] & ~mask
+        context.push(bytes(data))
+
+
+@op('getbyte')
+def getbyte(context, immediates):
+    index = context.pop_uint()
+    value = context.pop_bytes()
+    if index >= len(value):
+        raise LogicError('getbyte index {} beyond byte slice'.format(index))
+    context.push(value[index])
+
+
+@op('setbyte')
+def setbyte(context, immediates):
+    byte = context.pop_uint()
+    index = context.pop_uint()
+    value = bytearray(context.pop_bytes())
+    if index >= len(value) or byte > 255:
+        raise LogicError('setbyte index {} or value {} out of range'.format(index, byte))
+    value[index] = byte
+    context.push(bytes(value))
+
+
+def byte_math(name, function, returns_bool=False):
+    def handler(context, immediates):
+        b = context.pop_bytes()
+        a = context.pop_bytes()
+        if len(a) > MAX_BYTE_MATH_SIZE or len(b) > MAX_BYTE_MATH_SIZE:
+            raise LogicError('byte math input longer than {}'.format(MAX_BYTE_MATH_SIZE))
+        result = function(int.from_bytes(a, 'big'), int.from_bytes(b, 'big'))
+        if returns_bool:
+            context.push(result)
+        else:
+            context.push(result.to_bytes(max(1, (result.bit_length() + 7) // 8), 'big') if result else b'')
+    HANDLERS[name] = handler
+
+
+for _name, _function in (('b+', lambda a, b: a + b), ('b-', checked_sub), ('b/', checked_div),
+                         ('b*', lambda a, b: a * b), ('b%', checked_mod)):
+    byte_math(_name, _function)
+for _name, _function in (('b<', lambda a, b: a < b), ('b>', lambda a, b: a > b), ('b<=', lambda a, b: a <= b),
+                         ('b>=', lambda a, b: a >= b), ('b==', lambda a, b: a == b),
+                         ('b!=', lambda a, b: a != b)):
+    byte_math(_name, _function, returns_bool=True)
+
+
+def byte_bitwise(name, function):
+    def handler(context, immediates):
+        b = context.pop_bytes()
+        a = context.pop_bytes()
+        size = max(len(a), len(b))
+        a = a.rjust(size, b'\0')
+        b = b.rjust(size, b'\0')
+        context.push(bytes(function(x, y) for x, y in zip(a, b)))
+    HANDLERS[name] = handler
+
+
+byte_bitwise('b|', lambda x, y: x | y)
+byte_bitwise('b&', lambda x, y: x & y)
+byte_bitwise('b^', lambda x, y: x ^ y)
+
+
+@op('b~')
+def byte_invert(context, immediates):
+    context.push(bytes(x ^ 0xff for x in context.pop_bytes()))
+
+
+@op('bzero')
+def bzero(context, immediates):
+    size = context.pop_uint()
+    if size > 4096:
+        raise LogicError('bzero size {} too large'.format(size))
+    context.push(bytes(size))
+
+
+@op('balance')
+def balance(context, immediates):
+    context.require_mode(True)
+    address = context.account_reference(context.pop())
+    context.push(context.ledger.balance(address))
+
+
+@op('min_balance')
+def min_balance(context, immediates):
+    context.require_mode(True)
+    address = context.account_reference(context.pop())
+    context.push(context.ledger.min_balance(address))
+
+
+@op('app_opted_in')
+def app_opted_in(context, immediates):
+    context.require_mode(True)
+    app_id = context.app_reference(context.pop_uint())
+    address = context.account_reference(context.pop())
+    context.push(app_id in context.ledger.account(address).local_states)
+
+
+def local_state(context, address, app_id):
+    state = context.ledger.account(address).local_states.get(app_id)
+    if state is None:
+        raise LogicError('{} is not opted into application {}'.format(encoding.encode_address(address), app_id))
+    return state
+
+
+@op('app_local_get')
+def app_local_get(context, immediates):
+    context.require_mode(True)
+    key = context.pop_bytes()
+    address = context.account_reference(context.pop())
+    context.push(local_state(context, address, context.app_id).get(key, 0))
+
+
+@op('app_local_get_ex')
+def app_local_get_ex(context, immediates):
+    context.require_mode(True)
+    key = context.pop_bytes()
+    app_id = context.app_reference(context.pop_uint())
+    address = context.account_reference(context.pop())
+    state = context.ledger.account(address).local_states.get(app_id, {})
+    context.push(state.get(key, 0))
+    context.push(key in state)
+
+
+@op('app_global_get')
+def app_global_get(context, immediates):
+    context.require_mode(True)
+    context.push(context.current_app().global_state.get(context.pop_bytes(), 0))
+
+
+@op('app_global_get_ex')
+def app_global_get_ex(context, immediates):
+    context.require_mode(True)
+    key = context.pop_bytes()
+    app = context.ledger.apps.get(context.app_reference(context.pop_uint()))
+    state = {} if app is None else app.global_state
+    context.push(state.get(key, 0))
+    context.push(key in state)
+
+
+def check_key_value(key, value):
+    if len(key) > MAX_KEY_LENGTH:
+        raise LogicError('key too long: {} bytes'.format(len(key)))
+    if isinstance(value, bytes) and len(key) + len(value) > MAX_KEY_VALUE_LENGTH:
+        raise LogicError('key/value total too long: {} bytes'.format(len(key) + len(value)))
+
+
+@op('app_local_put')
+def app_local_put(context, immediates):
+    context.require_mode(True)
+    value = context.pop()
+    key = context.pop_bytes()
+    address = context.account_reference(context.pop())
+    check_key_value(key, value)
+    local_state(context, address, context.app_id)[key] = value
+
+
+@op('app_global_put')
+def app_global_put(context, immediates):
+    context.require_mode(True)
+    value = context.pop()
+    key = context.pop_bytes()
+    check_key_value(key, value)
+    context.current_app().global_state[key] = value
+
+
+@op('app_local_del')
+def app_local_del(context, immediates):
+    context.require_mode(True)
+    key = context.pop_bytes()
+    address = context.account_reference(context.pop())
+    local_state(context, address, context.app_id).pop(key, None)
+
+
+@op('app_global_del')
+def app_global_del(context, immediates):
+    context.require_mode(True)
+    context.current_app().global_state.pop(context.pop_bytes(), None)
+
+
+@op('asset_holding_get')
+def asset_holding_get(context, immediates):
+    context.require_mode(True)
+    asset_id = context.asset_reference(context.pop_uint())
+    address = context.account_reference(context.pop())
+    holding = context.ledger.account(address).assets.get(asset_id)
+    if holding is None:
+        context.push(0)
+        context.push(0)
+        return
+    context.push(holding[0] if immediates[0] == 'AssetBalance' else int(holding[1]))
+    context.push(1)
+
+
+@op('asset_params_get')
+def asset_params_get(context, immediates):
+    context.require_mode(True)
+    params = context.ledger.assets.get(context.asset_reference(context.pop_uint()))
+    if params is None:
+        context.push(0)
+        context.push(0)
+        return
+    context.push(params[immediates[0]])
+    context.push(1)
+
+
+@op('app_params_get')
+def app_params_get(context, immediates):
+    context.require_mode(True)
+    app_id = context.app_reference(context.pop_uint())
+    app = context.ledger.apps.get(app_id)
+    if app is None:
+        context.push(0)
+        context.push(0)
+        return
+    values = {'AppApprovalProgram': app.approval_program, 'AppClearStateProgram': app.clear_program,
+              'AppGlobalNumUint': app.global_schema[0], 'AppGlobalNumByteSlice': app.global_schema[1],
+              'AppLocalNumUint': app.local_schema[0], 'AppLocalNumByteSlice': app.local_schema[1],
+              'AppExtraProgramPages': app.extra_pages, 'AppCreator': app.creator,
+              'AppAddress': application_public_key(app_id)}
+    context.push(values[immediates[0]])
+    context.push(1)
+
+
+@op('log')
+def log(context, immediates):
+    context.require_mode(True)
+    if len(context.result.logs) >= 32:
+        raise LogicError('too many log calls')
+    context.result.logs.append(context.pop_bytes())
+
+
+@op('itxn_begin')
+def itxn_begin(context, immediates):
+    context.require_mode(True)
+    if context.inner is not None:
+        raise LogicError('itxn_begin without itxn_submit')
+    context.inner = {'Sender': application_public_key(context.app_id),
+                     'FirstValid': context.txn.get('FirstValid', 0), 'LastValid': context.txn.get('LastValid', 0)}
+
+
+@op('itxn_field')
+def itxn_field(context, immediates):
+    if context.inner is None:
+        raise LogicError('itxn_field without itxn_begin')
+    name = immediates[0]
+    value = context.pop()
+    if name == 'Type':
+        if value.decode() not in INNER_TYPES:
+            raise LogicError('{} is not a valid inner transaction type'.format(value))
+        context.inner['TypeEnum'] = TYPE_ENUMS[value.decode()]
+    elif name == 'TypeEnum':
+        if TYPE_NAMES.get(value) not in INNER_TYPES:
+            raise LogicError('{} is not a valid inner transaction type'.format(value))
+        context.inner['TypeEnum'] = value
+    elif name in ('XferAsset', 'FreezeAsset', 'ConfigAsset'):
+        context.inner[name] = context.asset_reference(value) if value else 0
+    elif name in ADDRESS_FIELDS:
+        if not isinstance(value, bytes) or len(value) != 32:
+            raise LogicError('{} must be a 32 byte address'.format(name))
+        context.inner[name] = value
+    elif name in ARRAY_FIELDS or name in ('ApplicationID', 'OnCompletion', 'GroupIndex', 'FirstValid',
+                                          'LastValid', 'Lease'):
+        raise LogicError('{} can not be set in an inner transaction'.format(name))
+    else:
+        expected = bytes if name in BYTES_FIELDS else int
+        if not isinstance(value, expected):
+            raise LogicError('{} has the wrong type'.format(name))
+        context.inner[name] = value
+
+
+@op('itxn_submit')
+def itxn_submit(context, immediates):
+    inner = context.inner
+    if inner is None:
+        raise LogicError('itxn_submit without itxn_begin')
+    if inner['Sender'] != application_public_key(context.app_id):
+        raise LogicError('inner transaction sender must be the application address')
+    context.inner_count += 1
+    if context.inner_count > MAX_INNER_TXNS:
+        raise LogicError('too many inner transactions')
+    context.inner = None
+    inner_result = TxnResult(inner)
+    ledger = context.ledger
+    if 'Fee' not in inner:
+        inner['Fee'] = MIN_TXN_FEE if ledger._fee_credit < MIN_TXN_FEE else 0
+    shortfall = MIN_TXN_FEE - inner['Fee']
+    if shortfall > 0:
+        if ledger._fee_credit < shortfall:
+            raise LogicError('inner transaction fee too small')
+        ledger._fee_credit -= shortfall
+    ledger._debit(inner['Sender'], inner['Fee'])
+    ledger._apply(inner, inner_result)
+    context.result.inner_txns.append(inner)
+    context.last_inner = inner
+
+
+@op('gaid')
+def gaid(context, immediates):
+    context.push(created_id(context, immediates[0]))
+
+
+@op('gaids')
+def gaids(context, immediates):
+    context.push(created_id(context, context.pop_uint()))
+
+
+def created_id(context, group_index):
+    if group_index >= context.index:
+        raise LogicError('gaid can only look at earlier transactions, not {}'.format(group_index))
+    fields = context.group[group_index]
+    created = fields.get('CreatedAssetID') or fields.get('CreatedApplicationID')
+    if not created:
+        raise LogicError('transaction {} did not create an asset or application'.format(group_index))
+    return created
+
+
+@op('itxn')
+def itxn(context, immediates):
+    if context.last_inner is None:
+        raise LogicError('no inner transaction submitted')
+    context.push(read_txn_field(context, context.last_inner, immediates[0]))
+
+
+@op('itxna')
+def itxna(context, immediates):
+    if context.last_inner is None:
+        raise LogicError('no inner transaction submitted')
+    context.push(read_txn_field(context, context.last_inner, immediates[0], immediates[1]))
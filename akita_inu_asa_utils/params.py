@@ -0,0 +1,128 @@
+'''
+Round-aware cache of suggested transaction parameters. Params from algod stay valid for 1000
+rounds, so they can be reused for a few rounds instead of being fetched before every transaction.
+Note that two identical transactions built from the same cached params share a txid; add a note
+or lease when the same transaction is intentionally sent twice.
+'''
+import copy
+import threading
+import time
+import weakref
+
+DEFAULT_MAX_ROUNDS = 10
+# used to estimate how many rounds have passed when no background refresh is running
+ROUND_SECONDS = 4.5
+
+
+class SuggestedParamsProvider:
+    """
+        Serves cached suggested params, refreshing them once max_rounds rounds have passed
+            Args:
+                client (AlgodClient): algod client
+                max_rounds (int): number of rounds cached params are reused for
+                round_seconds (float): expected block time used to estimate elapsed rounds
+    """
+
+    def __init__(self, client, max_rounds=DEFAULT_MAX_ROUNDS, round_seconds=ROUND_SECONDS):
+        self.client = client
+        self.max_rounds = max_rounds
+        self.round_seconds = round_seconds
+        self.round = 0
+        self._params = None
+        self._fetched_at = 0
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopped = threading.Event()
+
+    def get(self):
+        """
+            Returns:
+                SuggestedParams: a copy of the cached params, so callers are free to modify it
+        """
+        with self._lock:
+            if self._params is None or self._stale():
+                self._refresh()
+            return copy.copy(self._params)
+
+    def observe_round(self, round_number):
+        """
+            Records that the network has reached round_number
+                Args:
+                    round_number (int): last round known to be committed
+        """
+        with self._lock:
+            self.round = max(self.round, round_number)
+
+    def invalidate(self):
+        with self._lock:
+            self._params = None
+
+    def start(self):
+        """
+            Keeps the params fresh from a background thread that follows new rounds
+        """
+        if self._thread is None:
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        self._thread = None
+
+    def _stale(self):
+        estimated_round = self._params.first + int((time.monotonic() - self._fetched_at) / self.round_seconds)
+        return max(self.round, estimated_round) - self._params.first >= self.max_rounds
+
+    def _refresh(self):
+        self._params = self.client.suggested_params()
+        self._fetched_at = time.monotonic()
+        self.round = max(self.round, self._params.first)
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                status = self.client.status_after_block(self.round)
+            except Exception:
+                self._stopped.wait(self.round_seconds)
+                continue
+            self.observe_round(status['last-round'])
+            with self._lock:
+                if self._params is None or self._stale():
+                    self._refresh()
+
+
+_providers = weakref.WeakKeyDictionary()
+_providers_lock = threading.Lock()
+
+
+def suggested_params_provider(client):
+    """
+        Returns the shared SuggestedParamsProvider of client, creating it on first use
+    """
+    with _providers_lock:
+        provider = _providers.get(client)
+        if provider is None:
+            provider = SuggestedParamsProvider(client)
+            _providers[client] = provider
+    return provider
+
+
+def get_suggested_params(client):
+    """
+        Drop-in replacement for client.suggested_params() served from the client's shared provider.
+        Unlike fresh params, these can be the same for several rounds: a transaction rebuilt from them
+        after the first one confirmed has the same txid and algod rejects it as already in the ledger,
+        without evaluating it. Use client.suggested_params(), or a note or lease, to resend on purpose.
+    """
+    return suggested_params_provider(client).get()
+
+
+def resolve_params(params):
+    """
+        Lets the signed txn helpers take either SuggestedParams or a SuggestedParamsProvider
+    """
+    if isinstance(params, SuggestedParamsProvider):
+        return params.get()
+    return params
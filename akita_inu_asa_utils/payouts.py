@@ -0,0 +1,261 @@
+'''
+Bulk payouts: sends Algo or ASA amounts to many receivers. Transactions are built from shared
+cached suggested params, packed into atomic groups of up to 16, signed and submitted from a
+bounded pool of worker threads, and confirmed together by one ConfirmationTracker.
+
+    python -m akita_inu_asa_utils.payouts payouts.csv [--config DeveloperConfig.json] [--report report.csv]
+
+The sender mnemonic is read from the PAYOUT_MNEMONIC environment variable. Each CSV row is
+receiver,amount[,asset_id]; an empty or 0 asset_id pays Algo.
+
+Groups stay valid for `timeout` rounds past the age of the cached params they're built from. A payout is reported failed only once its group can no
+longer confirm; one whose outcome isn't known before its last valid round is reported unknown, and
+must be looked up by txid rather than sent again.
+'''
+import argparse
+import csv
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from algosdk import account, mnemonic
+from algosdk.future import transaction
+
+from akita_inu_asa_utils import ConfirmationTracker, get_algod_client, load_developer_config, \
+    suggested_params_provider
+
+MAX_GROUP_SIZE = 16
+
+
+class Payout:
+    def __init__(self, receiver, amount, asset_id=0):
+        self.receiver = receiver
+        self.amount = int(amount)
+        self.asset_id = int(asset_id or 0)
+        self.txid = None
+        self.last_valid = None
+        self.status = 'pending'
+        self.error = None
+        self.confirmed_round = None
+
+
+def read_payouts(file_path):
+    """
+        Yields the payouts of a receiver,amount[,asset_id] CSV file, lines starting with # and a
+        receiver header are skipped
+    """
+    with open(file_path, newline='') as f:
+        for row in csv.reader(f):
+            if not row or row[0].startswith('#') or row[0].strip().lower() == 'receiver':
+                continue
+            yield Payout(*[value.strip() for value in row[:3]])
+
+
+def write_report(file_path, payouts):
+    with open(file_path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['receiver', 'amount', 'asset_id', 'status', 'txid', 'last_valid', 'confirmed_round',
+                         'error'])
+        for payout in payouts:
+            writer.writerow([payout.receiver, payout.amount, payout.asset_id, payout.status, payout.txid,
+                             payout.last_valid, payout.confirmed_round, payout.error or ''])
+
+
+class PayoutReport:
+    def __init__(self, payouts, groups, seconds):
+        self.payouts = payouts
+        self.groups = groups
+        self.seconds = seconds
+        self.confirmed = sum(1 for payout in payouts if payout.status == 'confirmed')
+        # sent, but neither confirmed nor expired when the run ended
+        self.unknown = sum(1 for payout in payouts if payout.status == 'unknown')
+        self.failed = len(payouts) - self.confirmed - self.unknown
+
+    @property
+    def transactions_per_second(self):
+        return self.confirmed / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return "{} payouts in {} groups: {} confirmed, {} failed, {} unknown in {:.2f}s ({:.1f} txn/s)".format(
+            len(self.payouts), self.groups, self.confirmed, self.failed, self.unknown, self.seconds,
+            self.transactions_per_second)
+
+
+class PayoutEngine:
+    """
+        Sends payouts in groups of up to 16 transactions
+            Args:
+                client (AlgodClient): algod client
+                private_key (str): private key of the paying account
+                group_size (int): transactions per atomic group, at most 16
+                concurrency (int): number of groups signed and submitted at the same time
+                timeout (int): rounds to wait for each group's confirmation, after which it expires
+                signer (callable): signs a list of transactions, defaults to signing with private_key
+    """
+
+    def __init__(self, client, private_key, group_size=MAX_GROUP_SIZE, concurrency=8, timeout=5, signer=None):
+        if not 1 <= group_size <= MAX_GROUP_SIZE:
+            raise ValueError("group_size must be between 1 and {}".format(MAX_GROUP_SIZE))
+        self.client = client
+        self.private_key = private_key
+        self.sender = account.address_from_private_key(private_key)
+        self.group_size = group_size
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.signer = signer or self.sign
+        self.params = suggested_params_provider(client)
+
+    def sign(self, transactions):
+        return [txn.sign(self.private_key) for txn in transactions]
+
+    def build_transaction(self, payout, params, note=None):
+        if payout.asset_id:
+            return transaction.AssetTransferTxn(self.sender, params, payout.receiver, payout.amount,
+                                                payout.asset_id, note=note)
+        return transaction.PaymentTxn(self.sender, params, payout.receiver, payout.amount, note=note)
+
+    def groups(self, payouts):
+        """
+            Yields (payouts, unsigned transactions) per group, grouped with assign_group_id
+        """
+        seen = set()
+        batch = []
+        for index, payout in enumerate(payouts):
+            batch.append((index, payout))
+            if len(batch) == self.group_size:
+                yield self._build_group(batch, seen)
+                batch = []
+        if batch:
+            yield self._build_group(batch, seen)
+
+    def _build_group(self, batch, seen):
+        params = self.params.get()
+        # a group still valid after its wait would leave its outcome unknown
+        params.last = min(params.last, params.first + self.params.max_rounds + self.timeout)
+        transactions = []
+        for index, payout in batch:
+            key = (payout.receiver, payout.amount, payout.asset_id, params.first)
+            # identical payouts built from the same params would share a txid
+            note = None if key not in seen else 'payout {}'.format(index).encode()
+            seen.add(key)
+            transactions.append(self.build_transaction(payout, params, note))
+        if len(transactions) > 1:
+            transactions = transaction.assign_group_id(transactions)
+        return [payout for _, payout in batch], transactions
+
+    def run(self, payouts):
+        """
+            Sends all payouts and waits for their confirmation
+                Args:
+                    payouts (iterable<Payout>): payouts to send
+                Returns:
+                    PayoutReport: per payout status and throughput
+        """
+        start = time.perf_counter()
+        sent = []
+        confirmations = []
+        lock = threading.Lock()
+        # waits one round past the validity window, so an unconfirmed group has expired by then
+        tracker = ConfirmationTracker(self.client, self.params.max_rounds + self.timeout + 2).start()
+        group_count = 0
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+                in_flight = set()
+                for group_payouts, transactions in self.groups(payouts):
+                    if len(in_flight) >= self.concurrency:
+                        _, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    group_count += 1
+                    sent.extend(group_payouts)
+                    in_flight.add(pool.submit(self._send_group, group_payouts, transactions, tracker,
+                                              confirmations, lock))
+            for group_payouts, future in confirmations:
+                self._confirmed(group_payouts, future)
+        finally:
+            tracker.stop()
+        return PayoutReport(sent, group_count, time.perf_counter() - start)
+
+    def _send_group(self, payouts, transactions, tracker, confirmations, lock):
+        for payout, txn in zip(payouts, transactions):
+            payout.txid = txn.get_txid()
+            payout.last_valid = txn.last_valid_round
+        try:
+            signed = self.signer(transactions)
+            self.client.send_transactions(signed)
+        except Exception as e:
+            # a dropped connection may still have delivered the group, a rejection didn't
+            status = 'unknown' if isinstance(e, OSError) else 'failed'
+            for payout in payouts:
+                payout.status = status
+                payout.error = str(e)
+            return
+        for payout in payouts:
+            payout.status = 'submitted'
+        future = tracker.track(transactions[0].get_txid())
+        with lock:
+            confirmations.append((payouts, future))
+
+    def _confirmed(self, payouts, future):
+        exception = future.exception()
+        if exception is None:
+            status, pending_txn = 'confirmed', future.result()
+        elif 'pool error' in str(exception):
+            status, pending_txn = 'failed', None
+        else:
+            status, pending_txn = self._outcome(payouts[0].txid, payouts[0].last_valid)
+        for payout in payouts:
+            payout.status = status
+            if pending_txn is not None:
+                payout.confirmed_round = pending_txn.get('confirmed-round')
+            else:
+                payout.error = str(exception)
+
+    def _outcome(self, txid, last_valid):
+        # the tracker gave up on txid, which has failed only if it's unconfirmed past its last valid round
+        try:
+            if self.client.status()['last-round'] <= last_valid:
+                return 'unknown', None
+            pending_txn = self.client.pending_transaction_info(txid)
+        except Exception:
+            return 'unknown', None
+        if pending_txn.get('confirmed-round', 0) > 0:
+            return 'confirmed', pending_txn
+        return 'failed', None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Send bulk Algo/ASA payouts from a CSV file")
+    parser.add_argument('payouts', help="CSV file of receiver,amount[,asset_id]")
+    parser.add_argument('--config', default='DeveloperConfig.json', help="developer config with algod settings")
+    parser.add_argument('--report', help="CSV file to write the per payout status to")
+    parser.add_argument('--concurrency', type=int, default=8, help="groups in flight at once")
+    parser.add_argument('--group-size', type=int, default=MAX_GROUP_SIZE, help="transactions per group")
+    parser.add_argument('--sign-workers', type=int, help="sign on this many worker processes")
+    args = parser.parse_args(argv)
+
+    config = load_developer_config(args.config)
+    client = get_algod_client(config['algodToken'], config['algodAddress'])
+    private_key = mnemonic.to_private_key(os.environ['PAYOUT_MNEMONIC'])
+    pool = None
+    if args.sign_workers:
+        from akita_inu_asa_utils.signing import SigningPool
+        pool = SigningPool([private_key], workers=args.sign_workers)
+    engine = PayoutEngine(client, private_key, args.group_size, args.concurrency,
+                          signer=pool.sign if pool else None)
+    try:
+        report = engine.run(read_payouts(args.payouts))
+    finally:
+        if pool:
+            pool.close()
+    print(report)
+    if report.unknown:
+        print("unknown payouts may still confirm until their last valid round, look their txid up before "
+              "sending them again")
+    if args.report:
+        write_report(args.report, report.payouts)
+    return 0 if report.failed == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,114 @@
+'''
+Process-wide registry of build artifacts. Each compiled program and schema under a build
+directory is read once, along with the LogicSigAccount and address derived from a program, and
+served from memory afterwards. Entries are reloaded when the files they came from change
+(modification time, size or inode, so an atomic replace is noticed too).
+
+    program_registry().logic_sig('stateless_escrow_timed_lock.bin').address()
+'''
+import os
+import threading
+
+from . import artifacts
+
+# kinds of cached values
+PROGRAM = 'program'
+SCHEMA = 'schema'
+LOGIC_SIG = 'logic_sig'
+ADDRESS = 'address'
+
+
+def file_stamp(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+class ProgramRegistry:
+    """
+        Cache of the programs, schemas and LogicSigAccounts of build directories
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def _sources(self, kind, name, build_dir):
+        manifest = os.path.join(build_dir, artifacts.MANIFEST)
+        if kind == SCHEMA:
+            return [os.path.join(build_dir, name), manifest]
+        return [os.path.join(build_dir, name + artifacts.PROGRAM_SUFFIX),
+                os.path.join(build_dir, name + artifacts.LEGACY_SUFFIX), manifest]
+
+    def _get(self, kind, file_path, build_dir, loader):
+        build_dir = os.path.abspath(build_dir)
+        name = artifacts.artifact_name(file_path) if kind != SCHEMA else file_path
+        key = (kind, build_dir, name)
+        stamp = tuple(file_stamp(path) for path in self._sources(kind, name, build_dir))
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and entry[0] == stamp:
+            return entry[1]
+        value = loader(name, build_dir)
+        # stamped with the files as they were before loading, so a write racing the load is picked up next time
+        with self._lock:
+            self._entries[key] = (stamp, value)
+        return value
+
+    def program(self, file_path, build_dir=artifacts.BUILD_DIR):
+        """
+            Returns:
+                bytes: compiled program stored as file_path (e.g. approval.bin) in build_dir
+        """
+        return self._get(PROGRAM, file_path, build_dir, artifacts.read_program)
+
+    def schema(self, file_path, build_dir=artifacts.BUILD_DIR):
+        """
+            Returns:
+                dict: num_ints and num_bytes of the schema file_path (e.g. globalSchema)
+        """
+        return dict(self._get(SCHEMA, file_path, build_dir, artifacts.read_schema))
+
+    def logic_sig(self, file_path, build_dir=artifacts.BUILD_DIR):
+        """
+            Returns the shared LogicSigAccount of a compiled program. It is not signed or delegated,
+            and callers must not sign it; create a LogicSigAccount of their own for delegation
+                Returns:
+                    LogicSigAccount: contract account of the program
+        """
+        def load(name, build_dir):
+            from algosdk.future import transaction
+            return transaction.LogicSigAccount(self.program(name + artifacts.PROGRAM_SUFFIX, build_dir))
+        return self._get(LOGIC_SIG, file_path, build_dir, load)
+
+    def address(self, file_path, build_dir=artifacts.BUILD_DIR):
+        """
+            Returns:
+                str: contract account address of a compiled program
+        """
+        # LogicSigAccount.address hashes the program each call
+        return self._get(ADDRESS, file_path, build_dir,
+                         lambda name, build_dir: self.logic_sig(file_path, build_dir).address())
+
+    def invalidate(self):
+        with self._lock:
+            self._entries = {}
+
+
+_registry = ProgramRegistry()
+
+
+def program_registry():
+    """
+        Returns the process-wide ProgramRegistry used by load_compiled, load_schema and load_logic_sig
+    """
+    return _registry
+
+
+def load_logic_sig(file_path):
+    """
+        Returns the shared LogicSigAccount of a compiled program in build/, see ProgramRegistry.logic_sig
+    """
+    return _registry.logic_sig(file_path)
@@ -0,0 +1,130 @@
+'''
+Process-pool transaction signing. ed25519 signing and msgpack encoding of thousands of
+transactions is CPU bound, so SigningPool fans it out over worker processes. Keys are sent to
+each worker once, when it starts; per transaction only the msgpack bytes go to the worker and
+the 64 byte signature comes back, and results are returned in submission order.
+
+    with SigningPool([private_key]) as pool:
+        signed = pool.sign(transactions)
+'''
+import base64
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from algosdk import account, constants, encoding
+from algosdk.future import transaction
+from nacl.signing import SigningKey
+
+DEFAULT_CHUNK_SIZE = 256
+
+# address -> SigningKey, filled once per worker process by _load_keys
+_worker_keys = {}
+
+
+def _load_keys(private_keys):
+    for private_key in private_keys:
+        _worker_keys[account.address_from_private_key(private_key)] = \
+            SigningKey(base64.b64decode(private_key)[:constants.key_len_bytes])
+
+
+def _sign_chunk(chunk):
+    return [_worker_keys[signer].sign(constants.txid_prefix + encoded).signature for signer, encoded in chunk]
+
+
+def encode_signed(encoded_txn, signature, authorizing_address=None):
+    """
+        Builds the canonical msgpack of a signed transaction from its encoded transaction, as
+        algosdk.encoding.msgpack_encode(SignedTransaction) would
+            Args:
+                encoded_txn (bytes): msgpack of the unsigned transaction
+                signature (bytes): ed25519 signature
+                authorizing_address (str): signer, if it isn't the sender
+            Returns:
+                bytes: msgpack of the signed transaction
+    """
+    # keys of the canonical encoding are sorted: sgnr, sig, txn
+    if authorizing_address is None:
+        prefix = b'\x82'
+    else:
+        prefix = b'\x83\xa4sgnr\xc4\x20' + encoding.decode_address(authorizing_address)
+    return prefix + b'\xa3sig\xc4\x40' + signature + b'\xa3txn' + encoded_txn
+
+
+class SigningPool:
+    """
+        Signs transactions on a pool of worker processes
+            Args:
+                private_keys (list<str>): keys the pool can sign with, the key is picked by sender
+                workers (int): number of worker processes, defaults to the number of cores
+                chunk_size (int): transactions sent to a worker per task
+    """
+
+    def __init__(self, private_keys, workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        if isinstance(private_keys, str):
+            private_keys = [private_keys]
+        self.addresses = {account.address_from_private_key(private_key) for private_key in private_keys}
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_load_keys,
+                                         initargs=(list(private_keys),))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._pool.shutdown()
+
+    def signatures(self, transactions, authorizing_address=None):
+        """
+            Signs transactions on the workers
+                Args:
+                    transactions (list<Transaction>): unsigned transactions
+                    authorizing_address (str): account signing for rekeyed senders, defaults to each sender
+                Returns:
+                    tuple: msgpack encoded transactions and their signatures, in order
+        """
+        items = []
+        for txn in transactions:
+            signer = authorizing_address or txn.sender
+            if signer not in self.addresses:
+                raise KeyError("no key loaded for " + signer)
+            items.append((signer, base64.b64decode(encoding.msgpack_encode(txn))))
+        chunks = [items[i:i + self.chunk_size] for i in range(0, len(items), self.chunk_size)]
+        signatures = []
+        for chunk_signatures in self._pool.map(_sign_chunk, chunks):
+            signatures.extend(chunk_signatures)
+        return [encoded for _, encoded in items], signatures
+
+    def sign(self, transactions, authorizing_address=None):
+        """
+            Returns:
+                list<SignedTransaction>: same as [txn.sign(private_key) for txn in transactions]
+        """
+        _, signatures = self.signatures(transactions, authorizing_address)
+        signed = []
+        for txn, signature in zip(transactions, signatures):
+            signer = authorizing_address if authorizing_address != txn.sender else None
+            signed.append(transaction.SignedTransaction(txn, base64.b64encode(signature).decode(), signer))
+        return signed
+
+    def sign_encoded(self, transactions, authorizing_address=None):
+        """
+            Returns:
+                list<bytes>: msgpack of the signed transactions, concatenate them for send_raw_transaction
+        """
+        encoded_txns, signatures = self.signatures(transactions, authorizing_address)
+        return [encode_signed(encoded_txn, signature,
+                              authorizing_address if authorizing_address != txn.sender else None)
+                for txn, encoded_txn, signature in zip(transactions, encoded_txns, signatures)]
+
+
+def send_encoded(client, encoded_signed_txns):
+    """
+        Sends a group of transactions signed by SigningPool.sign_encoded
+            Returns:
+                str: id of the first transaction
+    """
+    return client.send_raw_transaction(base64.b64encode(b''.join(encoded_signed_txns)))
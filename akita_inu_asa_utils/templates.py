@@ -0,0 +1,147 @@
+'''
+Pre-serialized transaction templates. A TransactionTemplate encodes the invariant fields of a
+transaction once and only packs the fields that change per request (sender, amounts, validity
+rounds, group ID), producing the same canonical msgpack algosdk would for the full transaction.
+'''
+import hashlib
+
+import msgpack
+from algosdk import constants, encoding
+
+# canonical msgpack omits empty fields, so slots are filled with non-empty placeholders
+ADDRESS_PLACEHOLDER = b'\x01' * 32
+UINT_PLACEHOLDER = 1
+GROUP_KEY = 'grp'
+
+
+def pack(value):
+    return msgpack.packb(value, use_bin_type=True)
+
+
+def canonical(fields):
+    """
+        Sorted copy of a dictified transaction without zero values, like algosdk's msgpack_encode
+    """
+    return {key: canonical(value) if isinstance(value, dict) else value
+            for key, value in sorted(fields.items()) if value or isinstance(value, dict)}
+
+
+def map_header(size):
+    if size < 16:
+        return bytes([0x80 | size])
+    return b'\xde' + size.to_bytes(2, 'big')
+
+
+def checksum(data):
+    # hashlib's sha512_256 is several times faster than algosdk's pycryptodome one, when OpenSSL has it
+    return hashlib.new('sha512_256', data).digest()
+
+
+try:
+    checksum(b'')
+except ValueError:
+    checksum = encoding.checksum
+
+
+def txid_bytes(encoded_txn):
+    return checksum(constants.txid_prefix + encoded_txn)
+
+
+def group_id(txids):
+    """
+        Same group ID as transaction.calculate_group_id, from raw 32 byte txids
+    """
+    return checksum(constants.tgid_prefix + pack({'txlist': list(txids)}))
+
+
+class TransactionTemplate:
+    """
+        Transaction with some fields left open
+            Args:
+                txn (Transaction): transaction with placeholder values in the open fields
+                slots (dict): msgpack key of each open field (e.g. 'snd', 'aamt', 'fv') -> slot name
+    """
+
+    def __init__(self, txn, slots):
+        self.slots = dict(slots)
+        fields = canonical(txn.dictify())
+        fields.pop(GROUP_KEY, None)
+        missing = set(self.slots) - set(fields)
+        if missing:
+            raise ValueError("slots {} are empty in the template transaction".format(sorted(missing)))
+        # fields before and after the group ID in the sorted key order of the canonical encoding,
+        # as (packed key, slot name) for open fields and (packed key and value, None) for fixed ones
+        self.before = []
+        self.after = []
+        for key in sorted(fields):
+            pieces = self.before if key < GROUP_KEY else self.after
+            if key in self.slots:
+                pieces.append((pack(key), self.slots[key]))
+            else:
+                pieces.append((pack(key) + pack(fields[key]), None))
+        self.group_key = pack(GROUP_KEY)
+
+    def split(self, packed_values):
+        """
+            Packs the fields around the group ID
+                Args:
+                    packed_values (dict): slot name -> packed value or None, from pack_values
+                Returns:
+                    tuple: number of fields, packed fields before the group ID and after it
+        """
+        count = 0
+        packed = []
+        for pieces in (self.before, self.after):
+            parts = []
+            for piece, slot in pieces:
+                if slot is None:
+                    parts.append(piece)
+                else:
+                    value = packed_values[slot]
+                    # zero and empty values are omitted, as algosdk does
+                    if value is None:
+                        continue
+                    parts.append(piece + value)
+            count += len(parts)
+            packed.append(b''.join(parts))
+        return count, packed[0], packed[1]
+
+    def encode(self, values, group=None):
+        """
+            Packs the transaction
+                Args:
+                    values (dict): slot name -> value, addresses as 32 byte public keys
+                    group (bytes): group ID, left out if None
+                Returns:
+                    bytes: canonical msgpack of the transaction
+        """
+        count, before, after = self.split(pack_values(values))
+        if not group:
+            return map_header(count) + before + after
+        return map_header(count + 1) + before + self.group_key + pack(group) + after
+
+
+def pack_values(values):
+    return {slot: pack(value) if value else None for slot, value in values.items()}
+
+
+class GroupTemplate:
+    """
+        Atomic group of TransactionTemplates sharing one set of slot values
+    """
+
+    def __init__(self, templates):
+        self.templates = templates
+
+    def encode(self, values):
+        """
+            Returns:
+                list<bytes>: canonical msgpack of each transaction, with the group ID set
+        """
+        packed_values = pack_values(values)
+        splits = [template.split(packed_values) for template in self.templates]
+        # the txids are of the transactions without the group ID
+        group = pack(group_id([txid_bytes(map_header(count) + before + after)
+                               for count, before, after in splits]))
+        return [map_header(count + 1) + before + template.group_key + group + after
+                for template, (count, before, after) in zip(self.templates, splits)]
@@ -1,137 +1,37 @@
-from algosdk.v2client import algod, indexer
+'''
+Transaction helpers: signed transaction builders for the app and asset calls the contracts use,
+and waiting for confirmations one by one or in batches with ConfirmationTracker.
+'''
+import logging
+import threading
+from concurrent.futures import Future
+
+from algosdk import account
 from algosdk.future import transaction
-from algosdk import encoding, account, mnemonic
 
+from .accounts import get_account_snapshot
+from .params import get_suggested_params, resolve_params
 
-from joblib import dump, load
-import json
-import os
-import base64
-
-BALANCE_PER_ASSET = 100000
-
-
-def get_application_address(app_id):
-    return encoding.encode_address(encoding.checksum(b'appID' + app_id.to_bytes(8, 'big')))
-
-
-def check_build_dir():
-    if not os.path.exists('build'):
-        os.mkdir('build')
-
-
-def get_asset_balance(client, public_key, asset_id):
-    for asset in client.account_info(public_key)['assets']:
-        if asset['asset-id'] == asset_id:
-            return asset['amount']
-    return 0
-
-
-def is_opted_into_asset(client, public_key, asset_id):
-    for asset in client.account_info(public_key)['assets']:
-        print(asset['asset-id'])
-        if asset['asset-id'] == asset_id:
-            return True
-    return False
-
-
-def get_algo_balance(client, public_key):
-    return client.account_info(public_key)['amount']
-
-def get_min_algo_balance(number_assets):
-    return BALANCE_PER_ASSET + BALANCE_PER_ASSET * number_assets
-
-def generate_new_account():
-    private_key, address = account.generate_account()
-    return mnemonic.from_private_key(private_key), private_key, address
-
+logger = logging.getLogger(__name__)
 
 def delete_all_apps(client, private_key):
     public_key = account.address_from_private_key(private_key)
-    apps = client.account_info(public_key)['created-apps']
-    for app in apps:
-        app_id = app['id']
-        signed_txn, txn_id = delete_app_signed_txn(private_key, public_key, client.suggested_params(), app_id)
+    params = get_suggested_params(client)
+    tracker = ConfirmationTracker(client, 5)
+    deletions = {}
+    for app_id in get_account_snapshot(client, public_key).created_apps:
+        signed_txn, txn_id = delete_app_signed_txn(private_key, public_key, params, app_id)
         try:
             client.send_transactions([signed_txn])
-            wait_for_txn_confirmation(client, txn_id, 5)
-            print("app: " + str(app_id) + " deleted")
+            deletions[app_id] = tracker.track(txn_id)
         except:
             print("app: " + str(app_id) + " not deleted")
-
-
-def compile_program(client, source_code, file_path=None):
-    compile_response = client.compile(source_code)
-    if file_path == None:
-        return base64.b64decode(compile_response['result'])
-    else:
-        check_build_dir()
-        dump(base64.b64decode(compile_response['result']), 'build/' + file_path)
-
-
-# read user local state
-def read_local_state(client, addr, app_id):
-    results = client.account_info(addr)
-    output = {}
-    for app in results['apps-local-state']:
-        if app['id'] == app_id:
-            if 'key-value' in app:
-                for key_value in app['key-value']:
-                    if key_value['value']['type'] == 1:
-                        value = key_value['value']['bytes']
-                    else:
-                        value = key_value['value']['uint']
-                    output[base64.b64decode(key_value['key']).decode()] = value
-                return output
-
-
-# read app global state
-def read_global_state(client, addr, app_id):
-    results = client.account_info(addr)
-    output = {}
-    apps_created = results['created-apps']
-    for app in apps_created:
-        if app['id'] == app_id :
-            for key_value in app['params']['global-state']:
-                if key_value['value']['type'] == 1:
-                    value = base64.b64decode(key_value['value']['bytes'])
-                else:
-                    value = key_value['value']['uint']
-                output[base64.b64decode(key_value['key']).decode()] = value
-            return output
-
-
-def pretty_print_state(state):
-    for keyvalue in state:
-        print(base64.b64decode(keyvalue['key']))
-        print(keyvalue['value'])
-    print("\n\n\n")
-
-
-def get_key_from_state(state, key):
-    for i in range(0, len(state)):
-        found_key = base64.b64decode(state[i]['key'])
-        if found_key == key:
-            if state[i]['value']['type'] == 1:
-                return base64.b64decode(state[i]['value']['bytes'])
-            elif state[i]['value']['type'] == 2:
-                return state[i]['value']['uint']
-
-
-def dump_teal_assembly(file_path, program_fn_pointer):
-    check_build_dir()
-    with open('build/' + file_path, 'w') as f:
-        compiled = program_fn_pointer()
-        f.write(compiled)
-
-
-def load_compiled(file_path):
-    try:
-        compiled = load('build/' + file_path)
-    except:
-        print("Error reading source file...exiting")
-        exit(-1)
-    return compiled
+    tracker.wait_all()
+    for app_id, future in deletions.items():
+        if future.exception() is None:
+            print("app: " + str(app_id) + " deleted")
+        else:
+            print("app: " + str(app_id) + " not deleted")
 
 
 def asset_id_from_create_txn(client, txn_id):
@@ -140,26 +40,20 @@ def asset_id_from_create_txn(client, txn_id):
     return asset_id
 
 
-def load_developer_config(file_path='DeveloperConfig.json'):
-    fp = open(file_path)
-    return json.load(fp)
-
-
-def get_algod_client(token, address):
-    return algod.AlgodClient(token, address)
-
-
-def write_schema(file_path, num_ints, num_bytes):
-    f = open('build/' + file_path, "w")
-    json.dump({"num_ints": num_ints,
-               "num_bytes": num_bytes}, f)
-    f.close()
-
-
-def load_schema(file_path):
-    f = open('build/' + file_path, 'r')
-    stateJSON = json.load(f)
-    return transaction.StateSchema(stateJSON['num_ints'], stateJSON['num_bytes'])
+def check_pending_txn(pending_txn):
+    """
+        Interprets a pending_transaction_info response
+            Args:
+                pending_txn (dict): pending transaction information
+            Returns:
+                dict: pending_txn once it is confirmed, None while it is still pending, or throws the
+                    pool error if the transaction was rejected
+    """
+    if pending_txn.get("confirmed-round", 0) > 0:
+        return pending_txn
+    if pending_txn.get("pool-error"):
+        raise Exception('pool error: {}'.format(pending_txn["pool-error"]))
+    return None
 
 
 def wait_for_txn_confirmation(client, transaction_id, timeout):
@@ -181,17 +75,186 @@ def wait_for_txn_confirmation(client, transaction_id, timeout):
             pending_txn = client.pending_transaction_info(transaction_id)
         except Exception:
             return
-        if pending_txn.get("confirmed-round", 0) > 0:
+        if check_pending_txn(pending_txn) is not None:
             return pending_txn
-        elif pending_txn["pool-error"]:
-            raise Exception(
-                'pool error: {}'.format(pending_txn["pool-error"]))
         client.status_after_block(current_round)
         current_round += 1
     raise Exception(
         'pending tx not found in timeout rounds, timeout value = : {}'.format(timeout))
 
 
+class ConfirmationTracker:
+    """
+        Waits for many transactions at once. Each round every outstanding transaction is checked
+        once with pending_transaction_info, then the tracker advances a single status_after_block
+        for all of them, so confirming a batch costs one round wait instead of one per transaction.
+            Args:
+                client (AlgodClient): algod client
+                timeout (int): default maximum number of rounds to wait per transaction
+                retries (int): consecutive algod errors the background thread retries before failing
+                    every outstanding transaction with the last one
+                backoff (float): seconds to wait before the first retry, doubled for each next one
+    """
+
+    def __init__(self, client, timeout=5, retries=5, backoff=1.0):
+        self.client = client
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.round = None
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._halted = threading.Event()
+        self._thread = None
+        self._stopped = False
+
+    def track(self, transaction_id, timeout=None, callback=None):
+        """
+            Starts tracking a submitted transaction
+                Args:
+                    transaction_id (str): the transaction to wait for
+                    timeout (int): maximum number of rounds to wait, defaults to the tracker's timeout
+                    callback (callable): called with the future once it is resolved
+                Returns:
+                    Future: resolves to the pending transaction information, or to the same errors
+                        wait_for_txn_confirmation raises
+        """
+        future = Future()
+        if callback is not None:
+            future.add_done_callback(callback)
+        with self._lock:
+            self._pending[transaction_id] = [future, self.timeout if timeout is None else timeout]
+        self._wakeup.set()
+        return future
+
+    def outstanding(self):
+        with self._lock:
+            return len(self._pending)
+
+    def poll(self):
+        """
+            Checks every outstanding transaction once, resolving the ones that are confirmed,
+            rejected or out of rounds
+        """
+        with self._lock:
+            pending = list(self._pending.items())
+        for transaction_id, entry in pending:
+            try:
+                pending_txn = self.client.pending_transaction_info(transaction_id)
+            except Exception as e:
+                # a failed lookup says nothing about the transaction, it still uses up the round
+                logger.warning("pending transaction lookup of %s failed: %s", transaction_id, e)
+                pending_txn = {}
+            self._check(transaction_id, entry, pending_txn)
+
+    def _check(self, transaction_id, entry, pending_txn):
+        try:
+            result = check_pending_txn(pending_txn)
+        except Exception as e:
+            self._resolve(transaction_id, exception=e)
+            return
+        if result is not None:
+            self._resolve(transaction_id, result=result)
+        else:
+            entry[1] -= 1
+            if entry[1] <= 0:
+                self._resolve(transaction_id, exception=Exception(
+                    'pending tx not found in timeout rounds, txid = : {}'.format(transaction_id)))
+
+    def advance(self):
+        """
+            Blocks until the next round is committed
+        """
+        if self.round is None:
+            self.round = self.client.status()["last-round"]
+        self.round = self.client.status_after_block(self.round)["last-round"]
+
+    def wait_all(self):
+        """
+            Polls and advances rounds until nothing is left outstanding
+        """
+        while True:
+            self.poll()
+            if not self.outstanding():
+                return
+            self.advance()
+
+    def start(self):
+        """
+            Resolves tracked transactions from a background thread until stop is called
+        """
+        if self._thread is None:
+            self._stopped = False
+            self._halted.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped = True
+        self._halted.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        errors = 0
+        while not self._stopped:
+            if not self.outstanding():
+                self._wakeup.wait()
+                self._wakeup.clear()
+                continue
+            try:
+                self.poll()
+                if self.outstanding():
+                    self.advance()
+                errors = 0
+            except Exception as e:
+                errors += 1
+                if errors > self.retries:
+                    # nobody would resolve the futures once the thread gives up, fail them instead
+                    logger.error("confirmation tracker giving up: %s", e)
+                    self._fail_all(e)
+                    errors = 0
+                    continue
+                logger.warning("confirmation tracker retrying after: %s", e)
+                self._halted.wait(self.backoff * 2 ** (errors - 1))
+
+    def _fail_all(self, exception):
+        with self._lock:
+            transaction_ids = list(self._pending)
+        for transaction_id in transaction_ids:
+            self._resolve(transaction_id, exception=exception)
+
+    def _resolve(self, transaction_id, result=None, exception=None):
+        with self._lock:
+            entry = self._pending.pop(transaction_id, None)
+        if entry is None:
+            return
+        if exception is not None:
+            entry[0].set_exception(exception)
+        else:
+            entry[0].set_result(result)
+
+
+def wait_for_txn_confirmations(client, transaction_ids, timeout):
+    """
+    Wait until all the transactions are confirmed or rejected, sharing one round wait between them.
+    Args:
+        transaction_ids (list<str>): the transactions to wait for
+        timeout (int): maximum number of rounds to wait
+    Returns:
+        list<dict>: pending transaction information in the order of transaction_ids, or throws the
+            first error hit by any of the transactions
+    """
+    tracker = ConfirmationTracker(client, timeout)
+    futures = [tracker.track(transaction_id) for transaction_id in transaction_ids]
+    tracker.wait_all()
+    return [future.result() for future in futures]
+
+
 def sign_txn(unsigned_txn, private_key):
     """
         signs the provided unsigned transaction
@@ -226,7 +289,7 @@ def create_app_signed_txn(private_key,
             Args:
                 private_key (str): private key of sender
                 public_key (str): public key of sender
-                params (???): parameters obtained from algod
+                params (SuggestedParams): parameters obtained from algod, or a SuggestedParamsProvider
                 on_complete (???):
                 approval_program (???): compiled approval program
                 clear_program (???): compiled clear program
@@ -236,7 +299,7 @@ def create_app_signed_txn(private_key,
                 tuple: Tuple containing the signed transaction and signed transaction id
     """
     unsigned_txn = transaction.ApplicationCreateTxn(public_key,
-                                                    params,
+                                                    resolve_params(params),
                                                     on_complete,
                                                     approval_program,
                                                     clear_program,
@@ -260,7 +323,7 @@ def update_app_signed_txn(private_key,
             Args:
                 private_key (str): private key of sender
                 public_key (str): public key of sender
-                params (???): parameters obtained from algod
+                params (SuggestedParams): parameters obtained from algod, or a SuggestedParamsProvider
                 app_id (int): app id to be updated
                 approval_program (???): compiled approval program
                 clear_program (???): compiled clear program
@@ -270,7 +333,7 @@ def update_app_signed_txn(private_key,
     """
 
     unsigned_txn = transaction.ApplicationUpdateTxn(public_key,
-                                                    params,
+                                                    resolve_params(params),
                                                     app_id,
                                                     approval_program,
                                                     clear_program,
@@ -291,13 +354,13 @@ def opt_in_app_signed_txn(private_key,
         Args:
             private_key (str): private key of sender
             public_key (str): public key of sender
-            params (???): parameters obtained from algod
+            params (SuggestedParams): parameters obtained from algod, or a SuggestedParamsProvider
             app_id (int): id of application
         Returns:
             tuple: Tuple containing the signed transaction and signed transaction id
     """
     txn = transaction.ApplicationOptInTxn(public_key,
-                                          params,
+                                          resolve_params(params),
                                           app_id,
                                           foreign_assets=foreign_assets,
                                           app_args=app_args)
@@ -310,7 +373,7 @@ def opt_in_asset_signed_txn(private_key,
                             params,
                             asset_id):
     txn = transaction.AssetOptInTxn(public_key,
-                                    params,
+                                    resolve_params(params),
                                     asset_id)
     signed_txn = sign_txn(txn, private_key)
     return signed_txn, signed_txn.transaction.get_txid()
@@ -327,14 +390,14 @@ def noop_app_signed_txn(private_key,
         Args:
             private_key (str): private key of sender
             public_key (str): public key of sender
-            params (???): parameters obtained from algod
+            params (SuggestedParams): parameters obtained from algod, or a SuggestedParamsProvider
             app_id (int): id of application
             asset_id (int): id of asset if any
         Returns:
             tuple: Tuple containing the signed transaction and signed transaction id
     """
     txn = transaction.ApplicationNoOpTxn(public_key,
-                                         params,
+                                         resolve_params(params),
                                          app_id,
                                          app_args=app_args,
                                          foreign_assets=asset_ids)
@@ -352,7 +415,7 @@ def close_out_app_signed_txn(private_key,
         Args:
             private_key (str): private key of sender
             public_key (str): public key of sender
-            params (???): parameters obtained from algod
+            params (SuggestedParams): parameters obtained from algod, or a SuggestedParamsProvider
             app_id (int): id of application
             asset_ids (list<int>): ids of assets if any
         Returns:
@@ -360,7 +423,7 @@ def close_out_app_signed_txn(private_key,
     """
 
     txn = transaction.ApplicationCloseOutTxn(public_key,
-                                             params,
+                                             resolve_params(params),
                                              app_id,
                                              foreign_assets=asset_ids)
     signed_txn = sign_txn(txn, private_key)
@@ -377,14 +440,14 @@ def clear_state_out_app_signed_txn(private_key,
             Args:
                 private_key (str): private key of sender
                 public_key (str): public key of sender
-                params (???): parameters obtained from algod
+                params (SuggestedParams): parameters obtained from algod, or a SuggestedParamsProvider
                 app_id (int): id of application
                 asset_ids (list<int>): ids of assets if any
             Returns:
                 tuple: Tuple containing the signed transaction and signed transaction id
     """
     txn = transaction.ApplicationClearStateTxn(public_key,
-                                               params,
+                                               resolve_params(params),
                                                app_id,
                                                foreign_assets=asset_ids)
 
@@ -402,7 +465,7 @@ def delete_app_signed_txn(private_key,
             Args:
                 private_key (str): private key of sender
                 public_key (str): public key of sender
-                params (???): parameters obtained from algod
+                params (SuggestedParams): parameters obtained from algod, or a SuggestedParamsProvider
                 app_id (int): id of application
                 asset_ids (list<int>): ids of assets if any
             Returns:
@@ -410,7 +473,7 @@ def delete_app_signed_txn(private_key,
     """
 
     txn = transaction.ApplicationDeleteTxn(public_key,
-                                           params,
+                                           resolve_params(params),
                                            app_id,
                                            foreign_assets=asset_ids)
     signed_txn = sign_txn(txn, private_key)
@@ -423,7 +486,7 @@ def create_asa_signed_txn(public_key, private_key, params, name="FOO", total=1e6
             Args:
                 public_key (str): public key of sender
                 private_key (str): private key of sender
-                params (???): parameters obtained from algod
+                params (SuggestedParams): parameters obtained from algod, or a SuggestedParamsProvider
                 name (str): name of the asset
                 total (int): total supply of the asset
                 default_frozen (bool): the assets frozen state
@@ -433,7 +496,7 @@ def create_asa_signed_txn(public_key, private_key, params, name="FOO", total=1e6
     """
     txn = transaction.AssetConfigTxn(
         sender=public_key,
-        sp=params,
+        sp=resolve_params(params),
         asset_name=name,
         total=total,
         default_frozen=default_frozen,
@@ -461,24 +524,23 @@ def payment_signed_txn(sender_private_key,
                 sender_public_key (str): public key of sender
                 receiver_public_key (str): public key of receiver
                 amount (int): number of tokens/asset to send
-                params (???): parameters obtained from algod
+                params (SuggestedParams): parameters obtained from algod, or a SuggestedParamsProvider
                 asset_id (int): id of assets if any
             Returns:
                 tuple: Tuple containing the signed transaction and signed transaction id
     """
     if asset_id is None:
         txn = transaction.PaymentTxn(sender_public_key,
-                                     params,
+                                     resolve_params(params),
                                      receiver_public_key,
                                      amount)
 
     else:
         txn = transaction.AssetTransferTxn(sender_public_key,
-                                           params,
+                                           resolve_params(params),
                                            receiver_public_key,
                                            amount,
                                            asset_id)
 
     signed_txn = sign_txn(txn, sender_private_key)
     return signed_txn, signed_txn.transaction.get_txid()
-
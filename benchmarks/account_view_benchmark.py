@@ -0,0 +1,66 @@
+"""
+Compares the old linear scans over account_info lists with the indexed AccountSnapshot lookups
+on a synthetic account holding 10k assets and opted into / created 10k apps.
+
+    python -m benchmarks.account_view_benchmark
+"""
+import random
+import timeit
+
+from akita_inu_asa_utils import AccountSnapshot
+
+NUM_ASSETS = 10000
+NUM_APPS = 10000
+NUM_LOOKUPS = 1000
+
+
+def synthetic_account_info():
+    return {
+        'address': 'BENCHMARK',
+        'amount': 10 ** 12,
+        'round': 1,
+        'assets': [{'asset-id': asset_id, 'amount': asset_id} for asset_id in range(1, NUM_ASSETS + 1)],
+        'apps-local-state': [{'id': app_id, 'key-value': []} for app_id in range(1, NUM_APPS + 1)],
+        'created-apps': [{'id': app_id, 'params': {'global-state': []}} for app_id in range(1, NUM_APPS + 1)],
+    }
+
+
+def linear_asset_balance(account_info, asset_id):
+    for asset in account_info['assets']:
+        if asset['asset-id'] == asset_id:
+            return asset['amount']
+    return 0
+
+
+def linear_local_state(account_info, app_id):
+    for app in account_info['apps-local-state']:
+        if app['id'] == app_id:
+            return app
+
+
+def main():
+    account_info = synthetic_account_info()
+    asset_ids = [random.randint(1, NUM_ASSETS) for _ in range(NUM_LOOKUPS)]
+    app_ids = [random.randint(1, NUM_APPS) for _ in range(NUM_LOOKUPS)]
+
+    def linear():
+        for asset_id, app_id in zip(asset_ids, app_ids):
+            linear_asset_balance(account_info, asset_id)
+            linear_local_state(account_info, app_id)
+
+    def indexed():
+        snapshot = AccountSnapshot(account_info)
+        for asset_id, app_id in zip(asset_ids, app_ids):
+            snapshot.assets[asset_id]['amount']
+            snapshot.local_states.get(app_id)
+
+    linear_time = min(timeit.repeat(linear, number=1, repeat=3))
+    indexed_time = min(timeit.repeat(indexed, number=1, repeat=3))
+    print("{} asset + app lookups on a {} asset account".format(NUM_LOOKUPS, NUM_ASSETS))
+    print("linear scan:  {:.4f}s".format(linear_time))
+    print("indexed view: {:.4f}s (index build included)".format(indexed_time))
+    print("speedup:      {:.1f}x".format(linear_time / indexed_time))
+
+
+if __name__ == '__main__':
+    main()
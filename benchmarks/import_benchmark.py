@@ -0,0 +1,54 @@
+"""
+Measures how long the package and the short-lived entry points built on it take to import, each
+in a fresh interpreter, net of the interpreter's own startup time, and which heavy dependencies
+each of them loads.
+
+    python -m benchmarks.import_benchmark [RUNS]
+"""
+import statistics
+import subprocess
+import sys
+import time
+
+RUNS = 7
+TARGET_MS = 100
+HEAVY_MODULES = ('algosdk', 'pyteal', 'joblib')
+TARGETS = [
+    ('akita_inu_asa_utils', 'import akita_inu_asa_utils'),
+    ('build helpers', 'from akita_inu_asa_utils import load_compiled, load_schema'),
+    ('balance check', 'from akita_inu_asa_utils import get_algod_client, get_algo_balance, get_asset_balance'),
+    ('faucet deployment', 'import contracts.asa_faucet.deployment'),
+    ('transaction_builder', 'import contracts.timed_asset_lock_contract.transaction_builder'),
+    ('swap_service', 'import contracts.AkitaTokenSwapper.swap_service'),
+    ('algosdk alone', 'import algosdk'),
+]
+
+
+def run(code):
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, '-c', code], check=True, capture_output=True, text=True).stdout
+    return time.perf_counter() - start, output
+
+
+def best_of(code, runs):
+    return [run(code)[0] for _ in range(runs)]
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    runs = int(argv[0]) if argv else RUNS
+    startup = min(best_of('pass', runs))
+    print("interpreter startup: {:.1f} ms".format(startup * 1000))
+    print("{:<22}{:>10}{:>10}  {}".format("import", "best ms", "median ms", "heavy modules loaded"))
+    for name, code in TARGETS:
+        times = best_of(code, runs)
+        _, loaded = run(code + "\nimport sys\nprint(' '.join(m for m in {!r} if m in sys.modules))".format(
+            HEAVY_MODULES))
+        best = (min(times) - startup) * 1000
+        median = (statistics.median(times) - startup) * 1000
+        flag = '' if best < TARGET_MS else '  over {} ms'.format(TARGET_MS)
+        print("{:<22}{:>10.1f}{:>10.1f}  {}{}".format(name, best, median, loaded.strip() or '-', flag))
+
+
+if __name__ == '__main__':
+    main()
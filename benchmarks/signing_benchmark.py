@@ -0,0 +1,53 @@
+"""
+Compares signing payment transactions one by one on the calling thread (the *_signed_txn helpers'
+path) with SigningPool, which ships msgpack bytes to worker processes that hold the key.
+
+    python -m benchmarks.signing_benchmark [NUM_TXNS] [WORKERS]
+"""
+import os
+import sys
+import time
+
+from algosdk import account
+from algosdk.future import transaction
+
+from akita_inu_asa_utils.signing import SigningPool
+
+NUM_TXNS = 20000
+
+
+def payments(sender, count):
+    params = transaction.SuggestedParams(0, 1, 1001, 'SGO1GKSzyE7IEPItTxCByw9x8FmnrCDexi9/cOUJOiI=',
+                                         'testnet-v1.0', min_fee=1000)
+    return [transaction.PaymentTxn(sender, params, sender, amount) for amount in range(count)]
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    num_txns = int(argv[0]) if argv else NUM_TXNS
+    workers = int(argv[1]) if len(argv) > 1 else os.cpu_count()
+    private_key, address = account.generate_account()
+    txns = payments(address, num_txns)
+
+    start = time.perf_counter()
+    [txn.sign(private_key) for txn in txns]
+    serial_time = time.perf_counter() - start
+
+    with SigningPool([private_key], workers=workers) as pool:
+        # start the workers before timing
+        pool.sign(txns[:workers])
+        start = time.perf_counter()
+        pool.sign(txns)
+        pool_time = time.perf_counter() - start
+        start = time.perf_counter()
+        pool.sign_encoded(txns)
+        encoded_time = time.perf_counter() - start
+
+    print("{} payment transactions, {} workers".format(num_txns, workers))
+    print("serial Transaction.sign:   {:.3f}s ({:.0f} txn/s)".format(serial_time, num_txns / serial_time))
+    print("SigningPool.sign:          {:.3f}s ({:.0f} txn/s)".format(pool_time, num_txns / pool_time))
+    print("SigningPool.sign_encoded:  {:.3f}s ({:.0f} txn/s)".format(encoded_time, num_txns / encoded_time))
+
+
+if __name__ == '__main__':
+    main()
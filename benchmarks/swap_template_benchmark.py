@@ -0,0 +1,55 @@
+"""
+Compares building AkitaTokenSwapper swap groups with algosdk (three Transaction objects,
+assign_group_id and msgpack_encode per group) with the pre-serialized SwapGroupTemplate.
+
+    python -m benchmarks.swap_template_benchmark [NUM_GROUPS]
+"""
+import sys
+import time
+
+from algosdk import account, encoding
+from algosdk.future import transaction
+
+from akita_inu_asa_utils import get_application_address
+from contracts.AkitaTokenSwapper.swap_template import SwapGroupTemplate
+
+NUM_GROUPS = 20000
+APP_ID = 1234
+SWAP_ASSET = 384303832
+NEW_ASSET = 523683256
+
+
+def algosdk_group(params, app_address, user, amount):
+    txn0 = transaction.AssetTransferTxn(user, params, user, 0, NEW_ASSET)
+    txn1 = transaction.AssetTransferTxn(user, params, app_address, amount, SWAP_ASSET)
+    txn2 = transaction.ApplicationNoOpTxn(user, params, APP_ID, [], foreign_assets=[SWAP_ASSET, NEW_ASSET])
+    txn2.fee = 2000
+    return [encoding.msgpack_encode(txn) for txn in transaction.assign_group_id([txn0, txn1, txn2])]
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    num_groups = int(argv[0]) if argv else NUM_GROUPS
+    params = transaction.SuggestedParams(0, 1, 1001, 'SGO1GKSzyE7IEPItTxCByw9x8FmnrCDexi9/cOUJOiI=',
+                                         'testnet-v1.0', min_fee=1000)
+    users = [account.generate_account()[1] for _ in range(100)]
+    app_address = get_application_address(APP_ID)
+
+    start = time.perf_counter()
+    for i in range(num_groups):
+        algosdk_group(params, app_address, users[i % len(users)], i + 1)
+    algosdk_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    template = SwapGroupTemplate(APP_ID, SWAP_ASSET, NEW_ASSET, params)
+    for i in range(num_groups):
+        template.encode(users[i % len(users)], i + 1, params.first, params.last)
+    template_time = time.perf_counter() - start
+
+    print("{} swap groups".format(num_groups))
+    print("algosdk:           {:.3f}s ({:.0f} groups/s)".format(algosdk_time, num_groups / algosdk_time))
+    print("SwapGroupTemplate: {:.3f}s ({:.0f} groups/s)".format(template_time, num_groups / template_time))
+
+
+if __name__ == '__main__':
+    main()
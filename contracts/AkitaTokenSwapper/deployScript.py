@@ -5,14 +5,14 @@ import os
 import sys
 os.chdir("/home/palmerss/Desktop/SmartContracts")
 from contracts.AkitaTokenSwapper.deployment import deploy
-from akita_inu_asa_utils import get_application_address, wait_for_txn_confirmation
+from akita_inu_asa_utils import get_application_address, wait_for_txn_confirmation, get_algod_client, get_suggested_params
 
 swap_asset = 384303832
 new_asset = 523683256
 
 algod_address = "http://localhost:4001"
 algod_token = "aaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa"
-client = algod.AlgodClient(algod_token, algod_address)
+client = get_algod_client(algod_token, algod_address)
 
 creator_mnemonic = "INPUT MNEMONIC HERE, DO NOT COMMIT YOUR MNEMONIC"
 
@@ -23,7 +23,7 @@ public_key = mnemonic.to_public_key(creator_mnemonic)
 private_key = mnemonic.to_private_key(creator_mnemonic)
 
 app_address = get_application_address(app_id)
-params = client.suggested_params()
+params = get_suggested_params(client)
 txn0 = transaction.PaymentTxn(public_key, params, app_address, 302000)
 app_args = [
             swap_asset.to_bytes(8, "big"),
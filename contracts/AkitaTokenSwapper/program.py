@@ -1,4 +1,4 @@
-from akita_inu_asa_utils import *
+from akita_inu_asa_utils import compile_program, dump_teal_assembly, generate_teal, write_schema
 
 from pyteal import *
 
@@ -129,8 +129,8 @@ def compile_app(algod_client):
     dump_teal_assembly('akita_token_swapper_approval.teal', approval_program)
     dump_teal_assembly('akita_token_swapper_clear.teal', clear_program)
 
-    compile_program(algod_client, approval_program(), 'akita_token_swapper_approval.compiled')
-    compile_program(algod_client, clear_program(), 'akita_token_swapper_clear.compiled')
+    compile_program(algod_client, generate_teal(approval_program), 'akita_token_swapper_approval.bin')
+    compile_program(algod_client, generate_teal(clear_program), 'akita_token_swapper_clear.bin')
 
     write_schema(file_path='localSchema',
                  num_ints=0,
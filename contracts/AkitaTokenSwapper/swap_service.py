@@ -0,0 +1,182 @@
+'''
+Unsigned swap groups for wallet front-ends. SwapGroupBuilder reads the swapper's assets from its
+global state (fetched at most once per app per round) and encodes the group from the shared
+SwapGroupTemplate with cached suggested params, so a batch of requests costs no algod calls
+once warm.
+
+    python -m contracts.AkitaTokenSwapper.swap_service [--config DeveloperConfig.json] [--port 8080]
+
+Without --port requests are read from stdin, one JSON object per line, and answered on stdout.
+With --port they are POSTed as a JSON list to /swap-groups. A request is
+{"app_id": 1234, "user": "<address>", "amount": 15000}, and is answered with
+{"group": [<base64 msgpack>, ...]} or {"error": "..."} in the same position.
+'''
+import argparse
+import base64
+import json
+import sys
+import threading
+import weakref
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from akita_inu_asa_utils import AccountSnapshotCache, get_algod_client, load_developer_config, \
+    read_app_global_state, suggested_params_provider
+from contracts.AkitaTokenSwapper.swap_template import swap_group_template
+
+
+class SwapGroupBuilder:
+    """
+        Builds unsigned AkitaTokenSwapper swap groups
+            Args:
+                client (AlgodClient): algod client
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self.params = suggested_params_provider(client)
+        self.state = AccountSnapshotCache(client)
+        self._state_lock = threading.Lock()
+
+    def template(self, app_id, params):
+        """
+            Returns the SwapGroupTemplate of app_id, reading its assets from the cached global state
+        """
+        with self._state_lock:
+            # global state is refetched when the params move to a new round
+            self.state.observe_round(params.first)
+            state = read_app_global_state(self.state, app_id)
+        if 'Swap_Asset_ID' not in state or 'New_Asset_ID' not in state:
+            raise ValueError("app {} is not set up for swapping".format(app_id))
+        return swap_group_template(app_id, state['Swap_Asset_ID'], state['New_Asset_ID'], params)
+
+    def build(self, app_id, user, amount, params=None):
+        """
+            Returns:
+                list<Transaction>: the unsigned swap group of user
+        """
+        params = params or self.params.get()
+        return self.template(app_id, params).build(user, amount, params)
+
+    def encode(self, app_id, user, amount, params=None):
+        """
+            Returns:
+                list<str>: base64 msgpack of the unsigned swap group of user, as wallets take it
+        """
+        params = params or self.params.get()
+        encoded = self.template(app_id, params).encode(user, amount, params.first, params.last)
+        return [base64.b64encode(txn).decode() for txn in encoded]
+
+    def encode_batch(self, requests):
+        """
+            Encodes many swap groups with one set of params
+                Args:
+                    requests (list<dict>): app_id, user and amount of each swap
+                Returns:
+                    list<dict>: {"group": [...]} or {"error": "..."} per request, in order
+        """
+        params = self.params.get()
+        responses = []
+        for request in requests:
+            try:
+                responses.append({'group': self.encode(int(request['app_id']), request['user'],
+                                                       int(request['amount']), params)})
+            except Exception as e:
+                responses.append({'error': "{}: {}".format(type(e).__name__, e)})
+        return responses
+
+
+_builders = weakref.WeakKeyDictionary()
+_builders_lock = threading.Lock()
+
+
+def build_swap_group(client, app_id, user, amount):
+    """
+        Builds the unsigned swap group of user from the client's shared params and app state
+            Args:
+                client (AlgodClient): algod client
+                app_id (int): AkitaTokenSwapper app id
+                user (str): address swapping
+                amount (int): amount of the swap asset deposited
+            Returns:
+                list<Transaction>: opt-in to the new asset, deposit and app call, grouped
+    """
+    with _builders_lock:
+        builder = _builders.get(client)
+        if builder is None:
+            builder = SwapGroupBuilder(client)
+            _builders[client] = builder
+    return builder.build(app_id, user, amount)
+
+
+def serve_stdio(builder, stdin=sys.stdin, stdout=sys.stdout):
+    for line in stdin:
+        if not line.strip():
+            continue
+        try:
+            response = builder.encode_batch([json.loads(line)])[0]
+        except ValueError as e:
+            response = {'error': "ValueError: {}".format(e)}
+        stdout.write(json.dumps(response) + '\n')
+        stdout.flush()
+
+
+class SwapGroupHandler(BaseHTTPRequestHandler):
+    builder = None
+
+    def do_POST(self):
+        if self.path.rstrip('/') != '/swap-groups':
+            self._respond(404, {'error': 'not found'})
+            return
+        try:
+            requests = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            if isinstance(requests, dict):
+                requests = [requests]
+        except ValueError as e:
+            self._respond(400, {'error': str(e)})
+            return
+        self._respond(200, self.builder.encode_batch(requests))
+
+    def _respond(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(builder, host='127.0.0.1', port=8080):
+    handler = type('BoundSwapGroupHandler', (SwapGroupHandler,), {'builder': builder})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve unsigned AkitaTokenSwapper swap groups")
+    parser.add_argument('--config', default='DeveloperConfig.json', help="developer config with algod settings")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, help="serve HTTP on this port instead of stdin/stdout")
+    args = parser.parse_args(argv)
+
+    config = load_developer_config(args.config)
+    client = get_algod_client(config['algodToken'], config['algodAddress'])
+    builder = SwapGroupBuilder(client)
+    if args.port is None:
+        serve_stdio(builder)
+        return
+    server = make_server(builder, args.host, args.port)
+    print("serving swap groups on http://{}:{}/swap-groups".format(args.host, args.port))
+    builder.params.start()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        builder.params.stop()
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
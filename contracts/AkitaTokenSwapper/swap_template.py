@@ -0,0 +1,89 @@
+'''
+Pre-serialized AkitaTokenSwapper swap groups. The swap group is always the same three
+transactions: the user's zero-amount opt-in to the new asset, the deposit of the swap asset to
+the app address and the NoOp app call paying the inner transfer fee. SwapGroupTemplate encodes
+everything but the sender, amount, validity rounds and group ID once per app/asset pair.
+'''
+import copy
+import threading
+
+from algosdk import encoding
+from algosdk.future import transaction
+
+from akita_inu_asa_utils import get_application_address
+from akita_inu_asa_utils.templates import ADDRESS_PLACEHOLDER, UINT_PLACEHOLDER, TransactionTemplate, \
+    GroupTemplate
+
+# the app call pays for the inner transfer of the new asset
+SWAP_CALL_FEE = 2000
+
+
+class SwapGroupTemplate:
+    """
+        Unsigned swap groups for one swapper app
+            Args:
+                app_id (int): AkitaTokenSwapper app id
+                swap_asset (int): asset deposited by the user
+                new_asset (int): asset sent back by the app
+                params (SuggestedParams): params of the network, only genesis and min fee are used
+    """
+
+    def __init__(self, app_id, swap_asset, new_asset, params):
+        self.app_id = app_id
+        self.swap_asset = swap_asset
+        self.new_asset = new_asset
+        params = copy.copy(params)
+        params.flat_fee = True
+        params.fee = max(params.min_fee or 0, 1000)
+        params.first = UINT_PLACEHOLDER
+        params.last = UINT_PLACEHOLDER
+        placeholder = encoding.encode_address(ADDRESS_PLACEHOLDER)
+        app_address = get_application_address(app_id)
+
+        opt_in = transaction.AssetTransferTxn(placeholder, params, placeholder, 0, new_asset)
+        deposit = transaction.AssetTransferTxn(placeholder, params, app_address, UINT_PLACEHOLDER, swap_asset)
+        call_params = copy.copy(params)
+        call_params.fee = SWAP_CALL_FEE
+        call = transaction.ApplicationNoOpTxn(placeholder, call_params, app_id, [],
+                                              foreign_assets=[swap_asset, new_asset])
+        rounds = {'fv': 'first', 'lv': 'last'}
+        self.group = GroupTemplate([
+            TransactionTemplate(opt_in, dict(rounds, snd='sender', arcv='sender')),
+            TransactionTemplate(deposit, dict(rounds, snd='sender', aamt='amount')),
+            TransactionTemplate(call, dict(rounds, snd='sender')),
+        ])
+
+    def encode(self, sender, amount, first_valid, last_valid):
+        """
+            Returns:
+                list<bytes>: canonical msgpack of the three unsigned transactions
+        """
+        if amount <= 0:
+            raise ValueError("swap amount must be positive")
+        return self.group.encode({'sender': encoding.decode_address(sender), 'amount': amount,
+                                  'first': first_valid, 'last': last_valid})
+
+    def build(self, sender, amount, params):
+        """
+            Returns:
+                list<Transaction>: the swap group as algosdk transactions, valid from params.first to params.last
+        """
+        return [encoding.future_msgpack_decode(encoding.base64.b64encode(encoded).decode())
+                for encoded in self.encode(sender, amount, params.first, params.last)]
+
+
+_templates = {}
+_templates_lock = threading.Lock()
+
+
+def swap_group_template(app_id, swap_asset, new_asset, params):
+    """
+        Returns the shared SwapGroupTemplate of an app/asset pair on the network of params
+    """
+    key = (app_id, swap_asset, new_asset, params.gh)
+    with _templates_lock:
+        template = _templates.get(key)
+        if template is None:
+            template = SwapGroupTemplate(app_id, swap_asset, new_asset, params)
+            _templates[key] = template
+    return template
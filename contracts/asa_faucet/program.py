@@ -1,7 +1,5 @@
 
-from akita_inu_asa_utils import *
-from pyteal import *
-
+from akita_inu_asa_utils import compile_program, dump_teal_assembly, generate_teal, write_schema
 from pyteal import *
 import sys
 
@@ -132,8 +130,8 @@ def compile_app(algod_client):
     dump_teal_assembly('asa_faucet_approval.teal', approval_program)
     dump_teal_assembly('asa_faucet_clear.teal', clear_program)
 
-    compile_program(algod_client, approval_program(), 'asa_faucet_approval.compiled')
-    compile_program(algod_client, clear_program(), 'asa_faucet_clear.compiled')
+    compile_program(algod_client, generate_teal(approval_program), 'asa_faucet_approval.bin')
+    compile_program(algod_client, generate_teal(clear_program), 'asa_faucet_clear.bin')
 
     write_schema(file_path='localSchema',
                  num_ints=1,
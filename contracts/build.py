@@ -0,0 +1,149 @@
+'''
+Builds every contract found under contracts/*/program.py in a process pool. Each contract is built
+into its own contracts/<name>/build directory, so schemas no longer collide, and the time spent
+importing, generating TEAL and compiling is reported per contract.
+
+    python -m contracts.build [--jobs N] [--contract NAME ...] [--escrow-client ADDRESS] [--local]
+'''
+import argparse
+import importlib
+import inspect
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from akita_inu_asa_utils import get_algod_client, load_developer_config, generate_teal
+
+CONTRACTS_DIR = os.path.dirname(os.path.abspath(__file__))
+STAGES = ('import', 'generate', 'compile')
+
+
+def discover_contracts(contracts_dir=CONTRACTS_DIR):
+    """
+        Returns:
+            list<str>: names of the contract packages that have a program.py
+    """
+    return sorted(name for name in os.listdir(contracts_dir)
+                  if os.path.isfile(os.path.join(contracts_dir, name, 'program.py')))
+
+
+def build_contract(name, algod_token, algod_address, output_dir=CONTRACTS_DIR, extra_args=(), client=None,
+                   local=False):
+    """
+        Imports, generates and compiles one contract into output_dir/<name>/build
+            Args:
+                name (str): contract package name, e.g. asa_faucet
+                algod_token (str): algod API token
+                algod_address (str): algod address
+                output_dir (str): directory holding the per-contract build directories
+                extra_args (tuple): extra arguments for the contract's compile_app
+                client (AlgodClient): client to use instead of one built from token and address
+                local (bool): assemble the TEAL in-process instead of compiling it with algod
+            Returns:
+                tuple: contract name and its per-stage timings in seconds
+    """
+    timings = {}
+    start = time.perf_counter()
+    program = importlib.import_module('contracts.' + name + '.program')
+    timings['import'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for program_fn in ('approval_program', 'clear_program'):
+        if hasattr(program, program_fn):
+            generate_teal(getattr(program, program_fn))
+    timings['generate'] = time.perf_counter() - start
+
+    if local:
+        client = None
+    elif client is None:
+        client = get_algod_client(algod_token, algod_address)
+    contract_dir = os.path.join(output_dir, name)
+    os.makedirs(contract_dir, exist_ok=True)
+    cwd = os.getcwd()
+    # the build helpers write to build/ relative to the working directory
+    os.chdir(contract_dir)
+    try:
+        start = time.perf_counter()
+        program.compile_app(client, *extra_args)
+        timings['compile'] = time.perf_counter() - start
+    finally:
+        os.chdir(cwd)
+    return name, timings
+
+
+def compile_app_extra_args(name, escrow_client_address=None):
+    """
+        Returns the compile_app arguments beyond the client, or None if the contract can't be built
+        with what was given
+    """
+    program = importlib.import_module('contracts.' + name + '.program')
+    parameters = list(inspect.signature(program.compile_app).parameters)[1:]
+    if not parameters:
+        return ()
+    if parameters == ['client_address_string'] and escrow_client_address is not None:
+        return (escrow_client_address,)
+    return None
+
+
+def build_all(algod_token, algod_address, contracts=None, jobs=None, output_dir=CONTRACTS_DIR,
+              escrow_client_address=None, client=None, local=False):
+    """
+        Builds the given contracts (all of them by default) in parallel
+            Args:
+                jobs (int): number of worker processes, defaults to the number of cores. With jobs=1
+                    the contracts are built in this process, using client if given
+                local (bool): assemble the TEAL in-process, no algod node is needed
+            Returns:
+                dict: per contract stage timings, contracts that couldn't be built are left out
+    """
+    contracts = contracts or discover_contracts()
+    builds = {}
+    for name in contracts:
+        extra_args = compile_app_extra_args(name, escrow_client_address)
+        if extra_args is None:
+            print("skipping " + name + ": compile_app needs more arguments (see --escrow-client)")
+        else:
+            builds[name] = extra_args
+
+    if jobs == 1:
+        results = [build_contract(name, algod_token, algod_address, output_dir, extra_args, client, local)
+                   for name, extra_args in builds.items()]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [pool.submit(build_contract, name, algod_token, algod_address, output_dir, extra_args,
+                                   None, local)
+                       for name, extra_args in builds.items()]
+            results = [future.result() for future in futures]
+    return dict(results)
+
+
+def print_timings(timings, total):
+    print("{:<28}".format("contract") + "".join("{:>10}".format(stage) for stage in STAGES))
+    for name, stages in timings.items():
+        print("{:<28}".format(name) + "".join("{:>9.3f}s".format(stages[stage]) for stage in STAGES))
+    print("built {} contracts in {:.3f}s".format(len(timings), total))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build all contracts in parallel")
+    parser.add_argument('--config', default='DeveloperConfig.json', help="developer config with algod settings")
+    parser.add_argument('--jobs', type=int, default=None, help="number of worker processes")
+    parser.add_argument('--contract', action='append', help="contract to build, may be repeated")
+    parser.add_argument('--escrow-client', help="client address to build stateless_escrow for")
+    parser.add_argument('--local', action='store_true', help="assemble TEAL locally instead of with algod")
+    args = parser.parse_args(argv)
+
+    if args.local:
+        algod_token, algod_address = '', ''
+    else:
+        config = load_developer_config(args.config)
+        algod_token, algod_address = config['algodToken'], config['algodAddress']
+    start = time.perf_counter()
+    timings = build_all(algod_token, algod_address, args.contract, args.jobs,
+                        escrow_client_address=args.escrow_client, local=args.local)
+    print_timings(timings, time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
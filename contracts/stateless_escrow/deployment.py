@@ -1,64 +1,76 @@
-from akita_inu_asa_utils import *
+from algosdk import account, mnemonic
+from algosdk.future import transaction
+from akita_inu_asa_utils import get_suggested_params, load_logic_sig, wait_for_txn_confirmation
 
 
-def generate_unsigned_deploy_txn(algod_client, sender_public_key, asset_id, asset_total_to_lock):
-    compiled_teal = load_compiled(file_path='stateless_escrow_timed_lock.compiled')
-    lsig_account = transaction.LogicSigAccount(compiled_teal)
+# microAlgos lock_escrow requires the escrow to be funded with
+ESCROW_FUNDING = int(0.3 * 1e6)
 
-    # get node suggested parameters
-    params = algod_client.suggested_params()
 
+def build_deploy_group(params, sender_public_key, escrow_address, asset_id, asset_total_to_lock, note=None):
     # fund with algos
     algo_fund = transaction.PaymentTxn(sender_public_key,
                                        params,
-                                       lsig_account.address(),
-                                       int(0.3 * 1e6))
+                                       escrow_address,
+                                       ESCROW_FUNDING,
+                                       note=note)
     # opt escrow into asset
-    opt_escrow_in = transaction.AssetTransferTxn(lsig_account.address(),
+    opt_escrow_in = transaction.AssetTransferTxn(escrow_address,
                                                  params,
-                                                 lsig_account.address(),
+                                                 escrow_address,
                                                  0,
                                                  asset_id)
     #transfer the asset to the escrow
     asset_fund = transaction.AssetTransferTxn(sender_public_key,
                                               params,
-                                              lsig_account.address(),
+                                              escrow_address,
                                               asset_total_to_lock,
                                               asset_id)
 
-    grouped = transaction.assign_group_id([algo_fund, opt_escrow_in, asset_fund])
+    return transaction.assign_group_id([algo_fund, opt_escrow_in, asset_fund])
 
-    return grouped, lsig_account
 
+def generate_unsigned_deploy_txn(algod_client, sender_public_key, asset_id, asset_total_to_lock):
+    lsig_account = load_logic_sig('stateless_escrow_timed_lock.bin')
 
-def generate_unsigned_claim_txn(algod_client, client_public_key, asset_id):
-    compiled_teal = load_compiled(file_path='stateless_escrow_timed_lock.compiled')
-    lsig = transaction.LogicSigAccount(compiled_teal)
+    # get node suggested parameters
+    params = get_suggested_params(algod_client)
+
+    grouped = build_deploy_group(params, sender_public_key, lsig_account.address(), asset_id, asset_total_to_lock)
+
+    return grouped, lsig_account
 
-    params = algod_client.suggested_params()
 
+def build_claim_group(params, escrow_address, client_public_key, asset_id):
     # close out asset
-    asset_close_out = transaction.AssetTransferTxn(lsig.address(),
+    asset_close_out = transaction.AssetTransferTxn(escrow_address,
                                                    params,
-                                                   lsig.address(),
+                                                   escrow_address,
                                                    0,
                                                    asset_id,
                                                    close_assets_to=client_public_key)
     # close out algos
-    algo_close_out = transaction.PaymentTxn(lsig.address(),
+    algo_close_out = transaction.PaymentTxn(escrow_address,
                                             params,
-                                            lsig.address(),
+                                            escrow_address,
                                             0,
                                             close_remainder_to=client_public_key)
 
-    grouped = transaction.assign_group_id([asset_close_out, algo_close_out])
+    return transaction.assign_group_id([asset_close_out, algo_close_out])
+
+
+def generate_unsigned_claim_txn(algod_client, client_public_key, asset_id):
+    lsig = load_logic_sig('stateless_escrow_timed_lock.bin')
+
+    params = get_suggested_params(algod_client)
+
+    grouped = build_claim_group(params, lsig.address(), client_public_key, asset_id)
 
     return grouped
 
 
 def sign_claim_group(group):
-    compiled_teal = load_compiled(file_path='stateless_escrow_timed_lock.compiled')
-    lsig = transaction.LogicSigAccount(compiled_teal)
+    lsig = load_logic_sig('stateless_escrow_timed_lock.bin')
     txn1 = transaction.LogicSigTransaction(group[0], lsig)
     txn2 = transaction.LogicSigTransaction(group[1], lsig)
     transaction.write_to_file([txn1, txn2], './build/txnfile.txn')
@@ -0,0 +1,302 @@
+'''
+Local SQLite index of stateless escrows, so the escrows a client can claim are found with an
+index lookup instead of scanning accounts. Rows are keyed by escrow address and asset and hold the
+client, the funded amount and a status:
+
+    pending   provisioned, funding not seen confirmed yet
+    funded    holds the locked asset, claimable by its client
+    claimed   the asset has been closed out to the client
+
+The EscrowProvisioner records escrows as it confirms them, existing provisioning manifests can be
+imported, and reconcile follows the chain block by block from where it last stopped, recording
+fundings and claims of indexed escrows. Fundings are keyed by txid, so seeing one from both the
+provisioner and a block counts it once.
+
+    python -m contracts.stateless_escrow.escrow_index escrows.db import manifest.csv
+    python -m contracts.stateless_escrow.escrow_index escrows.db reconcile [--start ROUND] [--config DeveloperConfig.json]
+    python -m contracts.stateless_escrow.escrow_index escrows.db claimable <client address>
+'''
+import argparse
+import base64
+import sqlite3
+import sys
+import threading
+
+import msgpack
+from algosdk import constants, encoding
+from algosdk.future import transaction
+
+from akita_inu_asa_utils import get_algod_client, get_suggested_params, load_developer_config
+from akita_inu_asa_utils.templates import canonical, checksum, pack
+from contracts.stateless_escrow.deployment import build_claim_group
+
+PENDING = 'pending'
+FUNDED = 'funded'
+CLAIMED = 'claimed'
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS escrows (
+    escrow TEXT NOT NULL,
+    asset_id INTEGER NOT NULL,
+    client TEXT NOT NULL,
+    amount INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL,
+    funded_round INTEGER,
+    claimed_round INTEGER,
+    PRIMARY KEY (escrow, asset_id)
+);
+CREATE INDEX IF NOT EXISTS escrows_by_client ON escrows (client, status, asset_id);
+CREATE TABLE IF NOT EXISTS fundings (
+    txid TEXT PRIMARY KEY,
+    escrow TEXT NOT NULL,
+    asset_id INTEGER NOT NULL,
+    amount INTEGER NOT NULL,
+    round INTEGER
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER
+);
+'''
+
+COLUMNS = ['escrow', 'asset_id', 'client', 'amount', 'status', 'funded_round', 'claimed_round']
+
+
+def block_txid(stxn, block):
+    """
+        Returns:
+            str: txid of a transaction as stored in a msgpack block, where the genesis hash and ID
+                are left out
+    """
+    txn = dict(stxn['txn'])
+    txn['gh'] = block['gh']
+    if stxn.get('hgi'):
+        txn['gen'] = block['gen']
+    digest = checksum(constants.txid_prefix + pack(canonical(txn)))
+    return base64.b32encode(digest).decode().strip('=')
+
+
+class EscrowIndex:
+    """
+        SQLite index of escrow address and asset -> client, funded amount and status. Safe to share
+        between threads
+            Args:
+                path (str): database file, or :memory:
+    """
+
+    def __init__(self, path=':memory:'):
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._db:
+            self._db.executescript(SCHEMA)
+
+    def close(self):
+        self._db.close()
+
+    def add(self, escrow, client, asset_id):
+        """
+            Starts indexing an escrow, as pending until its funding is recorded
+        """
+        with self._lock, self._db:
+            self._add(escrow, client, asset_id)
+
+    def _add(self, escrow, client, asset_id):
+        self._db.execute('INSERT OR IGNORE INTO escrows (escrow, asset_id, client, status) VALUES (?, ?, ?, ?)',
+                         (escrow, asset_id, client, PENDING))
+
+    def record_funding(self, escrow, asset_id, txid, amount, round_number=None):
+        """
+            Records a confirmed transfer of amount to an indexed escrow, once per txid
+                Returns:
+                    bool: whether the funding was new
+        """
+        with self._lock, self._db:
+            return self._record_funding(escrow, asset_id, txid, amount, round_number)
+
+    def _record_funding(self, escrow, asset_id, txid, amount, round_number):
+        inserted = self._db.execute('INSERT OR IGNORE INTO fundings VALUES (?, ?, ?, ?, ?)',
+                                    (txid, escrow, asset_id, amount, round_number)).rowcount
+        if inserted:
+            self._db.execute('UPDATE escrows SET amount = amount + ?, funded_round = COALESCE(funded_round, ?), '
+                             'status = CASE status WHEN ? THEN ? ELSE status END WHERE escrow = ? AND asset_id = ?',
+                             (amount, round_number, PENDING, FUNDED, escrow, asset_id))
+        return bool(inserted)
+
+    def record_claim(self, escrow, asset_id, round_number=None):
+        with self._lock, self._db:
+            self._record_claim(escrow, asset_id, round_number)
+
+    def _record_claim(self, escrow, asset_id, round_number):
+        self._db.execute('UPDATE escrows SET status = ?, claimed_round = ? WHERE escrow = ? AND asset_id = ?',
+                         (CLAIMED, round_number, escrow, asset_id))
+
+    def record_provisioned(self, escrows):
+        """
+            Records rows of a provisioning run, with the fundings of the confirmed ones
+                Args:
+                    escrows (iterable<Escrow>): provisioning rows, their txid is the funding asset transfer
+        """
+        with self._lock, self._db:
+            for escrow in escrows:
+                self._add(escrow.escrow, escrow.client, escrow.asset_id)
+                if escrow.status == 'confirmed' and escrow.txid:
+                    self._record_funding(escrow.escrow, escrow.asset_id, escrow.txid, escrow.amount,
+                                         escrow.confirmed_round)
+
+    def import_manifest(self, file_path):
+        # provisioning imports the template, so only load it for manifests
+        from contracts.stateless_escrow.provisioning import read_manifest
+        escrows = read_manifest(file_path)
+        if escrows is None:
+            raise FileNotFoundError(file_path)
+        self.record_provisioned(escrows)
+        return len(escrows)
+
+    def _rows(self, query, args):
+        with self._lock:
+            return [dict(row) for row in self._db.execute(query, args)]
+
+    def lookup(self, escrow):
+        """
+            Returns:
+                list<dict>: the rows of escrow, one per asset
+        """
+        return self._rows('SELECT {} FROM escrows WHERE escrow = ? ORDER BY asset_id'.format(', '.join(COLUMNS)),
+                          (escrow,))
+
+    def claimable(self, client, asset_id=None):
+        """
+            Returns the funded escrows of client, using the (client, status, asset_id) index
+                Returns:
+                    list<dict>: escrow, asset_id, client, amount, status, funded_round, claimed_round
+        """
+        query = 'SELECT {} FROM escrows WHERE client = ? AND status = ?'.format(', '.join(COLUMNS))
+        args = (client, FUNDED)
+        if asset_id is not None:
+            query += ' AND asset_id = ?'
+            args += (asset_id,)
+        return self._rows(query + ' ORDER BY asset_id, escrow', args)
+
+    @property
+    def last_round(self):
+        """
+            Last round reconciled, None before the first reconcile
+        """
+        with self._lock:
+            row = self._db.execute("SELECT value FROM meta WHERE key = 'last_round'").fetchone()
+        return None if row is None else row[0]
+
+    def apply_block(self, block, round_number):
+        """
+            Records the fundings and claims of indexed escrows in a block, and marks the round as
+            reconciled
+                Args:
+                    block (dict): the 'block' of a msgpack block_info response, decoded
+                    round_number (int): round of the block
+        """
+        with self._lock, self._db:
+            for stxn in block.get('txns', []):
+                txn = stxn['txn']
+                if txn.get('type') != 'axfer':
+                    continue
+                asset_id = txn.get('xaid', 0)
+                sender = encoding.encode_address(txn['snd'])
+                if 'aclose' in txn:
+                    self._record_claim(sender, asset_id, round_number)
+                    continue
+                if not txn.get('aamt') or 'arcv' not in txn:
+                    continue
+                receiver = encoding.encode_address(txn['arcv'])
+                if receiver != sender and self._db.execute('SELECT 1 FROM escrows WHERE escrow = ? AND asset_id = ?',
+                                                           (receiver, asset_id)).fetchone():
+                    self._record_funding(receiver, asset_id, block_txid(stxn, block), txn['aamt'], round_number)
+            self._db.execute("INSERT OR REPLACE INTO meta VALUES ('last_round', ?)", (round_number,))
+
+    def reconcile(self, algod_client, start=None, until=None):
+        """
+            Applies every block after the last reconciled round, up to until or the node's last round
+                Args:
+                    algod_client (AlgodClient): algod client
+                    start (int): first round of the first reconcile, defaults to the earliest funded
+                        round in the index. Pass it when escrows were provisioned but not seen funded
+                    until (int): last round to apply
+                Returns:
+                    int: number of blocks applied
+        """
+        if until is None:
+            until = algod_client.status()['last-round']
+        if self.last_round is not None:
+            start = self.last_round
+        elif start is not None:
+            start -= 1
+        else:
+            with self._lock:
+                first_funded = self._db.execute('SELECT MIN(funded_round) FROM escrows').fetchone()[0]
+            start = until if first_funded is None else first_funded - 1
+        for round_number in range(start + 1, until + 1):
+            # local state deltas of app calls are keyed by account index, not by string
+            response = msgpack.unpackb(algod_client.block_info(round_number, response_format='msgpack'), raw=False,
+                                       strict_map_key=False)
+            self.apply_block(response['block'], round_number)
+        return max(0, until - start)
+
+
+def claim_groups(algod_client, index, client_address, template=None):
+    """
+        Builds and signs the claim group of every funded escrow of a client
+            Args:
+                algod_client (AlgodClient): algod client
+                index (EscrowIndex): escrow index
+                client_address (str): client the escrows close out to
+                template (EscrowTemplate): template the escrows were provisioned from
+            Returns:
+                list<(dict, list<LogicSigTransaction>)>: index row and signed claim group per escrow
+    """
+    rows = index.claimable(client_address)
+    if not rows:
+        return []
+    if template is None:
+        from contracts.stateless_escrow.escrow_template import escrow_template
+        template = escrow_template()
+    lsig = template.logic_sig(client_address)
+    params = get_suggested_params(algod_client)
+    groups = []
+    for row in rows:
+        group = build_claim_group(params, row['escrow'], client_address, row['asset_id'])
+        groups.append((row, [transaction.LogicSigTransaction(txn, lsig) for txn in group]))
+    return groups
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Index stateless escrows for claim lookups")
+    parser.add_argument('database', help="SQLite database of the index")
+    parser.add_argument('--config', default='DeveloperConfig.json', help="developer config with algod settings")
+    commands = parser.add_subparsers(dest='command', required=True)
+    import_command = commands.add_parser('import', help="record the escrows of provisioning manifests")
+    import_command.add_argument('manifests', nargs='+')
+    reconcile_command = commands.add_parser('reconcile', help="apply the blocks since the last reconcile")
+    reconcile_command.add_argument('--start', type=int, help="first round of the first reconcile")
+    claimable_command = commands.add_parser('claimable', help="list the funded escrows of a client")
+    claimable_command.add_argument('client')
+    args = parser.parse_args(argv)
+
+    index = EscrowIndex(args.database)
+    try:
+        if args.command == 'import':
+            for manifest in args.manifests:
+                print("{}: {} escrows".format(manifest, index.import_manifest(manifest)))
+        elif args.command == 'reconcile':
+            config = load_developer_config(args.config)
+            client = get_algod_client(config['algodToken'], config['algodAddress'])
+            print("{} blocks applied, reconciled to round {}".format(index.reconcile(client, args.start), index.last_round))
+        else:
+            for row in index.claimable(args.client):
+                print("{escrow} asset {asset_id}: {amount}".format(**row))
+    finally:
+        index.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,76 @@
+'''
+Stateless escrow programs for many clients from one compilation. lock_escrow is compiled once
+with a placeholder client address; the address is a single 32 byte constant of the bytecode, so
+the program of any client is the compiled template with the placeholder replaced by the client's
+public key. Templates are immutable and safe to share between threads.
+
+    template = escrow_template()
+    lsig = template.logic_sig(client_address)
+'''
+import hashlib
+import threading
+
+from algosdk import constants, encoding
+from algosdk.future import transaction
+
+from akita_inu_asa_utils import compile_program
+from akita_inu_asa_utils.templates import checksum
+from contracts.stateless_escrow.program import get_contract
+
+PLACEHOLDER_PUBLIC_KEY = hashlib.sha256(b'stateless_escrow client address placeholder').digest()
+PLACEHOLDER_ADDRESS = encoding.encode_address(PLACEHOLDER_PUBLIC_KEY)
+
+
+class EscrowTemplate:
+    """
+        Compiled lock_escrow with the client address left open
+            Args:
+                bytecode (bytes): lock_escrow compiled for PLACEHOLDER_ADDRESS
+    """
+
+    def __init__(self, bytecode):
+        if bytecode.count(PLACEHOLDER_PUBLIC_KEY) != 1:
+            raise ValueError("the placeholder address must appear exactly once in the template bytecode")
+        offset = bytecode.index(PLACEHOLDER_PUBLIC_KEY)
+        self.prefix = bytecode[:offset]
+        self.suffix = bytecode[offset + len(PLACEHOLDER_PUBLIC_KEY):]
+
+    def program(self, client_address):
+        """
+            Returns:
+                bytes: the escrow program of client_address
+        """
+        return self.prefix + encoding.decode_address(client_address) + self.suffix
+
+    def address(self, client_address):
+        """
+            Returns:
+                str: the escrow account address of client_address, as LogicSigAccount.address() gives it
+        """
+        return encoding.encode_address(checksum(constants.logic_prefix + self.program(client_address)))
+
+    def logic_sig(self, client_address):
+        """
+            Returns:
+                LogicSigAccount: the escrow account of client_address
+        """
+        return transaction.LogicSigAccount(self.program(client_address))
+
+
+_templates = {}
+_templates_lock = threading.Lock()
+
+
+def escrow_template(algod_client=None):
+    """
+        Returns the shared EscrowTemplate, compiling lock_escrow on first use
+            Args:
+                algod_client (AlgodClient): client to compile with, or None to assemble locally
+    """
+    key = 'local' if algod_client is None else 'algod'
+    with _templates_lock:
+        template = _templates.get(key)
+        if template is None:
+            template = EscrowTemplate(compile_program(algod_client, get_contract(PLACEHOLDER_ADDRESS)))
+            _templates[key] = template
+    return template
@@ -1,11 +1,9 @@
 from pyteal import *
-from akita_inu_asa_utils import *
+from akita_inu_asa_utils import compile_program, dump_teal_assembly
 
-CLIENT_ADDRESS_STRING = ""
 
-
-def lock_escrow():
-    client = Addr(CLIENT_ADDRESS_STRING)
+def lock_escrow(client_address_string):
+    client = Addr(client_address_string)
     is_valid_fund = And(
         Global.group_size() == Int(3),
         # Seed with funds
@@ -45,14 +43,13 @@ def lock_escrow():
     )
 
 
-def get_contract():
+def get_contract(client_address_string):
     return compileTeal(
-        lock_escrow(), mode=Mode.Signature, version=5, assembleConstants=True
+        lock_escrow(client_address_string), mode=Mode.Signature, version=5, assembleConstants=True
     )
 
 
 def compile_app(algod_client, client_address_string):
-    global CLIENT_ADDRESS_STRING
-    CLIENT_ADDRESS_STRING = client_address_string
-    dump_teal_assembly('stateless_escrow_timed_lock.teal', get_contract)
-    compile_program(algod_client, get_contract(), 'stateless_escrow_timed_lock.compiled')
+    contract = get_contract(client_address_string)
+    dump_teal_assembly('stateless_escrow_timed_lock.teal', contract)
+    compile_program(algod_client, contract, 'stateless_escrow_timed_lock.bin')
@@ -0,0 +1,332 @@
+'''
+Bulk escrow provisioning for vesting distributions. Every client gets its own lock_escrow
+program from the shared EscrowTemplate; its fund/opt-in/transfer group is built from cached
+suggested params, signed with the client's key, submitted from a bounded pool of worker threads
+and confirmed by one ConfirmationTracker while the next groups are being sent.
+
+    python -m contracts.stateless_escrow.provisioning escrows.csv --manifest manifest.csv [--config DeveloperConfig.json]
+
+Each CSV row is client,asset_id,amount. A client has a single escrow address, which can only be
+claimed while it holds a single asset, so each client can appear only once. Client keys are read from the ESCROW_MNEMONIC environment
+variable and/or a --keys file with one mnemonic per line.
+
+The manifest holds client, escrow address, asset, amount, status and the txid of the group's
+asset transfer (the funding an EscrowIndex sees in blocks) per row and is written
+before each batch of groups is sent, so a run that crashes can be started again with the same
+files. Groups are only valid for a few rounds; on a restart groups that may have been sent are
+given until their last valid round to confirm, then the escrow's balance of the row's asset, which
+no other row funds, decides whether the row is done or sent again.
+'''
+import argparse
+import csv
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from algosdk import account, mnemonic
+from algosdk.future import transaction
+
+from akita_inu_asa_utils import ConfirmationTracker, get_algod_client, get_asset_balance, load_developer_config, \
+    suggested_params_provider
+from contracts.stateless_escrow.deployment import build_deploy_group
+from contracts.stateless_escrow.escrow_template import escrow_template
+
+# rounds a provisioning group stays valid, which bounds how long a restart waits on a group
+DEFAULT_VALIDITY = 20
+
+MANIFEST_FIELDS = ['client', 'escrow', 'asset_id', 'amount', 'status', 'txid', 'last_valid', 'confirmed_round',
+                   'error']
+
+
+class ProvisioningError(Exception):
+    pass
+
+
+class Escrow:
+    def __init__(self, client, asset_id, amount, escrow=None, status='pending', txid=None, last_valid=None,
+                 confirmed_round=None, error=None):
+        self.client = client
+        self.asset_id = int(asset_id)
+        self.amount = int(amount)
+        self.escrow = escrow or None
+        self.status = status
+        self.txid = txid or None
+        self.last_valid = int(last_valid) if last_valid else None
+        self.confirmed_round = int(confirmed_round) if confirmed_round else None
+        self.error = error or None
+
+    def key(self):
+        return self.client, self.asset_id, self.amount
+
+
+def check_unique(escrows):
+    """
+        Raises ProvisioningError if a client repeats: its rows would share an escrow, which the
+        claim (close one asset, then the Algos) can't empty while it holds a second asset, and
+        recovery couldn't tell the fundings apart
+    """
+    seen = set()
+    for escrow in escrows:
+        if escrow.client in seen:
+            raise ProvisioningError("escrow of client {} is listed twice".format(escrow.client))
+        seen.add(escrow.client)
+
+
+def read_requests(file_path):
+    """
+        Yields the escrows of a client,asset_id,amount CSV file, lines starting with # and a client
+        header are skipped
+    """
+    with open(file_path, newline='') as f:
+        for row in csv.reader(f):
+            if not row or row[0].startswith('#') or row[0].strip().lower() == 'client':
+                continue
+            yield Escrow(*[value.strip() for value in row[:3]])
+
+
+def read_manifest(file_path):
+    """
+        Returns:
+            list<Escrow>: the rows of a manifest written by write_manifest, None if there is none yet
+    """
+    try:
+        with open(file_path, newline='') as f:
+            return [Escrow(**row) for row in csv.DictReader(f)]
+    except FileNotFoundError:
+        return None
+
+
+def write_manifest(file_path, escrows):
+    # written beside the manifest and renamed over it, so a crash never leaves half a manifest
+    temp_path = file_path + '.tmp'
+    with open(temp_path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(MANIFEST_FIELDS)
+        for escrow in escrows:
+            writer.writerow([escrow.client, escrow.escrow, escrow.asset_id, escrow.amount, escrow.status,
+                             escrow.txid or '', escrow.last_valid or '', escrow.confirmed_round or '',
+                             escrow.error or ''])
+    os.replace(temp_path, file_path)
+
+
+class ProvisioningReport:
+    def __init__(self, escrows, groups, seconds):
+        self.escrows = escrows
+        self.groups = groups
+        self.seconds = seconds
+        self.confirmed = sum(1 for escrow in escrows if escrow.status == 'confirmed')
+        self.failed = len(escrows) - self.confirmed
+
+    def __str__(self):
+        return "{} escrows, {} groups sent: {} confirmed, {} failed in {:.2f}s".format(
+            len(self.escrows), self.groups, self.confirmed, self.failed, self.seconds)
+
+
+class EscrowProvisioner:
+    """
+        Funds, opts in and transfers the locked asset to an escrow per client
+            Args:
+                client (AlgodClient): algod client
+                private_keys (list<str>): private keys of the clients
+                manifest_path (str): CSV manifest of the run, resumed from if it exists
+                concurrency (int): number of groups submitted at the same time
+                validity (int): rounds each group is valid for
+                template (EscrowTemplate): template the escrow programs are made from, defaults to the
+                    locally assembled one
+                index (EscrowIndex): index to record the escrows in as they are confirmed
+    """
+
+    def __init__(self, client, private_keys, manifest_path, concurrency=8, validity=DEFAULT_VALIDITY, template=None,
+                 index=None):
+        self.client = client
+        self.keys = {account.address_from_private_key(key): key for key in private_keys}
+        self.manifest_path = manifest_path
+        self.concurrency = concurrency
+        self.validity = validity
+        self.template = template or escrow_template()
+        self.params = suggested_params_provider(client)
+        self.index = index
+        self._lock = threading.Lock()
+
+    def plan(self, requests):
+        """
+            Returns the rows of the run, from the manifest when resuming
+                Args:
+                    requests (iterable<Escrow>): escrows to provision
+                Returns:
+                    list<Escrow>: manifest rows with their escrow addresses
+        """
+        requests = list(requests)
+        check_unique(requests)
+        escrows = read_manifest(self.manifest_path)
+        if escrows is None:
+            escrows = requests
+            for escrow in escrows:
+                escrow.escrow = self.template.address(escrow.client)
+            self.save(escrows)
+        elif [escrow.key() for escrow in escrows] != [request.key() for request in requests]:
+            raise ProvisioningError(self.manifest_path + " belongs to a different list of escrows")
+        if self.index is not None:
+            self.index.record_provisioned(escrows)
+        return escrows
+
+    def save(self, escrows):
+        with self._lock:
+            write_manifest(self.manifest_path, escrows)
+
+    def recover(self, escrows, tracker):
+        """
+            Settles the rows a previous run may have sent: they are confirmed if their group was,
+            otherwise they are made pending again once their group can no longer be confirmed
+        """
+        unsettled = [escrow for escrow in escrows if escrow.status != 'confirmed' and escrow.txid]
+        if not unsettled:
+            return
+        last_round = self.client.status()['last-round']
+        futures = [tracker.track(escrow.txid, max(1, escrow.last_valid - last_round + 1)) for escrow in unsettled]
+        wait(futures)
+        # a group that didn't confirm in time could still confirm until its last valid round has passed
+        last_valid = max([escrow.last_valid for escrow, future in zip(unsettled, futures)
+                          if future.exception() is not None] or [0])
+        while last_round <= last_valid:
+            last_round = self.client.status_after_block(last_round)['last-round']
+        for escrow, future in zip(unsettled, futures):
+            if future.exception() is None:
+                escrow.confirmed_round = future.result().get('confirmed-round')
+                self._settle(escrow, 'confirmed')
+            elif get_asset_balance(self.client, escrow.escrow, escrow.asset_id) >= escrow.amount:
+                # confirmed but no longer known to the node
+                self._settle(escrow, 'confirmed')
+            else:
+                escrow.txid = escrow.last_valid = None
+                self._settle(escrow, 'pending', str(future.exception()))
+        self.save(escrows)
+
+    def build_group(self, escrow, params, note=None):
+        """
+            Returns:
+                list<Transaction>: the unsigned fund, opt-in and transfer group of escrow
+        """
+        return build_deploy_group(params, escrow.client, escrow.escrow, escrow.asset_id, escrow.amount, note)
+
+    def sign_group(self, escrow, group):
+        private_key = self.keys.get(escrow.client)
+        if private_key is None:
+            raise ProvisioningError("no key for client " + escrow.client)
+        return [group[0].sign(private_key),
+                transaction.LogicSigTransaction(group[1], self.template.logic_sig(escrow.client)),
+                group[2].sign(private_key)]
+
+    def run(self, requests):
+        """
+            Provisions every escrow that isn't confirmed yet and waits for the groups to confirm
+                Args:
+                    requests (iterable<Escrow>): escrows to provision
+                Returns:
+                    ProvisioningReport: per escrow status
+        """
+        start = time.perf_counter()
+        escrows = self.plan(requests)
+        tracker = ConfirmationTracker(self.client, self.validity + 1).start()
+        confirmations = []
+        group_count = 0
+        try:
+            self.recover(escrows, tracker)
+            todo = [escrow for escrow in escrows if escrow.status != 'confirmed']
+            with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+                for offset in range(0, len(todo), self.concurrency):
+                    batch = self._prepare(todo[offset:offset + self.concurrency])
+                    # the manifest names every txid before it is sent
+                    self.save(escrows)
+                    for escrow, signed in batch:
+                        group_count += 1
+                        confirmations.append(pool.submit(self._send, escrow, signed, tracker))
+                wait(confirmations)
+            wait([future.result() for future in confirmations if future.result() is not None])
+        finally:
+            tracker.stop()
+            self.save(escrows)
+        return ProvisioningReport(escrows, group_count, time.perf_counter() - start)
+
+    def _prepare(self, escrows):
+        params = self.params.get()
+        params.last = min(params.last, params.first + self.validity)
+        batch = []
+        for escrow in escrows:
+            try:
+                group = self.build_group(escrow, params)
+                signed = self.sign_group(escrow, group)
+            except Exception as e:
+                self._settle(escrow, 'failed', str(e))
+                continue
+            with self._lock:
+                # the group confirms as a whole, the asset transfer's txid also keys the funding in the index
+                escrow.txid = group[2].get_txid()
+                escrow.last_valid = params.last
+                escrow.status = 'submitted'
+                escrow.error = None
+            batch.append((escrow, signed))
+        return batch
+
+    def _send(self, escrow, signed, tracker):
+        try:
+            self.client.send_transactions(signed)
+        except Exception as e:
+            # the txid stays, the group may have reached the node anyway
+            self._settle(escrow, 'failed', str(e))
+            return None
+        return tracker.track(escrow.txid, callback=lambda future: self._confirmed(escrow, future))
+
+    def _confirmed(self, escrow, future):
+        if future.exception() is None:
+            escrow.confirmed_round = future.result().get('confirmed-round')
+            self._settle(escrow, 'confirmed')
+        else:
+            self._settle(escrow, 'failed', str(future.exception()))
+
+    def _settle(self, escrow, status, error=None):
+        with self._lock:
+            escrow.status = status
+            escrow.error = error
+        if status == 'confirmed' and self.index is not None:
+            self.index.record_provisioned([escrow])
+
+
+def read_keys(file_path):
+    with open(file_path) as f:
+        return [mnemonic.to_private_key(line.strip()) for line in f if line.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Provision stateless escrows for many clients from a CSV file")
+    parser.add_argument('escrows', help="CSV file of client,asset_id,amount")
+    parser.add_argument('--manifest', required=True, help="CSV manifest to write, and to resume from if it exists")
+    parser.add_argument('--config', default='DeveloperConfig.json', help="developer config with algod settings")
+    parser.add_argument('--keys', help="file of client mnemonics, one per line")
+    parser.add_argument('--concurrency', type=int, default=8, help="groups in flight at once")
+    parser.add_argument('--index', help="SQLite escrow index to record the escrows in")
+    args = parser.parse_args(argv)
+
+    config = load_developer_config(args.config)
+    client = get_algod_client(config['algodToken'], config['algodAddress'])
+    private_keys = read_keys(args.keys) if args.keys else []
+    if os.environ.get('ESCROW_MNEMONIC'):
+        private_keys.append(mnemonic.to_private_key(os.environ['ESCROW_MNEMONIC']))
+    index = None
+    if args.index:
+        from contracts.stateless_escrow.escrow_index import EscrowIndex
+        index = EscrowIndex(args.index)
+    provisioner = EscrowProvisioner(client, private_keys, args.manifest, args.concurrency, index=index)
+    try:
+        report = provisioner.run(read_requests(args.escrows))
+    finally:
+        if index is not None:
+            index.close()
+    print(report)
+    return 0 if report.failed == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,7 +1,7 @@
 from algosdk.future import transaction
 from algosdk import account, mnemonic, logic, encoding
-from akita_inu_asa_utils import *
-from pyteal import *
+from akita_inu_asa_utils import create_app_signed_txn, get_algod_client, get_suggested_params, load_compiled, \
+    load_schema, wait_for_txn_confirmation
 
 
 def deploy_app(client, private_key, approval_program, clear_program, global_schema, local_schema, app_args):
@@ -12,7 +12,7 @@ def deploy_app(client, private_key, approval_program, clear_program, global_sche
     on_complete = transaction.OnComplete.NoOpOC.real
 
     # get node suggested parameters
-    params = client.suggested_params()
+    params = get_suggested_params(client)
 
     signed_txn, tx_id = create_app_signed_txn(private_key,
                                               public_key,
@@ -48,8 +48,8 @@ def deploy(algod_address, algod_token, creator_mnemonic, asset_id, end_time):
     algod_client = get_algod_client(algod_token,
                                     algod_address)
 
-    approval_program = load_compiled(file_path='asset_timed_vault_approval.compiled')
-    clear_program = load_compiled(file_path='asset_timed_vault_clear.compiled')
+    approval_program = load_compiled(file_path='asset_timed_vault_approval.bin')
+    clear_program = load_compiled(file_path='asset_timed_vault_clear.bin')
 
     global_schema = load_schema(file_path='globalSchema')
     local_schema = load_schema(file_path='localSchema')
@@ -1,6 +1,6 @@
 from program import compile_app
 from deployment import deploy
-from akita_inu_asa_utils import *
+from akita_inu_asa_utils import get_algod_client, load_developer_config
 
 
 def main():
@@ -5,7 +5,7 @@ on the whole process.
 """
 
 from pyteal import *
-from akita_inu_asa_utils import *
+from akita_inu_asa_utils import compile_program, dump_teal_assembly, generate_teal, write_schema
 
 
 def approval_program():
@@ -184,8 +184,8 @@ def compile_app(algod_client):
     dump_teal_assembly('asset_timed_vault_approval.teal', approval_program)
     dump_teal_assembly('asset_timed_vault_clear.teal', clear_program)
 
-    compile_program(algod_client, approval_program(), 'asset_timed_vault_approval.compiled')
-    compile_program(algod_client, clear_program(), 'asset_timed_vault_clear.compiled')
+    compile_program(algod_client, generate_teal(approval_program), 'asset_timed_vault_approval.bin')
+    compile_program(algod_client, generate_teal(clear_program), 'asset_timed_vault_clear.bin')
 
     write_schema(file_path='localSchema',
                  num_ints=0,
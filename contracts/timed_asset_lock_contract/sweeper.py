@@ -0,0 +1,261 @@
+'''
+Releases expired timed_asset_lock_contract vaults. Every known lock app's global state is read
+once and the app is queued by unlock time; the sweeper sleeps until the earliest unlock time,
+waits for a block at least that recent (the contract checks the latest block timestamp), then
+deletes every app that has expired from the receivers' accounts. Deletes sharing a sweep are built
+from one set of suggested params, submitted from a pool of worker threads and confirmed together
+by one ConfirmationTracker, so no app is looked at again before it unlocks.
+
+    python -m contracts.timed_asset_lock_contract.sweeper apps.txt [--config DeveloperConfig.json]
+
+apps.txt lists one app id per line. Receiver keys are read from the SWEEPER_MNEMONIC environment
+variable and/or a --keys file with one mnemonic per line.
+'''
+import argparse
+import heapq
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import msgpack
+from algosdk import account, encoding, mnemonic
+from algosdk.future import transaction
+
+from akita_inu_asa_utils import ConfirmationTracker, get_algod_client, load_developer_config, \
+    read_app_global_state, suggested_params_provider
+
+# the delete call pays for closing out the asset and the Algos
+DELETE_FEE = 3000
+
+
+class Lock:
+    def __init__(self, app_id, asset_id, receiver, unlock_time):
+        self.app_id = app_id
+        self.asset_id = asset_id
+        self.receiver = receiver
+        self.unlock_time = unlock_time
+        self.status = 'queued'
+        self.txid = None
+        self.error = None
+
+    def __lt__(self, other):
+        return (self.unlock_time, self.app_id) < (other.unlock_time, other.app_id)
+
+
+def read_lock(client, app_id):
+    """
+        Returns:
+            Lock: asset, receiver and unlock time of a lock app, from its global state
+    """
+    state = read_app_global_state(client, app_id)
+    return Lock(app_id, state['asset_id'], encoding.encode_address(state['receiver_address_key']),
+                state['unlock_time'])
+
+
+def build_delete(params, lock):
+    return transaction.ApplicationDeleteTxn(lock.receiver, params, lock.app_id, foreign_assets=[lock.asset_id])
+
+
+class UnlockSweeper:
+    """
+        Deletes lock apps as they expire
+            Args:
+                client (AlgodClient): algod client
+                private_keys (list<str>): private keys of the receivers
+                batch_size (int): deletes built from the same params
+                concurrency (int): deletes submitted at the same time
+                timeout (int): rounds to wait for each delete's confirmation
+    """
+
+    def __init__(self, client, private_keys, batch_size=64, concurrency=8, timeout=5):
+        self.client = client
+        self.keys = {account.address_from_private_key(key): key for key in private_keys}
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.params = suggested_params_provider(client)
+        self.tracker = ConfirmationTracker(client, timeout)
+        self.unlocked = []
+        self.failed = []
+        self._queue = []
+        self._condition = threading.Condition()
+        self._stopped = False
+
+    def add(self, lock):
+        """
+            Queues a lock, waking the sweeper if it unlocks before the ones queued so far
+        """
+        if lock.receiver not in self.keys:
+            raise ValueError("no key for receiver {} of app {}".format(lock.receiver, lock.app_id))
+        with self._condition:
+            heapq.heappush(self._queue, lock)
+            self._condition.notify()
+        return lock
+
+    def add_apps(self, app_ids, workers=8):
+        """
+            Reads the global state of each app once and queues its lock. Apps that can't be read,
+            e.g. already deleted, are skipped
+                Returns:
+                    list<Lock>: the queued locks
+        """
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            locks = list(pool.map(self._read_lock, app_ids))
+        return [self.add(lock) for lock in locks if lock is not None]
+
+    def _read_lock(self, app_id):
+        try:
+            return read_lock(self.client, app_id)
+        except Exception as e:
+            print("skipping app {}: {}".format(app_id, e))
+            return None
+
+    def __len__(self):
+        with self._condition:
+            return len(self._queue)
+
+    def next_unlock_time(self):
+        with self._condition:
+            return self._queue[0].unlock_time if self._queue else None
+
+    def latest_timestamp(self):
+        """
+            Returns:
+                tuple: last round and its block timestamp, the Global.latest_timestamp of the next round
+        """
+        last_round = self.client.status()['last-round']
+        # local state deltas of app calls are keyed by account index, not by string
+        block = msgpack.unpackb(self.client.block_info(last_round, response_format='msgpack'), raw=False,
+                                strict_map_key=False)
+        return last_round, block['block'].get('ts', 0)
+
+    def _due(self, timestamp):
+        with self._condition:
+            due = []
+            while self._queue and self._queue[0].unlock_time <= timestamp:
+                due.append(heapq.heappop(self._queue))
+            return due
+
+    def sweep(self, timestamp):
+        """
+            Deletes every queued app that unlocks by timestamp
+                Args:
+                    timestamp (int): latest block timestamp
+                Returns:
+                    list<(Lock, Future)>: the submitted deletes and their confirmations
+        """
+        due = self._due(timestamp)
+        if not due:
+            return []
+        self.tracker.start()
+        submitted = []
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            for start in range(0, len(due), self.batch_size):
+                params = self.params.get()
+                params.fee = DELETE_FEE
+                params.flat_fee = True
+                batch = due[start:start + self.batch_size]
+                submitted.extend(zip(batch, pool.map(lambda lock: self._send(lock, params), batch)))
+        return [(lock, future) for lock, future in submitted if future is not None]
+
+    def _send(self, lock, params):
+        txn = build_delete(params, lock)
+        lock.txid = txn.get_txid()
+        try:
+            self.client.send_transactions([txn.sign(self.keys[lock.receiver])])
+        except Exception as e:
+            self._settle(lock, 'failed', e)
+            return None
+        lock.status = 'submitted'
+        return self.tracker.track(lock.txid, callback=lambda future: self._confirmed(lock, future))
+
+    def _confirmed(self, lock, future):
+        if future.exception() is None:
+            self._settle(lock, 'unlocked')
+        else:
+            self._settle(lock, 'failed', future.exception())
+
+    def _settle(self, lock, status, error=None):
+        with self._condition:
+            lock.status = status
+            lock.error = None if error is None else str(error)
+            (self.unlocked if error is None else self.failed).append(lock)
+
+    def run(self, until_empty=False):
+        """
+            Sweeps as locks expire until stop is called, or until the queue is empty, then waits for
+            the submitted deletes to confirm
+        """
+        confirmations = []
+        while True:
+            unlock_time = self._wait_for_unlock(until_empty)
+            if unlock_time is None:
+                break
+            last_round, timestamp = self.latest_timestamp()
+            # the clock can be ahead of the chain, wait for a block from after the unlock time
+            while timestamp < unlock_time and not self._stopped:
+                self.client.status_after_block(last_round)
+                last_round, timestamp = self.latest_timestamp()
+            for lock, future in self.sweep(timestamp):
+                print("deleting app {} for {}: {}".format(lock.app_id, lock.receiver, lock.txid))
+                confirmations.append(future)
+        wait(confirmations)
+        self.tracker.stop()
+
+    def _wait_for_unlock(self, until_empty):
+        # sleeps until the earliest lock's unlock time, woken early by add and stop
+        with self._condition:
+            while not self._stopped:
+                if not self._queue:
+                    if until_empty:
+                        return None
+                    self._condition.wait()
+                    continue
+                delay = self._queue[0].unlock_time - time.time()
+                if delay <= 0:
+                    return self._queue[0].unlock_time
+                self._condition.wait(delay)
+            return None
+
+    def stop(self):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+
+
+def read_keys(file_path):
+    with open(file_path) as f:
+        return [mnemonic.to_private_key(line.strip()) for line in f if line.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Delete timed_asset_lock_contract apps as they unlock")
+    parser.add_argument('apps', help="file of lock app ids, one per line")
+    parser.add_argument('--config', default='DeveloperConfig.json', help="developer config with algod settings")
+    parser.add_argument('--keys', help="file of receiver mnemonics, one per line")
+    parser.add_argument('--batch-size', type=int, default=64, help="deletes built from the same params")
+    parser.add_argument('--concurrency', type=int, default=8, help="deletes in flight at once")
+    args = parser.parse_args(argv)
+
+    config = load_developer_config(args.config)
+    client = get_algod_client(config['algodToken'], config['algodAddress'])
+    private_keys = read_keys(args.keys) if args.keys else []
+    if os.environ.get('SWEEPER_MNEMONIC'):
+        private_keys.append(mnemonic.to_private_key(os.environ['SWEEPER_MNEMONIC']))
+    sweeper = UnlockSweeper(client, private_keys, args.batch_size, args.concurrency)
+    with open(args.apps) as f:
+        sweeper.add_apps([int(line) for line in f if line.strip()])
+    print("{} locks queued, next unlocks at {}".format(len(sweeper), sweeper.next_unlock_time()))
+    try:
+        sweeper.run(until_empty=True)
+    except KeyboardInterrupt:
+        sweeper.stop()
+    print("{} unlocked, {} failed".format(len(sweeper.unlocked), len(sweeper.failed)))
+    for lock in sweeper.failed:
+        print("app {}: {}".format(lock.app_id, lock.error))
+    return 0 if not sweeper.failed else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,14 +2,56 @@
 This tool is meant to be a CLI help tool that lets you fill in information about the various
 interactions and transactions with the timed_asset_lock_contract and to dump the transaction
 to a base64 string which could then be used with tools with non-power users
+
+Run without arguments for the interactive prompts. With --batch it reads a JSONL spec of
+transactions instead, one object per line, e.g.
+
+    {"op": "create", "sender": "...", "asset_id": 1, "receiver": "...", "end_time": 1636903860}
+    {"op": "pay", "sender": "...", "escrow": "...", "amount": 1300000}
+    {"op": "opt_in", "sender": "...", "app_id": 2, "asset_id": 1}
+    {"op": "setup", "sender": "...", "app_id": 2, "asset_id": 1}
+    {"op": "pay_asset", "sender": "...", "escrow": "...", "asset_id": 1, "amount": 100}
+    {"op": "delete", "sender": "...", "app_id": 2, "asset_id": 1}
+
+and streams one base64 transaction per line (or concatenated msgpack with --raw, as goal clerk
+reads it) to --output or stdout. Suggested params are fetched once for the whole batch.
+
+    python -m contracts.timed_asset_lock_contract.transaction_builder --batch spec.jsonl --output txns.txt
 '''
+import argparse
+import base64
+import json
 import sys
 
 from algosdk.future import transaction
 from algosdk import encoding
-from akita_inu_asa_utils import get_algod_client, load_developer_config, load_compiled, load_schema
-from .program import compile_app
+from akita_inu_asa_utils import get_algod_client, get_suggested_params, load_developer_config, load_compiled, \
+    load_schema
+
+# microAlgos the escrow is funded with when a pay spec has no amount
+ESCROW_FUNDING = int(1.3 * 1e6)
+
+PROMPTS = {
+    'sender': "sender public key",
+    'asset_id': "asset id",
+    'receiver': "escrow receiver",
+    'end_time': "end time unix UTC",
+    'escrow': "escrow address",
+    'app_id': "app id",
+    'amount': "asset amount to send",
+}
+
+# fields asked for by the interactive mode, in prompt order
+OPERATION_FIELDS = {
+    'create': ['sender', 'asset_id', 'receiver', 'end_time'],
+    'pay': ['sender', 'escrow'],
+    'opt_in': ['sender', 'app_id', 'asset_id'],
+    'setup': ['sender', 'app_id', 'asset_id'],
+    'pay_asset': ['sender', 'escrow', 'amount', 'asset_id'],
+    'delete': ['sender', 'app_id', 'asset_id'],
+}
 
+MENU = ['create', 'pay', 'opt_in', 'setup', 'pay_asset', 'delete']
 
 alreadyCollected = {}
 
@@ -29,70 +71,158 @@ def collect_info(info_key, store=True):
     return value
 
 
-def main():
+def load_programs(client):
+    """
+    Compiles the app and loads its programs and schemas for create transactions
+    """
+    # PyTeal is only needed when the batch creates apps
+    from .program import compile_app
+    compile_app(client)
+    return {'approval_program': load_compiled(file_path='asset_timed_vault_approval.bin'),
+            'clear_program': load_compiled(file_path='asset_timed_vault_clear.bin'),
+            'global_schema': load_schema(file_path='globalSchema'),
+            'local_schema': load_schema(file_path='localSchema')}
+
+
+def build_transaction(spec, params, programs=None):
+    """
+    Builds the transaction described by spec
+    :params: spec dict with an op from OPERATION_FIELDS and its fields
+    :params: params suggested params shared by all transactions
+    :params: programs from load_programs, needed by create
+    :return: unsigned transaction
+    """
+    op = spec.get('op')
+    if op not in OPERATION_FIELDS:
+        raise ValueError("unknown op {!r}".format(op))
+    sender = spec['sender']
+    if op == 'create':
+        if programs is None:
+            raise ValueError("create needs the compiled programs")
+        return transaction.ApplicationCreateTxn(sender=sender,
+                                                sp=params,
+                                                on_complete=transaction.OnComplete.NoOpOC.real,
+                                                app_args=[int(spec['asset_id']).to_bytes(8, "big"),
+                                                          encoding.decode_address(str(spec['receiver'])),
+                                                          int(spec['end_time']).to_bytes(8, "big")],
+                                                **programs)
+    elif op == 'pay':
+        return transaction.PaymentTxn(sender=sender,
+                                      sp=params,
+                                      receiver=spec['escrow'],
+                                      amt=int(spec.get('amount', ESCROW_FUNDING)))  # microAlgos
+    elif op == 'opt_in':
+        return transaction.ApplicationOptInTxn(sender=sender,
+                                               sp=params,
+                                               index=int(spec['app_id']),
+                                               foreign_assets=[int(spec['asset_id'])])
+    elif op == 'setup':
+        return transaction.ApplicationNoOpTxn(sender=sender,
+                                              sp=params,
+                                              index=int(spec['app_id']),
+                                              foreign_assets=[int(spec['asset_id'])])
+    elif op == 'pay_asset':
+        return transaction.AssetTransferTxn(sender=sender,
+                                            sp=params,
+                                            receiver=spec['escrow'],
+                                            amt=int(spec['amount']),
+                                            index=int(spec['asset_id']))
+    return transaction.ApplicationDeleteTxn(sender=sender,
+                                            sp=params,
+                                            index=int(spec['app_id']),
+                                            foreign_assets=[int(spec['asset_id'])])
+
+
+def stream_batch(client, lines, out, raw=False, errors=sys.stderr):
+    """
+    Builds the transaction of each JSONL spec line and writes it to out as it goes, so memory
+    use doesn't grow with the batch. Lines that fail are reported to errors and skipped
+    :params: client algod client, used once for params and once to compile if there are creates
+    :params: lines iterable of JSONL spec lines
+    :params: out text stream, or binary stream when raw
+    :params: raw write concatenated msgpack instead of base64 lines
+    :return: (number of transactions written, number of failed lines)
+    """
+    params = get_suggested_params(client)
+    programs = None
+    written = 0
+    failed = 0
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            spec = json.loads(line)
+            if spec.get('op') == 'create' and programs is None:
+                programs = load_programs(client)
+            encoded = encoding.msgpack_encode(build_transaction(spec, params, programs))
+        except Exception as e:
+            errors.write("line {}: {}: {}\n".format(line_number, type(e).__name__, e))
+            failed += 1
+            continue
+        if raw:
+            out.write(base64.b64decode(encoded))
+        else:
+            out.write(encoded + "\n")
+        written += 1
+    return written, failed
+
+
+def interactive(client):
     """
     Command line interface
     """
-    config = load_developer_config()
+    while True:
+        selection = int(input("Select Transaction To Build...\n"
+                              "1.) App Creation \n"
+                              "2.) Pay Algo \n"
+                              "3.) App Opt In \n"
+                              "4.) App Setup \n"
+                              "5.) Pay Asset \n"
+                              "6.) App Delete \n"
+                              "7.) Exit Utility \n"))
+        if selection == 7:
+            return
+        if not 1 <= selection <= len(MENU):
+            continue
+        op = MENU[selection - 1]
+        spec = {'op': op}
+        for field in OPERATION_FIELDS[op]:
+            # the asset amount changes from one transfer to the next
+            spec[field] = collect_info(PROMPTS[field], store=field != 'amount')
+        programs = load_programs(client) if op == 'create' else None
+        txn = build_transaction(spec, get_suggested_params(client), programs)
+        print("\n" + encoding.msgpack_encode(txn) + "\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build timed_asset_lock_contract transactions")
+    parser.add_argument('--config', default='DeveloperConfig.json', help="developer config with algod settings")
+    parser.add_argument('--batch', help="JSONL spec of the transactions to build, - for stdin")
+    parser.add_argument('--output', help="file to write the transactions to, defaults to stdout")
+    parser.add_argument('--raw', action='store_true', help="write concatenated msgpack instead of base64 lines")
+    args = parser.parse_args(argv)
+
+    config = load_developer_config(args.config)
     client = get_algod_client(config["algodToken"], config["algodAddress"])
-    selection = int(input("Select Transaction To Build...\n"
-                          "1.) App Creation \n"
-                          "2.) Pay Algo \n"
-                          "3.) App Opt In \n"
-                          "4.) App Setup \n"
-                          "5.) Pay Asset \n"
-                          "6.) App Delete \n"
-                          "7.) Exit Utility \n"))
-    txn = None
-    if selection == 1:
-        compile_app(client)
-        txn = transaction.ApplicationCreateTxn(sender=collect_info("sender public key"),
-                                               sp=client.suggested_params(),
-                                               on_complete=transaction.OnComplete.NoOpOC.real,
-                                               approval_program=load_compiled(
-                                                   file_path='asset_timed_vault_approval.compiled'),
-                                               clear_program=load_compiled(
-                                                   file_path='asset_timed_vault_clear.compiled'),
-                                               global_schema=load_schema(file_path='globalSchema'),
-                                               local_schema=load_schema(file_path='localSchema'),
-                                               app_args=[int(collect_info("asset id"))
-                                                            .to_bytes(8, "big"),
-                                                         encoding.decode_address(
-                                                             str(collect_info("escrow receiver"))),
-                                                         int(collect_info("end time unix UTC"))
-                                                            .to_bytes(8, "big")]
-                                               )
-    elif selection == 2:
-        txn = transaction.PaymentTxn(sender=collect_info("sender public key"),
-                                     sp=client.suggested_params(),
-                                     receiver=collect_info("escrow address"),
-                                     amt=int(1.3 * 1e6))  # microAlgos
-    elif selection == 3:
-        txn = transaction.ApplicationOptInTxn(sender=collect_info("sender public key"),
-                                              sp=client.suggested_params(),
-                                              index=int(collect_info("app id")),
-                                              foreign_assets=[int(collect_info("asset id"))],)
-    elif selection == 4:
-        txn = transaction.ApplicationNoOpTxn(sender=collect_info("sender public key"),
-                                             sp=client.suggested_params(),
-                                             index=int(collect_info("app id")),
-                                             foreign_assets=[int(collect_info("asset id"))])
-    elif selection == 5:
-        txn = transaction.AssetTransferTxn(sender=collect_info("sender public key"),
-                                           sp=client.suggested_params(),
-                                           receiver=collect_info("escrow address"),
-                                           amt=int(collect_info("asset amount to send", False)),
-                                           index=int(int(collect_info("asset id"))))
-    elif selection == 6:
-        txn = transaction.ApplicationDeleteTxn(sender=collect_info("sender public key"),
-                                               sp=client.suggested_params(),
-                                               index=int(collect_info("app id")),
-                                               foreign_assets=[int(collect_info("asset id"))])
-    elif selection == 7:
-        sys.exit()
-
-    print("\n" + encoding.msgpack_encode(txn) + "\n")
-    main()
-
-
-main()
+    if args.batch is None:
+        interactive(client)
+        return 0
+
+    spec = sys.stdin if args.batch == '-' else open(args.batch)
+    if args.output:
+        out = open(args.output, 'wb' if args.raw else 'w')
+    else:
+        out = sys.stdout.buffer if args.raw else sys.stdout
+    try:
+        written, failed = stream_batch(client, spec, out, args.raw)
+    finally:
+        if spec is not sys.stdin:
+            spec.close()
+        if args.output:
+            out.close()
+    sys.stderr.write("{} transactions written, {} lines failed\n".format(written, failed))
+    return 0 if failed == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
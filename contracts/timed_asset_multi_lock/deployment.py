@@ -0,0 +1,245 @@
+'''
+Deployment and transaction builders for timed_asset_multi_lock. One application is deployed and
+funded once; after that a lock is a deposit and a lock call, and lock_assets packs up to
+LOCKS_PER_GROUP of them into each atomic group.
+
+    app_id = deploy(algod_client, creator_mnemonic, [asset_id])
+    # each receiver once: opt_in(algod_client, receiver_mnemonic, app_id)
+    lock_ids = lock_assets(algod_client, creator_mnemonic, app_id, [(receiver, asset_id, amount, unlock_time)])
+
+Receivers must unlock their locks and close out rather than clear their local state: clearing
+gives up the locks, and their assets can then only be swept back by the creator.
+'''
+import base64
+import copy
+
+from algosdk import account, mnemonic
+from algosdk.future import transaction
+
+from akita_inu_asa_utils import create_app_signed_txn, get_account_snapshot, get_application_address, \
+    get_suggested_params, load_compiled, load_schema, wait_for_txn_confirmation, wait_for_txn_confirmations
+
+# two transactions per lock in a group of at most 16
+LOCKS_PER_GROUP = 8
+# microAlgos the application account needs, and needs more of per asset it holds
+APP_FUNDING = 100000
+ASSET_FUNDING = 100000
+# calls sending an inner transaction pay for it
+INNER_CALL_FEE = 2000
+
+
+def _flat_fee(params, fee):
+    params = copy.copy(params)
+    params.fee = fee
+    params.flat_fee = True
+    return params
+
+
+def build_add_assets(params, creator, app_id, asset_ids):
+    """
+        Funds the application for the assets and opts it into them
+            Returns:
+                list<Transaction>: payment and an add_asset call per asset, grouped
+    """
+    txns = [transaction.PaymentTxn(creator, params, get_application_address(app_id),
+                                   ASSET_FUNDING * len(asset_ids))]
+    for asset_id in asset_ids:
+        txns.append(transaction.ApplicationNoOpTxn(creator, _flat_fee(params, INNER_CALL_FEE), app_id,
+                                                   [b"add_asset"], foreign_assets=[asset_id]))
+    return transaction.assign_group_id(txns)
+
+
+def build_opt_in(params, receiver, app_id):
+    return transaction.ApplicationOptInTxn(receiver, params, app_id)
+
+
+def build_close_out(params, receiver, app_id):
+    return transaction.ApplicationCloseOutTxn(receiver, params, app_id)
+
+
+def build_lock(params, creator, app_id, receiver, asset_id, amount, unlock_time, note=None):
+    """
+        Returns:
+            list<Transaction>: the deposit and the lock call of one lock, not grouped
+    """
+    return [transaction.AssetTransferTxn(creator, params, get_application_address(app_id), amount, asset_id),
+            transaction.ApplicationNoOpTxn(creator, params, app_id, [b"lock", unlock_time.to_bytes(8, "big")],
+                                           accounts=[receiver], foreign_assets=[asset_id], note=note)]
+
+
+def build_lock_groups(params, creator, app_id, locks):
+    """
+        Builds the groups locking many assets
+            Args:
+                locks (iterable): (receiver, asset_id, amount, unlock_time) per lock
+            Returns:
+                list<list<Transaction>>: groups of up to LOCKS_PER_GROUP locks
+    """
+    locks = list(locks)
+    groups = []
+    seen = set()
+    for start in range(0, len(locks), LOCKS_PER_GROUP):
+        txns = []
+        for index, lock in enumerate(locks[start:start + LOCKS_PER_GROUP], start):
+            lock = tuple(lock)
+            # identical locks would otherwise be identical transactions
+            note = None if lock not in seen else 'lock {}'.format(index).encode()
+            seen.add(lock)
+            txns.extend(build_lock(params, creator, app_id, *lock, note=note))
+        groups.append(transaction.assign_group_id(txns))
+    return groups
+
+
+def build_unlock(params, receiver, app_id, asset_id, lock_id):
+    return transaction.ApplicationNoOpTxn(receiver, _flat_fee(params, INNER_CALL_FEE), app_id,
+                                          [b"unlock", lock_id.to_bytes(8, "big")], foreign_assets=[asset_id])
+
+
+def build_sweep(params, creator, app_id, asset_id):
+    """
+        Returns:
+            Transaction: the call sending the creator what the app holds of asset_id above its locked total
+    """
+    return transaction.ApplicationNoOpTxn(creator, _flat_fee(params, INNER_CALL_FEE), app_id, [b"sweep"],
+                                          foreign_assets=[asset_id])
+
+
+def lock_id_from_logs(logs):
+    """
+        Returns:
+            int: the lock ID logged by a lock call, from its base64 pending transaction logs
+    """
+    return int.from_bytes(base64.b64decode(logs[0]), "big")
+
+
+def decode_locks(key_values):
+    """
+        Decodes the locks of a receiver's local state
+            Args:
+                key_values (list): the key-value list of an account's apps-local-state entry
+            Returns:
+                dict: lock ID -> asset_id, amount and unlock_time
+    """
+    locks = {}
+    for key_value in key_values:
+        if key_value['value']['type'] != 1:
+            continue
+        # slot -> lock ID, asset, amount and unlock time
+        value = base64.b64decode(key_value['value']['bytes'])
+        locks[int.from_bytes(value[0:8], "big")] = {'asset_id': int.from_bytes(value[8:16], "big"),
+                                                    'amount': int.from_bytes(value[16:24], "big"),
+                                                    'unlock_time': int.from_bytes(value[24:32], "big")}
+    return locks
+
+
+def decode_locked_totals(key_values):
+    """
+        Decodes the locked totals of the application's global state
+            Args:
+                key_values (list): the key-value list of the application's global-state
+            Returns:
+                dict: asset ID -> amount locked
+    """
+    totals = {}
+    for key_value in key_values:
+        key = base64.b64decode(key_value['key'])
+        if key_value['value']['type'] == 2 and len(key) == 8:
+            totals[int.from_bytes(key, "big")] = key_value['value']['uint']
+    return totals
+
+
+def read_locks(client, receiver, app_id):
+    """
+        Returns:
+            dict: lock ID -> asset_id, amount and unlock_time of the locks receiver holds in app_id
+    """
+    local_state = get_account_snapshot(client, receiver).local_states.get(app_id)
+    return decode_locks(local_state.get('key-value', []) if local_state else [])
+
+
+def read_locked_totals(client, app_id):
+    """
+        Returns:
+            dict: asset ID -> amount locked in app_id, the asset keys aren't text so
+                read_app_global_state can't decode them
+    """
+    return decode_locked_totals(client.application_info(app_id)['params'].get('global-state', []))
+
+
+def deploy(algod_client, creator_mnemonic, asset_ids=()):
+    """
+        Creates the application, funds it and opts it into asset_ids
+            Returns:
+                int: app id
+    """
+    private_key = mnemonic.to_private_key(creator_mnemonic)
+    public_key = account.address_from_private_key(private_key)
+    params = get_suggested_params(algod_client)
+
+    signed_txn, tx_id = create_app_signed_txn(private_key,
+                                              public_key,
+                                              params,
+                                              transaction.OnComplete.NoOpOC.real,
+                                              load_compiled(file_path='timed_asset_multi_lock_approval.bin'),
+                                              load_compiled(file_path='timed_asset_multi_lock_clear.bin'),
+                                              load_schema(file_path='globalSchema'),
+                                              load_schema(file_path='localSchema'),
+                                              [])
+    algod_client.send_transactions([signed_txn])
+    app_id = wait_for_txn_confirmation(algod_client, tx_id, 5)['application-index']
+    print("Deployed new app-id: " + str(app_id))
+
+    fund = transaction.PaymentTxn(public_key, params, get_application_address(app_id), APP_FUNDING)
+    algod_client.send_transactions([fund.sign(private_key)])
+    wait_for_txn_confirmation(algod_client, fund.get_txid(), 5)
+    if asset_ids:
+        add_assets(algod_client, creator_mnemonic, app_id, asset_ids)
+    return app_id
+
+
+def add_assets(algod_client, creator_mnemonic, app_id, asset_ids):
+    private_key = mnemonic.to_private_key(creator_mnemonic)
+    group = build_add_assets(get_suggested_params(algod_client), account.address_from_private_key(private_key),
+                             app_id, list(asset_ids))
+    algod_client.send_transactions([txn.sign(private_key) for txn in group])
+    wait_for_txn_confirmation(algod_client, group[0].get_txid(), 5)
+
+
+def opt_in(algod_client, receiver_mnemonic, app_id):
+    private_key = mnemonic.to_private_key(receiver_mnemonic)
+    txn = build_opt_in(get_suggested_params(algod_client), account.address_from_private_key(private_key), app_id)
+    algod_client.send_transactions([txn.sign(private_key)])
+    wait_for_txn_confirmation(algod_client, txn.get_txid(), 5)
+
+
+def lock_assets(algod_client, creator_mnemonic, app_id, locks, timeout=5):
+    """
+        Locks assets for receivers that have opted in, sending every group before waiting for any
+            Args:
+                locks (iterable): (receiver, asset_id, amount, unlock_time) per lock
+            Returns:
+                list<int>: lock ID of each lock, in order
+    """
+    private_key = mnemonic.to_private_key(creator_mnemonic)
+    groups = build_lock_groups(get_suggested_params(algod_client), account.address_from_private_key(private_key),
+                               app_id, locks)
+    for group in groups:
+        algod_client.send_transactions([txn.sign(private_key) for txn in group])
+    lock_calls = [txn.get_txid() for group in groups for txn in group[1::2]]
+    return [lock_id_from_logs(info['logs']) for info in wait_for_txn_confirmations(algod_client, lock_calls, timeout)]
+
+
+def unlock(algod_client, receiver_mnemonic, app_id, asset_id, lock_id):
+    private_key = mnemonic.to_private_key(receiver_mnemonic)
+    txn = build_unlock(get_suggested_params(algod_client), account.address_from_private_key(private_key), app_id,
+                       asset_id, lock_id)
+    algod_client.send_transactions([txn.sign(private_key)])
+    return wait_for_txn_confirmation(algod_client, txn.get_txid(), 5)
+
+
+def sweep(algod_client, creator_mnemonic, app_id, asset_id):
+    private_key = mnemonic.to_private_key(creator_mnemonic)
+    txn = build_sweep(get_suggested_params(algod_client), account.address_from_private_key(private_key), app_id,
+                      asset_id)
+    algod_client.send_transactions([txn.sign(private_key)])
+    return wait_for_txn_confirmation(algod_client, txn.get_txid(), 5)
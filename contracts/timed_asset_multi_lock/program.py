@@ -0,0 +1,241 @@
+"""
+Timed asset locks, many per application. Where timed_asset_lock_contract needs an application per
+lock, this one holds the locked assets of any number of locks in its application account and
+records each lock in one of the receiver's local state slots, under a lock ID handed out from
+global state.
+
+A receiver opts in once and can then hold up to MAX_LOCKS_PER_ACCOUNT locks at a time. The creator
+locks an asset for a receiver with a deposit followed by a lock call, and several locks fit in one
+atomic group. Once the unlock time has passed the receiver releases a lock with an unlock call.
+
+Global state keeps the total locked per asset. A receiver clearing its local state loses its
+locks: the clear program takes them off the totals, and the creator can sweep whatever the
+application holds above the totals, so the assets are never stranded.
+"""
+
+from pyteal import *
+from akita_inu_asa_utils import compile_program, dump_teal_assembly, generate_teal, write_schema
+
+# locks a receiver can hold at once, one local byte slice each
+MAX_LOCKS_PER_ACCOUNT = 15
+# assets the application can lock, one global uint each for the locked total
+MAX_ASSETS = 15
+
+NEXT_LOCK_ID_KEY = "next_lock_id"
+LOCK_COUNT_KEY = "lock_count"
+
+
+def lock_slots(receiver: Expr, each) -> Expr:
+    '''
+    Runs each(slot, lock) over the receiver's lock slots, lock holding the slot's local state
+    '''
+    slot = ScratchVar(TealType.uint64)
+    lock = App.localGetEx(receiver, App.id(), Itob(slot.load()))
+    return For(slot.store(Int(0)), slot.load() < Int(MAX_LOCKS_PER_ACCOUNT), slot.store(slot.load() + Int(1))).Do(
+        Seq(lock, each(slot, lock))
+    )
+
+
+def approval_program():
+    '''
+    Lock entries are 32 bytes under the 8 byte slot index: lock ID, asset ID, amount and unlock
+    time, each a big-endian uint64. Locked totals are uints under the 8 byte asset ID.
+    '''
+
+    # ID the next lock gets
+    next_lock_id_key = Bytes(NEXT_LOCK_ID_KEY)
+    # Number of locks held by a receiver, it can only close out without any
+    lock_count_key = Bytes(LOCK_COUNT_KEY)
+    asset_key = Itob(Txn.assets[0])
+
+    @Subroutine(TealType.none)
+    def send_asset(asset_id: Expr, amount: Expr, receiver: Expr) -> Expr:
+        return Seq(
+            InnerTxnBuilder.Begin(),
+            InnerTxnBuilder.SetFields(
+                {
+                    TxnField.type_enum: TxnType.AssetTransfer,
+                    TxnField.xfer_asset: asset_id,
+                    TxnField.asset_amount: amount,
+                    TxnField.asset_receiver: receiver,
+                }
+            ),
+            InnerTxnBuilder.Submit(),
+        )
+
+    on_create = Seq(
+        App.globalPut(next_lock_id_key, Int(1)),
+        Approve(),
+    )
+
+    # Receivers opt in to hold locks.
+    on_opt_in = Seq(
+        App.localPut(Txn.sender(), lock_count_key, Int(0)),
+        Approve(),
+    )
+
+    # Closing out with locks left would lose them.
+    on_close_out = Seq(
+        Assert(App.localGet(Txn.sender(), lock_count_key) == Int(0)),
+        Approve(),
+    )
+
+    # The creator opts the application into an asset before locking it.
+    # assets[0]: the asset
+    added = App.globalGetEx(Int(0), asset_key)
+    on_add_asset = Seq(
+        Assert(Txn.sender() == Global.creator_address()),
+        added,
+        # Adding it again would reset its locked total
+        Assert(Not(added.hasValue())),
+        App.globalPut(asset_key, Int(0)),
+        send_asset(Txn.assets[0], Int(0), Global.current_application_address()),
+        Approve(),
+    )
+
+    # The creator locks the asset deposited by the previous transaction of the group.
+    # arg[1]: the Unix timestamp after which the receiver can unlock
+    # accounts[1]: the receiver, opted in
+    # assets[0]: the asset deposited
+    lock_id = ScratchVar(TealType.uint64)
+    free_slot = ScratchVar(TealType.uint64)
+    locked = App.globalGetEx(Int(0), asset_key)
+    deposit = Gtxn[Txn.group_index() - Int(1)]
+    receiver = Txn.accounts[1]
+    on_lock = Seq(
+        Assert(
+            And(
+                Txn.sender() == Global.creator_address(),
+                Txn.group_index() > Int(0),
+                Len(Txn.application_args[1]) == Int(8),
+                App.optedIn(receiver, App.id()),
+            )
+        ),
+        Assert(
+            And(
+                deposit.type_enum() == TxnType.AssetTransfer,
+                deposit.sender() == Txn.sender(),
+                deposit.xfer_asset() == Txn.assets[0],
+                deposit.asset_receiver() == Global.current_application_address(),
+                deposit.asset_amount() > Int(0),
+                deposit.asset_close_to() == Global.zero_address(),
+            )
+        ),
+        locked,
+        Assert(locked.hasValue()),
+        # A receiver without a free slot gets slot MAX_LOCKS_PER_ACCOUNT, which its schema rejects
+        free_slot.store(Int(MAX_LOCKS_PER_ACCOUNT)),
+        lock_slots(receiver, lambda slot, lock: If(Not(lock.hasValue())).Then(
+            Seq(free_slot.store(slot.load()), Break()))),
+        lock_id.store(App.globalGet(next_lock_id_key)),
+        App.globalPut(next_lock_id_key, lock_id.load() + Int(1)),
+        App.localPut(receiver, Itob(free_slot.load()),
+                     Concat(Itob(lock_id.load()), asset_key, Itob(deposit.asset_amount()),
+                            Txn.application_args[1])),
+        App.localPut(receiver, lock_count_key, App.localGet(receiver, lock_count_key) + Int(1)),
+        App.globalPut(asset_key, locked.value() + deposit.asset_amount()),
+        # The lock ID is logged so the creator can tell it to the receiver
+        Log(Itob(lock_id.load())),
+        Approve(),
+    )
+
+    # The receiver releases one of its locks once the unlock time has passed.
+    # arg[1]: the lock ID
+    # assets[0]: the locked asset
+    lock_slot = ScratchVar(TealType.uint64)
+    lock = ScratchVar(TealType.bytes)
+    amount = ExtractUint64(lock.load(), Int(16))
+    on_unlock = Seq(
+        Assert(Len(Txn.application_args[1]) == Int(8)),
+        lock_slot.store(Int(MAX_LOCKS_PER_ACCOUNT)),
+        lock.store(Bytes("")),
+        lock_slots(Txn.sender(), lambda slot, entry: If(entry.hasValue()).Then(
+            If(Extract(entry.value(), Int(0), Int(8)) == Txn.application_args[1]).Then(
+                Seq(lock_slot.store(slot.load()), lock.store(entry.value()), Break())))),
+        Assert(lock_slot.load() < Int(MAX_LOCKS_PER_ACCOUNT)),
+        Assert(
+            And(
+                ExtractUint64(lock.load(), Int(8)) == Txn.assets[0],
+                ExtractUint64(lock.load(), Int(24)) <= Global.latest_timestamp(),
+            )
+        ),
+        send_asset(Txn.assets[0], amount, Txn.sender()),
+        App.localDel(Txn.sender(), Itob(lock_slot.load())),
+        App.localPut(Txn.sender(), lock_count_key, App.localGet(Txn.sender(), lock_count_key) - Int(1)),
+        App.globalPut(asset_key, App.globalGet(asset_key) - amount),
+        Approve(),
+    )
+
+    # The creator takes back what the application holds of an asset above its locked total,
+    # e.g. the locks of receivers that cleared their state.
+    # assets[0]: the asset
+    holding = AssetHolding.balance(Global.current_application_address(), Txn.assets[0])
+    on_sweep = Seq(
+        Assert(Txn.sender() == Global.creator_address()),
+        locked,
+        Assert(locked.hasValue()),
+        holding,
+        Assert(holding.value() > locked.value()),
+        send_asset(Txn.assets[0], holding.value() - locked.value(), Txn.sender()),
+        Approve(),
+    )
+
+    # Application router for this smart contract.
+    program = Cond(
+        [
+            Or(
+                # Your fees shouldn't exceed an unreasonable amount
+                Txn.fee() > Int(5000),
+                # No rekeys allowed (just to be safe)
+                Txn.rekey_to() != Global.zero_address(),
+                # This smart contract cannot be updated.
+                Txn.on_completion() == OnComplete.UpdateApplication,
+                # Deleting it would strand the locked assets.
+                Txn.on_completion() == OnComplete.DeleteApplication,
+            ),
+            Reject(),
+        ],
+        [Txn.application_id() == Int(0), on_create],
+        [Txn.on_completion() == OnComplete.OptIn, on_opt_in],
+        [Txn.on_completion() == OnComplete.CloseOut, on_close_out],
+        [Txn.application_args[0] == Bytes("add_asset"), on_add_asset],
+        [Txn.application_args[0] == Bytes("lock"), on_lock],
+        [Txn.application_args[0] == Bytes("unlock"), on_unlock],
+        [Txn.application_args[0] == Bytes("sweep"), on_sweep],
+    )
+
+    return compileTeal(program, Mode.Application, version=5)
+
+
+def clear_program():
+    '''
+    Takes the receiver's dropped locks off the locked totals, so the creator can sweep them
+    '''
+    def release(slot, lock):
+        asset_key = Extract(lock.value(), Int(8), Int(8))
+        return If(lock.hasValue()).Then(
+            App.globalPut(asset_key, App.globalGet(asset_key) - ExtractUint64(lock.value(), Int(16))))
+
+    program = Seq(
+        lock_slots(Txn.sender(), release),
+        Approve(),
+    )
+    return compileTeal(program, Mode.Application, version=5)
+
+
+def compile_app(algod_client):
+    '''
+    Build app from scratch
+    '''
+    dump_teal_assembly('timed_asset_multi_lock_approval.teal', approval_program)
+    dump_teal_assembly('timed_asset_multi_lock_clear.teal', clear_program)
+
+    compile_program(algod_client, generate_teal(approval_program), 'timed_asset_multi_lock_approval.bin')
+    compile_program(algod_client, generate_teal(clear_program), 'timed_asset_multi_lock_clear.bin')
+
+    write_schema(file_path='localSchema',
+                 num_ints=1,
+                 num_bytes=MAX_LOCKS_PER_ACCOUNT)
+    write_schema(file_path='globalSchema',
+                 num_ints=1 + MAX_ASSETS,
+                 num_bytes=0)
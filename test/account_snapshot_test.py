@@ -0,0 +1,105 @@
+import time
+
+import pytest
+from akita_inu_asa_utils import AccountSnapshotCache, get_asset_balance, get_algo_balance, \
+    is_opted_into_asset, read_local_state, read_global_state, read_app_global_state
+from .testing_utils import FakeAlgodClient
+
+ADDRESS = 'ACCOUNT'
+APP_ID = 7
+ASSET_ID = 42
+
+
+@pytest.fixture
+def client():
+    return FakeAlgodClient({
+        ADDRESS: {
+            'address': ADDRESS,
+            'amount': 5000000,
+            'assets': [{'asset-id': ASSET_ID, 'amount': 1500}],
+            'apps-local-state': [{'id': APP_ID,
+                                  'key-value': [{'key': 'Y291bnQ=', 'value': {'type': 2, 'uint': 3}}]}],
+            'created-apps': [{'id': APP_ID,
+                              'params': {'global-state': [{'key': 'TXVsdGlwbHk=',
+                                                           'value': {'type': 2, 'uint': 1000000}}]}}],
+        }
+    }, apps={
+        APP_ID: {'id': APP_ID,
+                 'params': {'global-state': [{'key': 'TXVsdGlwbHk=', 'value': {'type': 2, 'uint': 1000000}},
+                                             {'key': 'TmFtZQ==', 'value': {'type': 1, 'bytes': 'YWtpdGE='}}]}}
+    }, last_round=10)
+
+
+class TestAccountSnapshotCache:
+    def test_readers_share_one_fetch(self, client):
+        cache = AccountSnapshotCache(client)
+        assert get_asset_balance(cache, ADDRESS, ASSET_ID) == 1500
+        assert is_opted_into_asset(cache, ADDRESS, ASSET_ID)
+        assert get_algo_balance(cache, ADDRESS) == 5000000
+        assert read_local_state(cache, ADDRESS, APP_ID) == {'count': 3}
+        assert read_global_state(cache, ADDRESS, APP_ID) == {'Multiply': 1000000}
+        assert client.count('account_info') == 1
+
+    def test_snapshot_indexes(self, client):
+        snapshot = AccountSnapshotCache(client).snapshot(ADDRESS)
+        assert snapshot.round == 10
+        assert snapshot.assets[ASSET_ID]['amount'] == 1500
+        assert APP_ID in snapshot.local_states
+        assert APP_ID in snapshot.created_apps
+
+    def test_new_round_invalidates(self, client):
+        cache = AccountSnapshotCache(client)
+        get_algo_balance(cache, ADDRESS)
+        cache.status_after_block(10)
+        client.accounts[ADDRESS]['amount'] = 1
+        assert get_algo_balance(cache, ADDRESS) == 1
+        assert client.count('account_info') == 2
+
+    def test_invalidate_address(self, client):
+        cache = AccountSnapshotCache(client)
+        get_algo_balance(cache, ADDRESS)
+        cache.invalidate(ADDRESS)
+        get_algo_balance(cache, ADDRESS)
+        assert client.count('account_info') == 2
+
+
+class TestAccountSnapshot:
+    def test_readers_without_cache(self, client):
+        assert get_asset_balance(client, ADDRESS, ASSET_ID) == 1500
+        assert get_asset_balance(client, ADDRESS, ASSET_ID + 1) == 0
+        assert not is_opted_into_asset(client, ADDRESS, ASSET_ID + 1)
+        assert read_local_state(client, ADDRESS, APP_ID + 1) is None
+        assert read_global_state(client, ADDRESS, APP_ID + 1) is None
+
+    def test_indexes_built_once(self, client):
+        snapshot = AccountSnapshotCache(client).snapshot(ADDRESS)
+        assert snapshot.assets is snapshot.assets
+        assert snapshot.created_apps is snapshot.created_apps
+
+
+class TestReadAppGlobalState:
+    def test_reads_application_endpoint(self, client):
+        assert read_app_global_state(client, APP_ID) == {'Multiply': 1000000, 'Name': b'akita'}
+        assert client.count('account_info') == 0
+
+    def test_cached_per_round(self, client):
+        cache = AccountSnapshotCache(client)
+        cache.status()
+        read_app_global_state(cache, APP_ID)['Multiply'] = 0
+        assert read_app_global_state(cache, APP_ID)['Multiply'] == 1000000
+        assert client.count('application_info') == 1
+        cache.status_after_block(10)
+        read_app_global_state(cache, APP_ID)
+        assert client.count('application_info') == 2
+
+    def test_round_looked_up_once_stale(self, client):
+        # nothing else observes rounds, application_info responses carry none
+        cache = AccountSnapshotCache(client, round_seconds=0.05)
+        assert read_app_global_state(cache, APP_ID)['Multiply'] == 1000000
+        assert read_app_global_state(cache, APP_ID)['Multiply'] == 1000000
+        assert (client.count('status'), client.count('application_info')) == (1, 1)
+        client.last_round = 500
+        client.apps[APP_ID]['params']['global-state'][0]['value']['uint'] = 5
+        time.sleep(0.05)
+        assert read_app_global_state(cache, APP_ID)['Multiply'] == 5
+        assert (client.count('status'), client.count('application_info')) == (2, 2)
@@ -0,0 +1,100 @@
+import asyncio
+import base64
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from algosdk.error import AlgodHTTPError
+from akita_inu_asa_utils import aio
+
+TOKEN = "a" * 64
+ADDRESS = "ACCOUNT"
+
+
+class FakeAlgod:
+    """
+    In-process algod answering the handful of endpoints the async helpers use
+    """
+    def __init__(self):
+        self.last_round = 10
+        self.confirmations = {'A': 11, 'B': 12}
+        self.requests = []
+
+    def app(self):
+        app = web.Application()
+        app.router.add_get('/v2/status', self.status)
+        app.router.add_get('/v2/status/wait-for-block-after/{round}', self.status_after_block)
+        app.router.add_get('/v2/accounts/{address}', self.account_info)
+        app.router.add_get('/v2/transactions/pending/{txid}', self.pending_transaction_info)
+        app.router.add_get('/v2/transactions/params', self.suggested_params)
+        app.router.add_post('/v2/teal/compile', self.compile)
+        return app
+
+    async def status(self, request):
+        self.requests.append(request.path)
+        assert request.headers['X-Algo-API-Token'] == TOKEN
+        return web.json_response({'last-round': self.last_round})
+
+    async def status_after_block(self, request):
+        self.requests.append('status_after_block')
+        self.last_round = max(self.last_round, int(request.match_info['round']) + 1)
+        return web.json_response({'last-round': self.last_round})
+
+    async def account_info(self, request):
+        if request.match_info['address'] != ADDRESS:
+            return web.json_response({'message': 'no such account'}, status=404)
+        return web.json_response({'address': ADDRESS, 'amount': 7, 'round': self.last_round,
+                                  'assets': [{'asset-id': 42, 'amount': 3}]})
+
+    async def pending_transaction_info(self, request):
+        self.requests.append('pending')
+        confirmed = self.confirmations[request.match_info['txid']]
+        return web.json_response({'confirmed-round': confirmed if confirmed <= self.last_round else 0,
+                                  'pool-error': ''})
+
+    async def suggested_params(self, request):
+        return web.json_response({'fee': 0, 'last-round': self.last_round, 'genesis-hash': 'SGO1GKSzyE7IEPItTxCByw9x8FmnrCDexi9/cOUJOiI=',
+                                  'genesis-id': 'testnet-v1.0', 'consensus-version': 'v', 'min-fee': 1000})
+
+    async def compile(self, request):
+        source = await request.read()
+        return web.json_response({'result': base64.b64encode(source[:4]).decode(), 'hash': 'H'})
+
+
+def run_with_algod(test_fn):
+    async def run():
+        algod = FakeAlgod()
+        server = TestServer(algod.app())
+        await server.start_server()
+        try:
+            async with aio.AsyncAlgodClient(TOKEN, str(server.make_url(''))) as client:
+                return await test_fn(client, algod)
+        finally:
+            await server.close()
+    return asyncio.run(run())
+
+
+class TestAsyncHelpers:
+    def test_account_readers(self):
+        async def check(client, algod):
+            assert await aio.get_algo_balance(client, ADDRESS) == 7
+            assert await aio.get_asset_balance(client, ADDRESS, 42) == 3
+            assert not await aio.is_opted_into_asset(client, ADDRESS, 43)
+            with pytest.raises(AlgodHTTPError, match='no such account'):
+                await aio.get_algo_balance(client, 'MISSING')
+        run_with_algod(check)
+
+    def test_params_and_compile(self):
+        async def check(client, algod):
+            params = await client.suggested_params()
+            assert (params.first, params.last, params.min_fee) == (10, 1010, 1000)
+            assert await aio.compile_program(client, "#pragma version 5") == b"#pra"
+        run_with_algod(check)
+
+    def test_tracker_shares_round_waits(self):
+        async def check(client, algod):
+            tracker = aio.AsyncConfirmationTracker(client)
+            results = await asyncio.gather(tracker.confirm('A'), tracker.confirm('B'))
+            assert [result['confirmed-round'] for result in results] == [11, 12]
+            assert algod.requests.count('status_after_block') == 2
+        run_with_algod(check)
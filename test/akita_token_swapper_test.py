@@ -9,7 +9,8 @@ from algosdk import account, mnemonic, constants
 from algosdk.future import transaction
 from algosdk.encoding import encode_address, is_valid_address
 from algosdk.error import AlgodHTTPError, TemplateInputError
-from akita_inu_asa_utils import read_local_state, read_global_state, wait_for_txn_confirmation, get_application_address
+from akita_inu_asa_utils import read_local_state, read_global_state, read_app_global_state, wait_for_txn_confirmation, \
+    get_application_address, get_algod_client, get_suggested_params
 from .testing_utils import clear_build_folder
 
 TESTASSETNAME = "TEST"
@@ -31,7 +32,7 @@ def test_config():
 def client(test_config):
     algod_address = test_config['algodAddress']
     algod_token = test_config['algodToken']
-    client = algod.AlgodClient(algod_token, algod_address)
+    client = get_algod_client(algod_token, algod_address)
     return client
 
 
@@ -50,7 +51,7 @@ def wallet_1(test_config):
 @pytest.fixture(scope='class')
 def new_asset(test_config, wallet_1, client):
     from akita_inu_asa_utils import (create_asa_signed_txn, asset_id_from_create_txn, wait_for_txn_confirmation)
-    params = client.suggested_params()
+    params = get_suggested_params(client)
     txn, txn_id = create_asa_signed_txn(wallet_1['public_key'], wallet_1['private_key'], params, total=int(1e9) * TESTMULTIPLY, decimals=6)
     client.send_transactions([txn])
     wait_for_txn_confirmation(client, txn_id, 5)
@@ -59,7 +60,7 @@ def new_asset(test_config, wallet_1, client):
 @pytest.fixture(scope='class')
 def swap_asset(test_config, wallet_1, client):
     from akita_inu_asa_utils import (create_asa_signed_txn, asset_id_from_create_txn, wait_for_txn_confirmation)
-    params = client.suggested_params()
+    params = get_suggested_params(client)
     txn, txn_id = create_asa_signed_txn(wallet_1['public_key'], wallet_1['private_key'], params, total=int(1e9))
     client.send_transactions([txn])
     wait_for_txn_confirmation(client, txn_id, 5)
@@ -73,12 +74,12 @@ def wallet_2(test_config, swap_asset, wallet_1, client):
     wallet_2 = {'mnemonic': wallet_mnemonic, 'public_key': public_key, 'private_key': private_key}
     fund_account(wallet_2['public_key'], os.environ['fund_account_mnemonic'])
 
-    params = client.suggested_params()
+    params = get_suggested_params(client)
     txn, txn_id = opt_in_asset_signed_txn(private_key, public_key, params, swap_asset)
     client.send_transactions([txn])
     wait_for_txn_confirmation(client, txn_id, 5)
 
-    params = client.suggested_params()
+    params = get_suggested_params(client)
     txn, txn_id = payment_signed_txn(wallet_1['private_key'], wallet_1['public_key'], wallet_2['public_key'], 16000, params, swap_asset)
     client.send_transactions([txn])
     wait_for_txn_confirmation(client, txn_id, 5)
@@ -94,12 +95,13 @@ def app_id(test_config, wallet_1, swap_asset):
     app_id = deploy(algod_address, algod_token, creator_mnemonic)
     return app_id
 
-def opt_in_assets_txn(app_id, client, wallet_1, swap_asset, new_asset):
+def opt_in_assets_txn(app_id, client, wallet_1, swap_asset, new_asset, params=None):
     public_key = wallet_1['public_key']
     private_key = wallet_1['private_key']
 
     app_address = get_application_address(app_id)
-    params = client.suggested_params()
+    if params is None:
+        params = get_suggested_params(client)
     txn0 = transaction.PaymentTxn(public_key, params, app_address, 302000)
     app_args = [
         swap_asset.to_bytes(8, "big"),
@@ -117,11 +119,11 @@ def opt_in_assets_txn(app_id, client, wallet_1, swap_asset, new_asset):
 def swap(app_id, client, wallet_1, wallet_2, swap_asset, amount):
     public_key = wallet_2['public_key']
     private_key = wallet_2['private_key']
-    new_asset = read_global_state(client, wallet_1["public_key"], app_id)["New_Asset_ID"]
+    new_asset = read_app_global_state(client, app_id)["New_Asset_ID"]
 
     app_address = get_application_address(app_id)
 
-    params = client.suggested_params()
+    params = get_suggested_params(client)
     txn0 = transaction.AssetTransferTxn(public_key, params, public_key, 0, new_asset)
     txn1 = transaction.AssetTransferTxn(public_key, params, app_address, amount, swap_asset)
     app_args = []
@@ -141,8 +143,8 @@ class TestAkitaTokenSwapperContract:
         clear_build_folder()
         import os
         compile_app(client)
-        assert os.path.exists('./build/akita_token_swapper_approval.compiled')
-        assert os.path.exists('./build/akita_token_swapper_clear.compiled')
+        assert os.path.exists('./build/akita_token_swapper_approval.bin')
+        assert os.path.exists('./build/akita_token_swapper_clear.bin')
         assert os.path.exists('./build/akita_token_swapper_approval.teal')
         assert os.path.exists('./build/akita_token_swapper_clear.teal')
         assert os.path.exists('./build/globalSchema')
@@ -161,12 +163,13 @@ class TestAkitaTokenSwapperContract:
         assert local_state is None
 
         #try to configure twice (this shouldn't work)
+        #fresh params, the cached ones would rebuild the same group and algod would reject it as already in the ledger
         with pytest.raises(AlgodHTTPError):
-            opt_in_assets_txn(app_id, client, wallet_1, swap_asset, new_asset)
+            opt_in_assets_txn(app_id, client, wallet_1, swap_asset, new_asset, client.suggested_params())
 
     def test_fund(self, app_id, client, wallet_1, new_asset):
         app_address = get_application_address(app_id)
-        txn = transaction.AssetTransferTxn(wallet_1['public_key'], client.suggested_params(), app_address, int(1e9) * TESTMULTIPLY, new_asset)
+        txn = transaction.AssetTransferTxn(wallet_1['public_key'], get_suggested_params(client), app_address, int(1e9) * TESTMULTIPLY, new_asset)
         txn = txn.sign(wallet_1['private_key'])
         txn_id = client.send_transactions([txn])
         wait_for_txn_confirmation(client, txn_id, 5)
@@ -176,7 +179,7 @@ class TestAkitaTokenSwapperContract:
         private_key = wallet_2['private_key']
 
         app_address = get_application_address(app_id)
-        params = client.suggested_params()
+        params = get_suggested_params(client)
 
         txn0 = transaction.PaymentTxn(public_key, params, app_address, 1000)
         txn1 = transaction.AssetTransferTxn(public_key, params, app_address, 15999, app_id)
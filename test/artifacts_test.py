@@ -0,0 +1,63 @@
+import json
+import os
+
+import pytest
+from joblib import dump
+from akita_inu_asa_utils import compile_program, load_compiled, load_schema, write_schema
+from akita_inu_asa_utils.artifacts import ArtifactError, main, read_manifest, read_program, write_program
+
+SOURCE = "#pragma version 5\nint 1\nreturn\n"
+
+
+@pytest.fixture
+def build_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs('build')
+    return 'build'
+
+
+class TestArtifacts:
+    def test_programs_are_raw_bytecode_with_manifest(self, build_dir):
+        compile_program(None, SOURCE, 'approval.bin')
+        with open(os.path.join(build_dir, 'approval.bin'), 'rb') as f:
+            assert f.read() == bytes.fromhex('05810143')
+        entry = read_manifest(build_dir)['programs']['approval']
+        assert entry['size'] == 4 and entry['teal_version'] == 5
+        assert load_compiled('approval.bin') == bytes.fromhex('05810143')
+
+    def test_schemas_in_manifest(self, build_dir):
+        write_schema('globalSchema', 3, 2)
+        assert read_manifest(build_dir)['schemas']['globalSchema'] == {'num_ints': 3, 'num_bytes': 2}
+        schema = load_schema('globalSchema')
+        assert (schema.num_uints, schema.num_byte_slices) == (3, 2)
+
+    def test_tampered_program_is_rejected(self, build_dir):
+        write_program('approval', b'\x05\x81\x01\x43')
+        with open(os.path.join(build_dir, 'approval.bin'), 'wb') as f:
+            f.write(b'\x05\x81\x00\x43')
+        with pytest.raises(ArtifactError):
+            read_program('approval')
+
+    def test_missing_program(self, build_dir):
+        with pytest.raises(ArtifactError):
+            read_program('approval')
+
+
+class TestMigration:
+    def test_legacy_artifact_is_not_loaded(self, build_dir):
+        dump(b'\x05\x81\x01\x43', os.path.join(build_dir, 'approval.compiled'))
+        with pytest.raises(ArtifactError, match='akita_inu_asa_utils.artifacts'):
+            read_program('approval')
+        assert 'approval' not in read_manifest(build_dir)['programs']
+        main([build_dir])
+        assert read_program('approval') == b'\x05\x81\x01\x43'
+
+    def test_migrate_build_dir(self, build_dir):
+        dump(b'\x05\x81\x01\x43', os.path.join(build_dir, 'approval.compiled'))
+        dump(b'\x05\x81\x00\x43', os.path.join(build_dir, 'clear.compiled'))
+        with open(os.path.join(build_dir, 'localSchema'), 'w') as f:
+            json.dump({'num_ints': 1, 'num_bytes': 0}, f)
+        main([build_dir, '--remove'])
+        assert sorted(os.listdir(build_dir)) == ['approval.bin', 'clear.bin', 'localSchema', 'manifest.json']
+        assert read_program('clear') == b'\x05\x81\x00\x43'
+        assert read_manifest(build_dir)['schemas']['localSchema'] == {'num_ints': 1, 'num_bytes': 0}
@@ -7,7 +7,8 @@ from algosdk.future import transaction
 from algosdk import account, mnemonic, constants
 from algosdk.encoding import encode_address, is_valid_address
 from algosdk.error import AlgodHTTPError, TemplateInputError
-from akita_inu_asa_utils import read_local_state, read_global_state, wait_for_txn_confirmation, get_key_from_state
+from akita_inu_asa_utils import read_local_state, read_global_state, wait_for_txn_confirmation, get_key_from_state, \
+    get_algod_client, get_suggested_params
 from .testing_utils import clear_build_folder
 
 NUM_TEST_ASSET = int(1e6)
@@ -27,7 +28,7 @@ def test_config():
 def client(test_config):
     algod_address = test_config['algodAddress']
     algod_token = test_config['algodToken']
-    client = algod.AlgodClient(algod_token, algod_address)
+    client = get_algod_client(algod_token, algod_address)
     return client
 
 
@@ -49,7 +50,7 @@ def wallet_1(test_config):
 def asset_id(test_config, wallet_1, client):
     from akita_inu_asa_utils import (create_asa_signed_txn,
                                      asset_id_from_create_txn)
-    params = client.suggested_params()
+    params = get_suggested_params(client)
     txn, txn_id = create_asa_signed_txn(wallet_1['public_key'],
                                         wallet_1['private_key'],
                                         params,
@@ -78,8 +79,8 @@ class TestASAFaucet:
         clear_build_folder()
         import os
         compile_app(client)
-        assert os.path.exists('./build/asa_faucet_approval.compiled')
-        assert os.path.exists('./build/asa_faucet_clear.compiled')
+        assert os.path.exists('./build/asa_faucet_approval.bin')
+        assert os.path.exists('./build/asa_faucet_clear.bin')
         assert os.path.exists('./build/asa_faucet_approval.teal')
         assert os.path.exists('./build/asa_faucet_clear.teal')
         assert os.path.exists('./build/globalSchema')
@@ -100,7 +101,7 @@ class TestASAFaucet:
 
         public_key = wallet_1['public_key']
         private_key = wallet_1['private_key']
-        txn, txn_id = opt_in_app_signed_txn(private_key, public_key, client.suggested_params(), app_id)
+        txn, txn_id = opt_in_app_signed_txn(private_key, public_key, get_suggested_params(client), app_id)
         client.send_transactions([txn])
         wait_for_txn_confirmation(client, txn_id, 5)
 
@@ -113,11 +114,11 @@ class TestASAFaucet:
         private_key = wallet_1['private_key']
 
         app_address = get_application_address(app_id)
-        txn0 = transaction.PaymentTxn(public_key, client.suggested_params(), app_address, 201000)
+        txn0 = transaction.PaymentTxn(public_key, get_suggested_params(client), app_address, 201000)
         app_args = [
             "opt_in_asset".encode("utf-8")
         ]
-        txn1 = transaction.ApplicationNoOpTxn(public_key, client.suggested_params(), app_id, app_args,
+        txn1 = transaction.ApplicationNoOpTxn(public_key, get_suggested_params(client), app_id, app_args,
                                               foreign_assets=[asset_id])
 
         grouped = transaction.assign_group_id([txn0, txn1])
@@ -134,11 +135,11 @@ class TestASAFaucet:
 
         app_address = get_application_address(app_id)
 
-        txn0 = transaction.AssetTransferTxn(public_key, client.suggested_params(), app_address, NUM_TEST_ASSET - 20, asset_id)
+        txn0 = transaction.AssetTransferTxn(public_key, get_suggested_params(client), app_address, NUM_TEST_ASSET - 20, asset_id)
         app_args = [
             "fund_faucet".encode("utf-8")
         ]
-        txn1 = transaction.ApplicationNoOpTxn(public_key, client.suggested_params(), app_id, app_args, foreign_assets=[asset_id])
+        txn1 = transaction.ApplicationNoOpTxn(public_key, get_suggested_params(client), app_id, app_args, foreign_assets=[asset_id])
 
         grouped = transaction.assign_group_id([txn0, txn1])
         grouped = [grouped[0].sign(private_key),
@@ -161,8 +162,8 @@ class TestASAFaucet:
             "get_drip".encode("utf-8")
         ]
         app_address = get_application_address(app_id)
-        txn0 = transaction.PaymentTxn(public_key, client.suggested_params(), app_address, 1000)
-        txn1 = transaction.ApplicationNoOpTxn(public_key, client.suggested_params(), app_id, app_args, foreign_assets=[asset_id])
+        txn0 = transaction.PaymentTxn(public_key, get_suggested_params(client), app_address, 1000)
+        txn1 = transaction.ApplicationNoOpTxn(public_key, get_suggested_params(client), app_id, app_args, foreign_assets=[asset_id])
         grouped = transaction.assign_group_id([txn0, txn1])
         grouped = [grouped[0].sign(private_key),
                    grouped[1].sign(private_key)]
@@ -182,8 +183,11 @@ class TestASAFaucet:
             "get_drip".encode("utf-8")
         ]
         app_address = get_application_address(app_id)
-        txn0 = transaction.PaymentTxn(public_key, client.suggested_params(), app_address, 1000)
-        txn1 = transaction.ApplicationNoOpTxn(public_key, client.suggested_params(), app_id, app_args,
+        # fresh params, the cached ones would rebuild the claim above and algod would reject it as
+        # already in the ledger before the contract runs
+        params = client.suggested_params()
+        txn0 = transaction.PaymentTxn(public_key, params, app_address, 1000)
+        txn1 = transaction.ApplicationNoOpTxn(public_key, params, app_id, app_args,
                                               foreign_assets=[asset_id])
         grouped = transaction.assign_group_id([txn0, txn1])
 
@@ -0,0 +1,65 @@
+import os
+
+import pytest
+from akita_inu_asa_utils import compile_program, load_compiled, generate_teal
+from akita_inu_asa_utils.artifacts import read_program
+from akita_inu_asa_utils.assembler import assemble, TealAssemblyError
+
+CONTRACTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'contracts')
+# contracts whose checked-in TEAL was compiled by algod next to it
+ALGOD_BUILDS = [
+    ('AkitaTokenSwapper', 'akita_token_swapper_approval'),
+    ('AkitaTokenSwapper', 'akita_token_swapper_clear'),
+    ('asa_faucet', 'asa_faucet_approval'),
+    ('asa_faucet', 'asa_faucet_clear'),
+]
+
+
+class TestAssembler:
+    @pytest.mark.parametrize('contract, name', ALGOD_BUILDS)
+    def test_matches_algod(self, contract, name):
+        build_dir = os.path.join(CONTRACTS_DIR, contract, 'build')
+        with open(os.path.join(build_dir, name + '.teal')) as f:
+            source = f.read()
+        assert assemble(source) == read_program(name, build_dir)
+
+    def test_constants_used_once_are_pushed(self):
+        source = "#pragma version 5\nint 7\nint 7\nint 1000\n+\nbyte \"a\"\npop\nreturn\n"
+        assert assemble(source) == bytes.fromhex('05200107' + '2222' + '81e807' + '08' + '800161' + '48' + '43')
+
+    def test_constants_before_version_4_use_blocks(self):
+        assert assemble("#pragma version 2\nint 1\nint 2\n+\n") == bytes.fromhex('0220020102' + '2223' + '08')
+
+    def test_fifth_constant_uses_intc(self):
+        source = "#pragma version 5\n" + "".join("int {}\nint {}\n".format(i, i) for i in range(5))
+        assert assemble(source).endswith(bytes.fromhex('2525' + '2104' + '2104'))
+
+    def test_branches(self):
+        source = "#pragma version 5\nloop:\nint 1\nbnz loop\nb done\nerr\ndone:\nint 1\nreturn\n"
+        assert assemble(source) == bytes.fromhex('05200101' + '22' + '40fffc' + '420001' + '00' + '22' + '43')
+
+    def test_array_field_forms(self):
+        source = "#pragma version 5\ntxn ApplicationArgs 1\ngtxn 0 Accounts 1\ntxna Assets 0\n"
+        assert assemble(source) == bytes.fromhex('05' + '361a01' + '37001c01' + '363000')
+
+    def test_errors_report_line(self):
+        with pytest.raises(TealAssemblyError) as e:
+            assemble("#pragma version 5\nint 1\nbnz missing\n")
+        assert e.value.line_number == 3
+        with pytest.raises(TealAssemblyError):
+            assemble("#pragma version 2\nlog\n")
+        with pytest.raises(TealAssemblyError):
+            assemble("#pragma version 5\ntxn NotAField\n")
+
+    def test_contracts_assemble(self):
+        from contracts.timed_asset_lock_contract import program as timed_lock
+        from contracts.stateless_escrow import program as escrow
+        assert assemble(generate_teal(timed_lock.approval_program))[0] == 5
+        assert assemble(escrow.get_contract("7ZUECA7HFLZTXENRV24SHLU4AVPUTMTTDUFUBNBD64C73F3UHRTHAIOF6Q"))[:2] == bytes.fromhex('0520')
+
+    def test_compile_program_without_client(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        source = "#pragma version 5\nint 0\nreturn\n"
+        assert compile_program(None, source) == bytes.fromhex('05810043')
+        compile_program(None, source, 'clear.compiled')
+        assert load_compiled('clear.compiled') == bytes.fromhex('05810043')
@@ -0,0 +1,38 @@
+import os
+
+from contracts.build import discover_contracts, build_all, STAGES
+from .testing_utils import FakeAlgodClient
+
+ESCROW_CLIENT = "7ZUECA7HFLZTXENRV24SHLU4AVPUTMTTDUFUBNBD64C73F3UHRTHAIOF6Q"
+
+
+class TestBuildPipeline:
+    def test_discover(self):
+        assert discover_contracts() == ['AkitaTokenSwapper', 'asa_faucet', 'stateless_escrow',
+                                        'timed_asset_lock_contract', 'timed_asset_multi_lock']
+
+    def test_per_contract_build_dirs(self, tmp_path):
+        timings = build_all('', '', jobs=1, output_dir=str(tmp_path), client=FakeAlgodClient(),
+                            escrow_client_address=ESCROW_CLIENT)
+        assert set(timings) == set(discover_contracts())
+        assert all(set(stages) == set(STAGES) for stages in timings.values())
+        assert os.path.exists(tmp_path / 'asa_faucet' / 'build' / 'asa_faucet_approval.bin')
+        assert os.path.exists(tmp_path / 'stateless_escrow' / 'build' / 'stateless_escrow_timed_lock.teal')
+        with open(tmp_path / 'asa_faucet' / 'build' / 'globalSchema') as f:
+            assert '"num_ints": 5' in f.read()
+        with open(tmp_path / 'timed_asset_lock_contract' / 'build' / 'globalSchema') as f:
+            assert '"num_bytes": 3' in f.read()
+        with open(tmp_path / 'timed_asset_multi_lock' / 'build' / 'localSchema') as f:
+            assert '"num_bytes": 15' in f.read()
+        with open(tmp_path / 'timed_asset_multi_lock' / 'build' / 'globalSchema') as f:
+            assert '"num_ints": 16' in f.read()
+
+    def test_escrow_skipped_without_client_address(self, tmp_path):
+        timings = build_all('', '', ['stateless_escrow'], jobs=1, output_dir=str(tmp_path),
+                            client=FakeAlgodClient())
+        assert timings == {}
+
+    def test_local_build_needs_no_algod(self, tmp_path):
+        timings = build_all('', '', ['asa_faucet'], jobs=1, output_dir=str(tmp_path), local=True)
+        assert set(timings) == {'asa_faucet'}
+        assert os.path.exists(tmp_path / 'asa_faucet' / 'build' / 'asa_faucet_approval.bin')
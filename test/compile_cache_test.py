@@ -0,0 +1,76 @@
+import os
+
+import pytest
+from akita_inu_asa_utils import algod_compiler_version, compile_program, compile_cache_path, load_compiled
+from .testing_utils import FakeAlgodClient
+
+SOURCE = "#pragma version 5\nint 1\nreturn\n"
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return FakeAlgodClient()
+
+
+class TestCompileCache:
+    def test_unchanged_source_skips_algod(self, client):
+        compiled = compile_program(client, SOURCE)
+        assert compile_program(client, SOURCE) == compiled
+        compile_program(client, SOURCE, 'approval.compiled')
+        assert load_compiled('approval.compiled') == compiled
+        assert client.count('compile') == 1
+        assert client.count('versions') == 1
+        assert os.path.exists(compile_cache_path(SOURCE, algod_compiler_version(client)))
+
+    def test_changed_source_or_version_recompiles(self, client):
+        compile_program(client, SOURCE)
+        compile_program(client, SOURCE + "\n")
+        compile_program(client, SOURCE, compiler_version='3.9.0-abc')
+        assert client.count('compile') == 3
+
+    def test_node_upgrade_recompiles(self, client):
+        compiled = compile_program(client, SOURCE)
+        upgraded = FakeAlgodClient()
+        upgraded.build['minor'] += 1
+        assert compile_program(upgraded, SOURCE) == compiled
+        assert upgraded.count('compile') == 1
+        # the same build is served from the cache
+        assert compile_program(FakeAlgodClient(), SOURCE) == compiled
+        assert client.count('compile') == 1
+
+    def test_cache_can_be_bypassed(self, client):
+        compile_program(client, SOURCE)
+        compile_program(client, SOURCE, use_cache=False)
+        assert client.count('compile') == 2
+
+
+class TestGenerateTeal:
+    def test_memoized_per_parameter_set(self):
+        from akita_inu_asa_utils import generate_teal
+        calls = []
+
+        def program(version=5):
+            calls.append(version)
+            return "#pragma version {}\n".format(version)
+
+        assert generate_teal(program) == generate_teal(program)
+        generate_teal(program, version=4)
+        assert calls == [5, 4]
+
+    def test_compile_app_generates_each_program_once(self, client, monkeypatch):
+        from contracts.asa_faucet import program
+        calls = []
+        approval_program = program.approval_program
+
+        def counting_approval_program():
+            calls.append(1)
+            return approval_program()
+
+        monkeypatch.setattr(program, 'approval_program', counting_approval_program)
+        program.compile_app(client)
+        program.compile_app(client)
+        assert len(calls) == 1
+        assert client.count('compile') == 2
+        with open('build/asa_faucet_approval.teal') as f:
+            assert f.read() == approval_program()
@@ -0,0 +1,108 @@
+import pytest
+from akita_inu_asa_utils import ConfirmationTracker, check_pending_txn, wait_for_txn_confirmations
+from .testing_utils import FakeAlgodClient
+
+
+class FlakyAlgodClient(FakeAlgodClient):
+    """
+    The first `failures` round waits raise, as when algod is briefly unreachable
+    """
+    def __init__(self, failures, **kwargs):
+        super().__init__(**kwargs)
+        self.failures = failures
+
+    def status_after_block(self, block_num, **kwargs):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError('connection refused')
+        return super().status_after_block(block_num, **kwargs)
+
+
+class FlakyLookupAlgodClient(FakeAlgodClient):
+    """
+    The first `failures` pending transaction lookups raise
+    """
+    def __init__(self, failures, **kwargs):
+        super().__init__(**kwargs)
+        self.failures = failures
+
+    def pending_transaction_info(self, transaction_id, **kwargs):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError('connection reset')
+        return super().pending_transaction_info(transaction_id, **kwargs)
+
+
+@pytest.fixture
+def client():
+    client = FakeAlgodClient(last_round=10)
+    client.transactions = {'A': 11, 'B': 12, 'C': 11, 'REJECTED': 'overspend', 'LOST': 100}
+    return client
+
+
+class TestConfirmationTracker:
+    def test_check_pending_txn(self):
+        assert check_pending_txn({'confirmed-round': 11, 'pool-error': ''})['confirmed-round'] == 11
+        assert check_pending_txn({'confirmed-round': 0, 'pool-error': ''}) is None
+        with pytest.raises(Exception, match='pool error: overspend'):
+            check_pending_txn({'confirmed-round': 0, 'pool-error': 'overspend'})
+
+    def test_batch_shares_round_waits(self, client):
+        results = wait_for_txn_confirmations(client, ['A', 'B', 'C'], 5)
+        assert [result['confirmed-round'] for result in results] == [11, 12, 11]
+        assert client.count('status_after_block') == 2
+        assert client.count('pending_transaction_info') == 7
+
+    def test_pool_error(self, client):
+        tracker = ConfirmationTracker(client)
+        future = tracker.track('REJECTED')
+        tracker.wait_all()
+        with pytest.raises(Exception, match='overspend'):
+            future.result()
+
+    def test_timeout(self, client):
+        tracker = ConfirmationTracker(client)
+        future = tracker.track('LOST', timeout=3)
+        tracker.wait_all()
+        assert client.count('pending_transaction_info') == 3
+        with pytest.raises(Exception, match='timeout'):
+            future.result()
+
+    def test_lookup_errors_keep_transaction_pending(self):
+        client = FlakyLookupAlgodClient(2, last_round=10)
+        client.transactions = {'A': 11}
+        tracker = ConfirmationTracker(client)
+        future = tracker.track('A')
+        tracker.wait_all()
+        assert future.result()['confirmed-round'] == 11
+
+    def test_callbacks_from_background_thread(self, client):
+        resolved = []
+        tracker = ConfirmationTracker(client).start()
+        futures = [tracker.track(txid, callback=resolved.append) for txid in ['A', 'B']]
+        assert futures[1].result(timeout=5)['confirmed-round'] == 12
+        futures[0].result(timeout=5)
+        tracker.stop()
+        assert set(resolved) == set(futures)
+
+    def test_background_thread_retries_errors(self):
+        client = FlakyAlgodClient(2, last_round=10)
+        client.transactions = {'A': 12}
+        tracker = ConfirmationTracker(client, backoff=0).start()
+        assert tracker.track('A').result(timeout=5)['confirmed-round'] == 12
+        tracker.stop()
+        assert client.failures == 0
+
+    def test_background_thread_fails_futures_when_errors_persist(self):
+        client = FlakyAlgodClient(10 ** 6, last_round=10)
+        client.transactions = {'A': 12, 'B': 12}
+        tracker = ConfirmationTracker(client, retries=3, backoff=0).start()
+        futures = [tracker.track(txid) for txid in ['A', 'B']]
+        for future in futures:
+            with pytest.raises(ConnectionError):
+                future.result(timeout=5)
+        assert tracker.outstanding() == 0
+        # the thread keeps serving new transactions
+        client.failures = 0
+        assert tracker.track('A').result(timeout=5)['confirmed-round'] == 12
+        tracker.stop()
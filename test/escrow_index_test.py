@@ -0,0 +1,146 @@
+import base64
+
+import pytest
+from algosdk import account
+from algosdk.future import transaction
+from contracts.stateless_escrow.escrow_index import CLAIMED, FUNDED, PENDING, EscrowIndex, block_txid, claim_groups
+from contracts.stateless_escrow.escrow_template import escrow_template
+from contracts.stateless_escrow.provisioning import Escrow, EscrowProvisioner, write_manifest
+from .testing_utils import FakeAlgodClient
+
+ASSET_ID = 384303832
+
+
+@pytest.fixture
+def index():
+    index = EscrowIndex()
+    yield index
+    index.close()
+
+
+def block_of(*txns):
+    """
+        Block holding the transactions the way algod stores them, without genesis hash and ID
+    """
+    params = FakeAlgodClient().suggested_params()
+    stxns = []
+    for txn in txns:
+        fields = txn.dictify()
+        del fields['gh'], fields['gen']
+        stxns.append({'txn': fields, 'hgi': True, 'sig': b'\x00' * 64})
+    return {'gh': base64.b64decode(params.gh), 'gen': params.gen, 'txns': stxns}
+
+
+def provisioned_escrow(client_address, amount, status='confirmed'):
+    return Escrow(client_address, ASSET_ID, amount, escrow_template().address(client_address), status,
+                  txid='TXID' + str(amount), confirmed_round=5)
+
+
+class TestEscrowIndex:
+    def test_claimable_by_client(self, index):
+        clients = [account.generate_account()[1] for _ in range(3)]
+        index.record_provisioned([provisioned_escrow(client, 100 + n) for n, client in enumerate(clients)])
+        # not confirmed yet
+        index.record_provisioned([Escrow(clients[0], 1, 7, escrow_template().address(clients[0]), 'submitted')])
+        rows = index.claimable(clients[0])
+        assert [(row['asset_id'], row['amount'], row['status']) for row in rows] == [(ASSET_ID, 100, FUNDED)]
+        assert [row['status'] for row in index.lookup(rows[0]['escrow'])] == [PENDING, FUNDED]
+        assert index.claimable(clients[1], asset_id=ASSET_ID)[0]['amount'] == 101
+        assert index.claimable(account.generate_account()[1]) == []
+
+    def test_funding_counted_once(self, index):
+        client = account.generate_account()[1]
+        escrow = provisioned_escrow(client, 100)
+        index.record_provisioned([escrow])
+        index.record_provisioned([escrow])
+        assert not index.record_funding(escrow.escrow, ASSET_ID, escrow.txid, 100, 5)
+        assert index.record_funding(escrow.escrow, ASSET_ID, 'TOPUP', 50, 6)
+        assert index.lookup(escrow.escrow)[0]['amount'] == 150
+
+    def test_client_lookup_uses_index(self, index):
+        plan = ' '.join(row[3] for row in index._db.execute(
+            'EXPLAIN QUERY PLAN SELECT * FROM escrows WHERE client = ? AND status = ?', ('a', FUNDED)))
+        assert 'escrows_by_client' in plan
+
+    def test_import_manifest(self, index, tmp_path):
+        client = account.generate_account()[1]
+        write_manifest(str(tmp_path / 'manifest.csv'), [provisioned_escrow(client, 100)])
+        assert index.import_manifest(str(tmp_path / 'manifest.csv')) == 1
+        assert index.claimable(client)[0]['amount'] == 100
+
+
+class TestReconcile:
+    def test_block_txid(self):
+        params = FakeAlgodClient().suggested_params()
+        sender, receiver = account.generate_account()[1], account.generate_account()[1]
+        txn = transaction.AssetTransferTxn(sender, params, receiver, 10, ASSET_ID)
+        block = block_of(txn)
+        assert block_txid(block['txns'][0], block) == txn.get_txid()
+
+    def test_fundings_and_claims_from_blocks(self, index):
+        algod = FakeAlgodClient(last_round=12)
+        params = algod.suggested_params()
+        client = account.generate_account()[1]
+        other = account.generate_account()[1]
+        escrow = Escrow(client, ASSET_ID, 100, escrow_template().address(client))
+        index.record_provisioned([escrow])
+        # provisioning didn't see the funding confirm
+        funding = transaction.AssetTransferTxn(client, params, escrow.escrow, 100, ASSET_ID)
+        algod.blocks[11] = block_of(
+            transaction.AssetTransferTxn(escrow.escrow, params, escrow.escrow, 0, ASSET_ID), funding,
+            transaction.AssetTransferTxn(client, params, other, 5, ASSET_ID))
+        # app calls carry local state deltas keyed by account index
+        algod.blocks[11]['txns'].append({'txn': {'type': 'appl', 'snd': b'\x00' * 32, 'apid': 1}, 'hgi': True,
+                                         'dt': {'ld': {0: {'lock_count': {'at': 2, 'ui': 1}}}}})
+        assert index.reconcile(algod, start=11, until=11) == 1
+        assert index.last_round == 11
+        row = index.claimable(client)[0]
+        assert (row['amount'], row['funded_round']) == (100, 11)
+        # the provisioner confirming it later doesn't count it twice
+        assert not index.record_funding(escrow.escrow, ASSET_ID, funding.get_txid(), 100, 11)
+
+        algod.blocks[12] = block_of(*transaction.assign_group_id(
+            [transaction.AssetTransferTxn(escrow.escrow, params, escrow.escrow, 0, ASSET_ID, close_assets_to=client),
+             transaction.PaymentTxn(escrow.escrow, params, escrow.escrow, 0, close_remainder_to=client)]))
+        calls = algod.count('block_info')
+        assert index.reconcile(algod) == 1
+        assert algod.count('block_info') == calls + 1
+        assert index.claimable(client) == []
+        assert index.lookup(escrow.escrow)[0]['status'] == CLAIMED
+
+    def test_first_reconcile_starts_at_first_funding(self, index):
+        algod = FakeAlgodClient(last_round=8)
+        index.record_provisioned([provisioned_escrow(account.generate_account()[1], 100)])
+        assert index.reconcile(algod) == 4
+        assert index.reconcile(algod) == 0
+
+
+class TestProvisioningIndex:
+    def test_provisioner_records_confirmed_escrows(self, index, tmp_path):
+        private_key, client = account.generate_account()
+        provisioner = EscrowProvisioner(FakeAlgodClient(), [private_key], str(tmp_path / 'manifest.csv'), index=index)
+        provisioner.run([Escrow(client, ASSET_ID, 100)])
+        rows = index.claimable(client)
+        assert [(row['escrow'], row['amount']) for row in rows] == [(escrow_template().address(client), 100)]
+
+    def test_provisioned_funding_seen_in_block_counted_once(self, index, tmp_path):
+        private_key, client = account.generate_account()
+        algod = FakeAlgodClient(last_round=10)
+        EscrowProvisioner(algod, [private_key], str(tmp_path / 'manifest.csv'), index=index).run(
+            [Escrow(client, ASSET_ID, 100)])
+        # the block holding the group the provisioner sent
+        algod.blocks[11] = block_of(*[stxn.transaction for stxn in algod.sent[0]])
+        assert index.reconcile(algod, start=11, until=11) == 1
+        assert index.claimable(client)[0]['amount'] == 100
+
+    def test_claim_groups(self, index):
+        client = account.generate_account()[1]
+        escrow = provisioned_escrow(client, 100)
+        index.record_provisioned([escrow])
+        groups = claim_groups(FakeAlgodClient(), index, client)
+        assert len(groups) == 1
+        row, group = groups[0]
+        assert row['escrow'] == escrow.escrow
+        assert [txn.transaction.sender for txn in group] == [escrow.escrow] * 2
+        assert group[0].transaction.close_assets_to == client
+        assert group[0].lsig.logic == escrow_template().program(client)
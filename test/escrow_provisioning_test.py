@@ -0,0 +1,102 @@
+import pytest
+from algosdk import account
+from algosdk.future import transaction
+from contracts.stateless_escrow.escrow_template import escrow_template
+from contracts.stateless_escrow.provisioning import Escrow, EscrowProvisioner, ProvisioningError, read_manifest, \
+    read_requests, write_manifest
+from .testing_utils import FakeAlgodClient
+
+ASSET_ID = 384303832
+
+
+@pytest.fixture
+def clients():
+    return [account.generate_account() for _ in range(6)]
+
+
+def requests(clients, count):
+    return [Escrow(clients[index][1], ASSET_ID, 100 + index) for index in range(count)]
+
+
+def provisioner(client, clients, manifest_path, keys=None):
+    private_keys = [private_key for private_key, _ in clients] if keys is None else keys
+    return EscrowProvisioner(client, private_keys, str(manifest_path), concurrency=2)
+
+
+class TestEscrowProvisioner:
+    def test_provisions_every_escrow(self, clients, tmp_path):
+        client = FakeAlgodClient()
+        report = provisioner(client, clients, tmp_path / 'manifest.csv').run(requests(clients, 5))
+        assert report.confirmed == 5 and report.failed == 0
+        assert len(client.sent) == 5
+        assert client.count('suggested_params') == 1
+        template = escrow_template()
+        for group in client.sent:
+            fund, opt_in, transfer = group
+            assert isinstance(opt_in, transaction.LogicSigTransaction)
+            assert opt_in.lsig.logic == template.program(fund.transaction.sender)
+            assert opt_in.transaction.sender == template.address(fund.transaction.sender)
+            assert transfer.transaction.receiver == opt_in.transaction.sender
+        rows = read_manifest(str(tmp_path / 'manifest.csv'))
+        assert [row.status for row in rows] == ['confirmed'] * 5
+        assert [row.escrow for row in rows] == [template.address(row.client) for row in rows]
+        assert len({row.txid for row in rows}) == 5
+
+    def test_missing_key_fails_only_its_rows(self, clients, tmp_path):
+        client = FakeAlgodClient()
+        keys = [private_key for index, (private_key, _) in enumerate(clients) if index % 3 != 2]
+        report = provisioner(client, clients, tmp_path / 'manifest.csv', keys=keys).run(requests(clients, 6))
+        assert report.confirmed == 4
+        assert [escrow.status for escrow in report.escrows[2::3]] == ['failed'] * 2
+        assert 'no key' in report.escrows[2].error
+
+    def test_repeated_escrow_is_rejected(self, clients, tmp_path):
+        client = FakeAlgodClient()
+        # one escrow per client, a second row would be indistinguishable from the first on recovery
+        rows = [Escrow(clients[0][1], ASSET_ID, 5), Escrow(clients[0][1], ASSET_ID, 7)]
+        with pytest.raises(ProvisioningError, match='listed twice'):
+            provisioner(client, clients, tmp_path / 'manifest.csv').run(rows)
+        # nor with another asset, the escrow couldn't be claimed while holding both
+        rows[1].asset_id = ASSET_ID + 1
+        with pytest.raises(ProvisioningError, match='listed twice'):
+            provisioner(client, clients, tmp_path / 'manifest.csv').run(rows)
+        assert client.sent == []
+
+    def test_resumes_after_crash(self, clients, tmp_path):
+        manifest_path = tmp_path / 'manifest.csv'
+        client = FakeAlgodClient(last_round=10)
+        rows = provisioner(client, clients, manifest_path).plan(requests(clients, 5))
+        rows[0].status = 'confirmed'
+        # sent and confirmed, but not recorded before the crash
+        rows[1].status, rows[1].txid, rows[1].last_valid = 'submitted', 'CONFIRMED', 12
+        client.transactions['CONFIRMED'] = 9
+        # sent, never confirmed and expired
+        rows[2].status, rows[2].txid, rows[2].last_valid = 'submitted', 'LOST', 12
+        client.transactions['LOST'] = 10 ** 6
+        client.accounts[rows[2].escrow] = {'assets': []}
+        # confirmed, but the node no longer knows the transaction
+        rows[3].status, rows[3].txid, rows[3].last_valid = 'failed', 'FORGOTTEN', 8
+        client.accounts[rows[3].escrow] = {'assets': [{'asset-id': ASSET_ID, 'amount': rows[3].amount}]}
+        write_manifest(str(manifest_path), rows)
+
+        report = provisioner(client, clients, manifest_path).run(requests(clients, 5))
+        assert report.confirmed == 5
+        # only the expired row and the one never sent are sent again
+        assert report.groups == 2
+        assert sorted(group[2].transaction.amount for group in client.sent) == [102, 104]
+        assert client.last_round > 12
+        assert read_manifest(str(manifest_path))[1].confirmed_round == 9
+
+    def test_manifest_of_other_escrows_is_rejected(self, clients, tmp_path):
+        manifest_path = tmp_path / 'manifest.csv'
+        provisioner(FakeAlgodClient(), clients, manifest_path).plan(requests(clients, 2))
+        with pytest.raises(ProvisioningError):
+            provisioner(FakeAlgodClient(), clients, manifest_path).run(requests(clients, 3))
+
+
+class TestProvisioningFiles:
+    def test_csv_requests(self, clients, tmp_path):
+        path = tmp_path / 'escrows.csv'
+        path.write_text("client,asset_id,amount\n# vesting tranche 1\n{},{},10\n".format(clients[0][1], ASSET_ID))
+        rows = list(read_requests(str(path)))
+        assert [row.key() for row in rows] == [(clients[0][1], ASSET_ID, 10)]
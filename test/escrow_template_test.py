@@ -0,0 +1,32 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from algosdk import account, logic
+from akita_inu_asa_utils import assemble
+from contracts.stateless_escrow.escrow_template import EscrowTemplate, escrow_template
+from contracts.stateless_escrow.program import get_contract
+
+
+class TestEscrowTemplate:
+    def test_matches_per_client_compilation(self):
+        template = escrow_template()
+        for _ in range(3):
+            client = account.generate_account()[1]
+            assert template.program(client) == assemble(get_contract(client))
+            assert template.address(client) == logic.address(template.program(client))
+            assert template.logic_sig(client).address() == template.address(client)
+
+    def test_shared(self):
+        assert escrow_template() is escrow_template()
+
+    def test_parallel_clients(self):
+        template = escrow_template()
+        clients = [account.generate_account()[1] for _ in range(50)]
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            addresses = list(pool.map(template.address, clients))
+        assert addresses == [template.address(client) for client in clients]
+        assert len(set(addresses)) == len(clients)
+
+    def test_placeholder_must_appear_once(self):
+        with pytest.raises(ValueError):
+            EscrowTemplate(assemble(get_contract(account.generate_account()[1])))
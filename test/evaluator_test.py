@@ -0,0 +1,155 @@
+import pytest
+from algosdk import account, encoding
+from algosdk.future import transaction
+from akita_inu_asa_utils import generate_teal, get_application_address
+from akita_inu_asa_utils.assembler import assemble
+from akita_inu_asa_utils.evaluator import Ledger, LogicError
+from .testing_utils import FakeAlgodClient
+
+UNLOCK_TIME = 2000
+
+
+@pytest.fixture
+def params():
+    return FakeAlgodClient().suggested_params()
+
+
+@pytest.fixture
+def ledger():
+    return Ledger(latest_timestamp=1000)
+
+
+@pytest.fixture
+def user(ledger):
+    public_key = account.generate_account()[1]
+    ledger.fund(public_key, 10000000)
+    return public_key
+
+
+def create_app(ledger, params, creator, program, global_schema, local_schema, app_args=None):
+    txn = transaction.ApplicationCreateTxn(creator, params, transaction.OnComplete.NoOpOC,
+                                           assemble(generate_teal(program.approval_program)),
+                                           assemble(generate_teal(program.clear_program)),
+                                           transaction.StateSchema(*global_schema),
+                                           transaction.StateSchema(*local_schema),
+                                           app_args=app_args)
+    return ledger.evaluate([txn])[0].created_app_id
+
+
+class TestTimedLock:
+    @pytest.fixture
+    def lock(self, ledger, params, user):
+        from contracts.timed_asset_lock_contract import program
+        asset_id = ledger.create_asset(user, 1000)
+        app_id = create_app(ledger, params, user, program, (3, 3), (0, 0),
+                            [asset_id, encoding.decode_address(user), UNLOCK_TIME])
+        app_address = get_application_address(app_id)
+        ledger.evaluate([transaction.PaymentTxn(user, params, app_address, 1300000)])
+        ledger.evaluate(transaction.assign_group_id([
+            transaction.PaymentTxn(user, params, app_address, 0),
+            transaction.ApplicationOptInTxn(user, params, app_id, foreign_assets=[asset_id]),
+            transaction.AssetTransferTxn(user, params, app_address, 500, asset_id)]))
+        return app_id, asset_id
+
+    def test_setup(self, ledger, user, lock):
+        app_id, asset_id = lock
+        assert ledger.global_state(app_id) == {'asset_id': asset_id,
+                                               'receiver_address_key': encoding.decode_address(user),
+                                               'unlock_time': UNLOCK_TIME}
+        assert ledger.asset_balance(get_application_address(app_id), asset_id) == 500
+
+    def test_delete_before_unlock_is_rejected(self, ledger, params, user, lock):
+        app_id, asset_id = lock
+        balance = ledger.balance(user)
+        with pytest.raises(LogicError, match='assert failed'):
+            ledger.evaluate([transaction.ApplicationDeleteTxn(user, params, app_id, foreign_assets=[asset_id])])
+        assert ledger.balance(user) == balance
+        assert app_id in ledger.apps
+
+    def test_delete_after_unlock_releases_funds(self, ledger, params, user, lock):
+        app_id, asset_id = lock
+        ledger.latest_timestamp = UNLOCK_TIME
+        results = ledger.evaluate([transaction.ApplicationDeleteTxn(user, params, app_id,
+                                                                    foreign_assets=[asset_id])])
+        assert len(results[0].inner_txns) == 2
+        assert ledger.asset_balance(user, asset_id) == 1000
+        assert ledger.balance(get_application_address(app_id)) == 0
+        assert app_id not in ledger.apps
+
+    def test_only_receiver_can_delete(self, ledger, params, lock):
+        app_id, asset_id = lock
+        other = account.generate_account()[1]
+        ledger.fund(other, 1000000)
+        ledger.latest_timestamp = UNLOCK_TIME
+        with pytest.raises(LogicError):
+            ledger.evaluate([transaction.ApplicationDeleteTxn(other, params, app_id, foreign_assets=[asset_id])])
+
+
+class TestSwapper:
+    @pytest.fixture
+    def swapper(self, ledger, params, user):
+        from contracts.AkitaTokenSwapper import program
+        swap_asset = ledger.create_asset(user, 1000)
+        new_asset = ledger.create_asset(user, 10 ** 9, decimals=6)
+        app_id = create_app(ledger, params, user, program, (3, 0), (0, 0))
+        ledger.evaluate(transaction.assign_group_id([
+            transaction.PaymentTxn(user, params, get_application_address(app_id), 302000),
+            transaction.ApplicationNoOpTxn(user, params, app_id, [swap_asset, new_asset],
+                                           foreign_assets=[swap_asset, new_asset])]))
+        ledger.evaluate([transaction.AssetTransferTxn(user, params, get_application_address(app_id), 10 ** 9,
+                                                      new_asset)])
+        return app_id, swap_asset, new_asset
+
+    def swap_group(self, params, sender, app_id, swap_asset, new_asset, amount, foreign_assets=None):
+        params.fee = 2000
+        params.flat_fee = True
+        return transaction.assign_group_id([
+            transaction.AssetTransferTxn(sender, params, sender, 0, new_asset),
+            transaction.AssetTransferTxn(sender, params, get_application_address(app_id), amount, swap_asset),
+            transaction.ApplicationNoOpTxn(sender, params, app_id,
+                                           foreign_assets=foreign_assets or [swap_asset, new_asset])])
+
+    def test_swap(self, ledger, params, user, swapper):
+        app_id, swap_asset, new_asset = swapper
+        holder = account.generate_account()[1]
+        ledger.fund(holder, 1000000)
+        ledger.opt_in_asset(holder, swap_asset)
+        ledger.evaluate([transaction.AssetTransferTxn(user, params, holder, 10, swap_asset)])
+        ledger.evaluate(self.swap_group(params, holder, app_id, swap_asset, new_asset, 10))
+        assert ledger.global_state(app_id)['Multiply'] == 10 ** 6
+        assert ledger.asset_balance(holder, swap_asset) == 0
+        assert ledger.asset_balance(holder, new_asset) == 10 * 10 ** 6
+
+    def test_swap_needs_new_asset_reference(self, ledger, params, user, swapper):
+        app_id, swap_asset, new_asset = swapper
+        with pytest.raises(LogicError, match='invalid asset reference'):
+            ledger.evaluate(self.swap_group(params, user, app_id, swap_asset, new_asset, 10, [swap_asset]))
+
+
+class TestPrograms:
+    def run(self, source, ledger=None, args=None):
+        ledger = ledger or Ledger()
+        sender = account.generate_account()[1]
+        fields = {'Sender': sender, 'Type': b'pay', 'Receiver': sender}
+        return ledger.evaluate([fields], {0: (source, args or [])})
+
+    def test_subroutines_and_bytes(self):
+        self.run("#pragma version 5\nbyte 0x0102\nbyte 0x03\ncallsub join\nlen\nint 3\n==\nreturn\n"
+                 "join:\nconcat\nretsub\n")
+
+    def test_logic_sig_args(self):
+        self.run("#pragma version 5\narg 0\nbtoi\nint 7\n==\n", args=[(7).to_bytes(8, 'big')])
+        with pytest.raises(LogicError, match='rejected'):
+            self.run("#pragma version 5\narg 0\nbtoi\nint 7\n==\n", args=[(8).to_bytes(8, 'big')])
+
+    def test_runtime_errors(self):
+        with pytest.raises(LogicError, match='- would result negative'):
+            self.run("#pragma version 5\nint 1\nint 2\n-\n")
+        with pytest.raises(LogicError, match='expected uint64'):
+            self.run("#pragma version 5\nbyte 0x01\nint 1\n+\n")
+        with pytest.raises(LogicError, match='not allowed in signature mode'):
+            self.run("#pragma version 5\nglobal LatestTimestamp\n")
+
+    def test_budget(self):
+        with pytest.raises(LogicError, match='budget'):
+            self.run("#pragma version 5\nint 0\nloop:\nint 1\n+\ndup\nint 30000\n<\nbnz loop\n")
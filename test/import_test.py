@@ -0,0 +1,35 @@
+import subprocess
+import sys
+
+import pytest
+import akita_inu_asa_utils
+
+
+def loaded_modules(code):
+    code += "\nimport sys\nprint(' '.join(m for m in ('algosdk', 'pyteal', 'joblib') if m in sys.modules))"
+    output = subprocess.run([sys.executable, '-c', code], check=True, capture_output=True, text=True).stdout
+    return set(output.split())
+
+
+class TestLazyImports:
+    def test_package_import_loads_no_dependencies(self):
+        assert loaded_modules('import akita_inu_asa_utils') == set()
+        assert loaded_modules('from akita_inu_asa_utils import load_compiled') == set()
+
+    @pytest.mark.parametrize('module', ['contracts.asa_faucet.deployment',
+                                        'contracts.timed_asset_lock_contract.transaction_builder',
+                                        'contracts.AkitaTokenSwapper.swap_service'])
+    def test_entry_points_skip_pyteal_and_joblib(self, module):
+        assert loaded_modules('import ' + module) == {'algosdk'}
+
+    def test_star_import_exports_helpers(self):
+        namespace = {}
+        exec('from akita_inu_asa_utils import *', namespace)
+        assert {'compile_program', 'get_algod_client', 'ConfirmationTracker', 'assemble'} <= set(namespace)
+        assert 'compile_program' in dir(akita_inu_asa_utils)
+
+    def test_names_resolve_to_submodules(self):
+        from akita_inu_asa_utils import transactions
+        assert akita_inu_asa_utils.ConfirmationTracker is transactions.ConfirmationTracker
+        with pytest.raises(AttributeError):
+            akita_inu_asa_utils.not_a_helper
@@ -0,0 +1,91 @@
+from algosdk import account
+from algosdk.error import AlgodHTTPError
+from akita_inu_asa_utils.payouts import Payout, PayoutEngine, read_payouts, write_report
+from .testing_utils import FakeAlgodClient
+
+
+class FailingAlgodClient(FakeAlgodClient):
+    def send_transactions(self, txns, **kwargs):
+        if len(self.sent) == 1:
+            self.sent.append(txns)
+            raise AlgodHTTPError('overspend', 400)
+        return super().send_transactions(txns, **kwargs)
+
+
+class LostAlgodClient(FakeAlgodClient):
+    # accepts groups that never make it into a block
+    def send_transactions(self, txns, **kwargs):
+        self.sent.append(txns)
+        for txn in txns:
+            self.transactions[txn.get_txid()] = 10 ** 6
+        return txns[0].get_txid()
+
+
+class StalledAlgodClient(LostAlgodClient):
+    # no new rounds while the engine waits
+    def status_after_block(self, block_num, **kwargs):
+        self.calls.append('status_after_block')
+        return {'last-round': self.last_round}
+
+
+def payouts(count, asset_id=0):
+    receivers = [account.generate_account()[1] for _ in range(count)]
+    return [Payout(receiver, 1000 + index, asset_id) for index, receiver in enumerate(receivers)]
+
+
+class TestPayoutEngine:
+    def test_groups_of_16_confirmed(self):
+        client = FakeAlgodClient()
+        engine = PayoutEngine(client, account.generate_account()[0], concurrency=4)
+        report = engine.run(payouts(40, asset_id=7))
+        # groups are submitted concurrently, in no particular order
+        assert sorted(len(group) for group in client.sent) == [8, 16, 16]
+        assert report.confirmed == 40 and report.failed == 0
+        assert report.transactions_per_second > 0
+        assert client.count('suggested_params') == 1
+        group_ids = {txn.transaction.group for txn in client.sent[0]}
+        assert len(group_ids) == 1 and None not in group_ids
+        assert client.sent[0][0].transaction.index == 7
+
+    def test_failed_group_is_reported(self):
+        client = FailingAlgodClient()
+        report = PayoutEngine(client, account.generate_account()[0], concurrency=1).run(payouts(20))
+        assert report.confirmed == 16
+        assert [payout.status for payout in report.payouts[16:]] == ['failed'] * 4
+        assert 'overspend' in report.payouts[16].error
+
+    def test_duplicate_payouts_get_distinct_txids(self):
+        client = FakeAlgodClient()
+        receiver = account.generate_account()[1]
+        report = PayoutEngine(client, account.generate_account()[0]).run([Payout(receiver, 5), Payout(receiver, 5)])
+        assert report.confirmed == 2
+        assert report.payouts[0].txid != report.payouts[1].txid
+
+    def test_groups_expire_after_the_wait(self):
+        client = FakeAlgodClient()
+        engine = PayoutEngine(client, account.generate_account()[0], timeout=5)
+        engine.run(payouts(1))
+        txn = client.sent[0][0].transaction
+        assert txn.last_valid_round == txn.first_valid_round + engine.params.max_rounds + 5
+
+    def test_expired_group_is_failed(self):
+        client = LostAlgodClient()
+        report = PayoutEngine(client, account.generate_account()[0], timeout=3).run(payouts(2))
+        assert report.failed == 2 and report.unknown == 0
+
+    def test_group_that_may_still_confirm_is_unknown(self):
+        client = StalledAlgodClient()
+        report = PayoutEngine(client, account.generate_account()[0], timeout=3).run(payouts(2))
+        assert report.failed == 0 and report.unknown == 2
+        assert report.payouts[0].last_valid == 1 + 10 + 3
+
+
+class TestPayoutFiles:
+    def test_csv_round_trip(self, tmp_path):
+        receiver = account.generate_account()[1]
+        path = tmp_path / 'payouts.csv'
+        path.write_text("receiver,amount,asset_id\n{},10,\n{},20,384303832\n".format(receiver, receiver))
+        rows = list(read_payouts(str(path)))
+        assert [(row.amount, row.asset_id) for row in rows] == [(10, 0), (20, 384303832)]
+        write_report(str(tmp_path / 'report.csv'), rows)
+        assert (tmp_path / 'report.csv').read_text().count('pending') == 2
@@ -0,0 +1,111 @@
+import http.client
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from algosdk.error import AlgodHTTPError
+from akita_inu_asa_utils import get_algod_client, PooledAlgodClient
+
+TOKEN = "a" * 64
+ADDRESS = "7ZUECA7HFLZTXENRV24SHLU4AVPUTMTTDUFUBNBD64C73F3UHRTHAIOF6Q"
+
+
+class FakeAlgodHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections = set()
+    posts = 0
+    drops = 0
+
+    def do_GET(self):
+        FakeAlgodHandler.connections.add(self.client_address)
+        if FakeAlgodHandler.drops:
+            FakeAlgodHandler.drops -= 1
+            self.close_connection = True
+        elif self.path == '/v2/status':
+            self.reply(200, {'last-round': 5})
+        elif self.path == '/v2/status/wait-for-block-after/5':
+            time.sleep(0.3)
+            self.reply(200, {'last-round': 6})
+        elif self.path.startswith('/v2/accounts/' + ADDRESS):
+            self.reply(200, {'address': ADDRESS, 'amount': 9})
+        else:
+            self.reply(404, {'message': 'not found'})
+
+    def do_POST(self):
+        FakeAlgodHandler.posts += 1
+        self.rfile.read(int(self.headers['Content-Length']))
+        # the connection drops before algod answers
+        self.close_connection = True
+
+    def reply(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def algod_address():
+    FakeAlgodHandler.connections = set()
+    FakeAlgodHandler.posts = FakeAlgodHandler.drops = 0
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeAlgodHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield 'http://127.0.0.1:{}'.format(server.server_address[1])
+    server.shutdown()
+    server.server_close()
+
+
+class TestPooledAlgodClient:
+    def test_reuses_connection(self, algod_address):
+        client = PooledAlgodClient(TOKEN, algod_address)
+        for _ in range(5):
+            assert client.status()['last-round'] == 5
+            assert client.account_info(ADDRESS)['amount'] == 9
+        assert len(FakeAlgodHandler.connections) == 1
+        client.close()
+
+    def test_latency_stats(self, algod_address):
+        client = PooledAlgodClient(TOKEN, algod_address)
+        client.status()
+        client.account_info(ADDRESS)
+        client.account_info(ADDRESS)
+        stats = client.latency_stats()
+        assert stats['GET /v2/status']['count'] == 1
+        assert stats['GET /v2/accounts/{}']['count'] == 2
+        client.close()
+
+    def test_http_error(self, algod_address):
+        client = PooledAlgodClient(TOKEN, algod_address)
+        with pytest.raises(AlgodHTTPError, match='not found'):
+            client.application_info(1)
+        assert client.status()['last-round'] == 5
+        client.close()
+
+    def test_wait_for_block_outlives_timeout(self, algod_address):
+        client = PooledAlgodClient(TOKEN, algod_address, timeout=0.1)
+        assert client.status_after_block(5)['last-round'] == 6
+        client.close()
+
+    def test_dropped_get_is_retried(self, algod_address):
+        client = PooledAlgodClient(TOKEN, algod_address)
+        FakeAlgodHandler.drops = 1
+        assert client.status()['last-round'] == 5
+        client.close()
+
+    def test_dropped_post_is_not_resent(self, algod_address):
+        client = PooledAlgodClient(TOKEN, algod_address)
+        with pytest.raises(http.client.RemoteDisconnected):
+            client.algod_request("POST", "/transactions", data=b'signed group')
+        assert FakeAlgodHandler.posts == 1
+        client.close()
+
+    def test_factory_shares_clients(self, algod_address):
+        assert get_algod_client(TOKEN, algod_address) is get_algod_client(TOKEN, algod_address)
@@ -0,0 +1,57 @@
+import pytest
+from algosdk import logic
+from akita_inu_asa_utils import compile_program, load_compiled, load_schema, write_schema
+from akita_inu_asa_utils.registry import ProgramRegistry, load_logic_sig, program_registry
+
+APPROVE = "#pragma version 5\nint 1\nreturn\n"
+REJECT = "#pragma version 5\nint 0\nreturn\n"
+
+
+@pytest.fixture
+def build_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    program_registry().invalidate()
+    return tmp_path / 'build'
+
+
+def count_reads(monkeypatch):
+    from akita_inu_asa_utils import artifacts
+    reads = []
+    read_program = artifacts.read_program
+    monkeypatch.setattr(artifacts, 'read_program', lambda *args: reads.append(args) or read_program(*args))
+    return reads
+
+
+class TestProgramRegistry:
+    def test_program_is_read_once(self, build_dir, monkeypatch):
+        compile_program(None, APPROVE, 'approval.bin')
+        reads = count_reads(monkeypatch)
+        registry = ProgramRegistry()
+        assert registry.program('approval.bin') == registry.program('approval.bin') == bytes.fromhex('05810143')
+        assert len(reads) == 1
+
+    def test_rebuilt_program_is_reloaded(self, build_dir):
+        compile_program(None, APPROVE, 'escrow.bin')
+        first = load_logic_sig('escrow.bin')
+        assert load_logic_sig('escrow.bin') is first
+        assert program_registry().address('escrow.bin') == logic.address(bytes.fromhex('05810143'))
+        compile_program(None, REJECT, 'escrow.bin')
+        assert load_compiled('escrow.bin') == bytes.fromhex('05810043')
+        assert load_logic_sig('escrow.bin') is not first
+        assert program_registry().address('escrow.bin') == logic.address(bytes.fromhex('05810043'))
+
+    def test_schema_follows_rewrites(self, build_dir):
+        write_schema('globalSchema', 3, 3)
+        assert load_schema('globalSchema').num_uints == 3
+        write_schema('globalSchema', 4, 0)
+        schema = load_schema('globalSchema')
+        assert (schema.num_uints, schema.num_byte_slices) == (4, 0)
+
+    def test_separate_build_dirs(self, build_dir, tmp_path):
+        compile_program(None, APPROVE, 'approval.bin')
+        other = tmp_path / 'other'
+        other.mkdir()
+        from akita_inu_asa_utils.artifacts import write_program
+        write_program('approval', bytes.fromhex('05810043'), str(other))
+        registry = ProgramRegistry()
+        assert registry.program('approval.bin') != registry.program('approval.bin', str(other))
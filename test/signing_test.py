@@ -0,0 +1,52 @@
+import base64
+
+import pytest
+from algosdk import account, encoding
+from algosdk.future import transaction
+from akita_inu_asa_utils.signing import SigningPool
+from .testing_utils import FakeAlgodClient
+
+
+@pytest.fixture(scope='module')
+def keys():
+    return [account.generate_account() for _ in range(2)]
+
+
+@pytest.fixture(scope='module')
+def pool(keys):
+    with SigningPool([private_key for private_key, _ in keys], workers=2, chunk_size=3) as pool:
+        yield pool
+
+
+def payments(sender, count):
+    params = FakeAlgodClient().suggested_params()
+    return [transaction.PaymentTxn(sender, params, sender, amount) for amount in range(count)]
+
+
+class TestSigningPool:
+    def test_matches_serial_signing_in_order(self, keys, pool):
+        (key_1, address_1), (key_2, address_2) = keys
+        txns = payments(address_1, 5) + payments(address_2, 5)
+        expected = [txn.sign(key_1 if txn.sender == address_1 else key_2) for txn in txns]
+        signed = pool.sign(txns)
+        assert [encoding.msgpack_encode(stxn) for stxn in signed] == \
+            [encoding.msgpack_encode(stxn) for stxn in expected]
+
+    def test_encoded_matches_algosdk(self, keys, pool):
+        (key_1, address_1), (key_2, address_2) = keys
+        txns = payments(address_2, 4)
+        encoded = pool.sign_encoded(txns)
+        assert encoded == [base64.b64decode(encoding.msgpack_encode(txn.sign(key_2))) for txn in txns]
+        # rekeyed sender authorized by another loaded key
+        rekeyed = pool.sign_encoded(payments(address_2, 1), authorizing_address=address_1)
+        assert rekeyed == [base64.b64decode(encoding.msgpack_encode(payments(address_2, 1)[0].sign(key_1)))]
+
+    def test_unknown_sender(self, pool):
+        with pytest.raises(KeyError):
+            pool.sign(payments(account.generate_account()[1], 1))
+
+    def test_payout_engine_signer(self, keys, pool):
+        from akita_inu_asa_utils.payouts import Payout, PayoutEngine
+        client = FakeAlgodClient()
+        report = PayoutEngine(client, keys[0][0], signer=pool.sign).run([Payout(keys[1][1], 10)] * 3)
+        assert report.confirmed == 3
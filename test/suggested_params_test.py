@@ -0,0 +1,55 @@
+import time
+
+import pytest
+from algosdk import account
+from akita_inu_asa_utils import SuggestedParamsProvider, get_suggested_params, payment_signed_txn
+from .testing_utils import FakeAlgodClient
+
+
+@pytest.fixture
+def client():
+    return FakeAlgodClient(last_round=100)
+
+
+class TestSuggestedParamsProvider:
+    def test_cached_for_max_rounds(self, client):
+        provider = SuggestedParamsProvider(client, max_rounds=3)
+        assert provider.get().first == 100
+        provider.observe_round(102)
+        provider.get()
+        assert client.count('suggested_params') == 1
+        client.last_round = 103
+        provider.observe_round(103)
+        assert provider.get().first == 103
+        assert client.count('suggested_params') == 2
+
+    def test_estimates_rounds_from_time(self, client):
+        provider = SuggestedParamsProvider(client, max_rounds=1, round_seconds=0.01)
+        provider.get()
+        time.sleep(0.02)
+        provider.get()
+        assert client.count('suggested_params') == 2
+
+    def test_returns_copies(self, client):
+        provider = SuggestedParamsProvider(client)
+        provider.get().flat_fee = True
+        assert not provider.get().flat_fee
+
+    def test_shared_per_client(self, client):
+        get_suggested_params(client)
+        get_suggested_params(client)
+        assert client.count('suggested_params') == 1
+
+    def test_background_refresh(self, client):
+        provider = SuggestedParamsProvider(client, max_rounds=2).start()
+        deadline = time.time() + 5
+        while provider.get().first < 110 and time.time() < deadline:
+            time.sleep(0.01)
+        provider.stop()
+        assert provider.get().first >= 110
+
+    def test_signed_txn_helpers_take_provider(self, client):
+        private_key, public_key = account.generate_account()
+        provider = SuggestedParamsProvider(client)
+        signed_txn, txn_id = payment_signed_txn(private_key, public_key, public_key, 1, provider)
+        assert signed_txn.transaction.first_valid_round == 100
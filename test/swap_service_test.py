@@ -0,0 +1,81 @@
+import base64
+import io
+import json
+import threading
+import urllib.request
+
+import pytest
+from algosdk import account, encoding
+from contracts.AkitaTokenSwapper.swap_service import SwapGroupBuilder, build_swap_group, make_server, \
+    serve_stdio
+from .swap_template_test import APP_ID, SWAP_ASSET, NEW_ASSET, algosdk_swap_group, encoded
+from .testing_utils import FakeAlgodClient
+
+
+def uint_state(key, value):
+    return {'key': base64.b64encode(key.encode()).decode(), 'value': {'type': 2, 'uint': value}}
+
+
+@pytest.fixture
+def client():
+    return FakeAlgodClient(apps={
+        APP_ID: {'id': APP_ID, 'params': {'global-state': [uint_state('Swap_Asset_ID', SWAP_ASSET),
+                                                           uint_state('New_Asset_ID', NEW_ASSET),
+                                                           uint_state('Multiply', 1000000)]}},
+        APP_ID + 1: {'id': APP_ID + 1, 'params': {}},
+    })
+
+
+class TestSwapGroupBuilder:
+    def test_build_swap_group(self, client):
+        user = account.generate_account()[1]
+        txns = build_swap_group(client, APP_ID, user, 15000)
+        expected = algosdk_swap_group(client.suggested_params(), user, 15000)
+        assert [encoding.msgpack_encode(txn) for txn in txns] == [encoding.msgpack_encode(txn) for txn in expected]
+
+    def test_batch_reuses_params_and_state(self, client):
+        users = [account.generate_account()[1] for _ in range(20)]
+        responses = SwapGroupBuilder(client).encode_batch(
+            [{'app_id': APP_ID, 'user': user, 'amount': 10} for user in users])
+        params = client.suggested_params()
+        assert [[base64.b64decode(txn) for txn in response['group']] for response in responses] == \
+            [encoded(algosdk_swap_group(params, user, 10)) for user in users]
+        assert client.count('application_info') == 1
+        assert client.count('suggested_params') == 2
+
+    def test_batch_errors_stay_in_place(self, client):
+        user = account.generate_account()[1]
+        responses = SwapGroupBuilder(client).encode_batch([
+            {'app_id': APP_ID + 1, 'user': user, 'amount': 10},
+            {'app_id': APP_ID, 'user': 'not an address', 'amount': 10},
+            {'app_id': APP_ID, 'user': user, 'amount': 0},
+            {'app_id': APP_ID, 'user': user},
+            {'app_id': APP_ID, 'user': user, 'amount': 10},
+        ])
+        assert [sorted(response) for response in responses] == [['error']] * 4 + [['group']]
+        assert 'not set up' in responses[0]['error']
+
+    def test_stdio(self, client):
+        user = account.generate_account()[1]
+        stdin = io.StringIO(json.dumps({'app_id': APP_ID, 'user': user, 'amount': 10}) + '\n\n{bad json\n')
+        stdout = io.StringIO()
+        serve_stdio(SwapGroupBuilder(client), stdin, stdout)
+        responses = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        assert len(responses[0]['group']) == 3
+        assert 'error' in responses[1]
+
+    def test_http(self, client):
+        user = account.generate_account()[1]
+        server = make_server(SwapGroupBuilder(client), port=0)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            body = json.dumps([{'app_id': APP_ID, 'user': user, 'amount': 10}] * 2).encode()
+            url = 'http://127.0.0.1:{}/swap-groups'.format(server.server_address[1])
+            with urllib.request.urlopen(urllib.request.Request(url, body, method='POST')) as response:
+                responses = json.loads(response.read())
+        finally:
+            server.shutdown()
+            server.server_close()
+        assert len(responses) == 2 and responses[0] == responses[1]
+        assert len(responses[0]['group']) == 3
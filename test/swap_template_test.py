@@ -0,0 +1,78 @@
+import base64
+
+import pytest
+from algosdk import account, encoding
+from algosdk.future import transaction
+from akita_inu_asa_utils import get_application_address
+from akita_inu_asa_utils.templates import TransactionTemplate
+from contracts.AkitaTokenSwapper.swap_template import SwapGroupTemplate, swap_group_template
+from .testing_utils import FakeAlgodClient
+
+APP_ID = 1234
+SWAP_ASSET = 384303832
+NEW_ASSET = 523683256
+
+
+@pytest.fixture
+def params():
+    return FakeAlgodClient().suggested_params()
+
+
+def algosdk_swap_group(params, user, amount):
+    app_address = get_application_address(APP_ID)
+    txn0 = transaction.AssetTransferTxn(user, params, user, 0, NEW_ASSET)
+    txn1 = transaction.AssetTransferTxn(user, params, app_address, amount, SWAP_ASSET)
+    txn2 = transaction.ApplicationNoOpTxn(user, params, APP_ID, [], foreign_assets=[SWAP_ASSET, NEW_ASSET])
+    txn2.fee = 2000
+    return transaction.assign_group_id([txn0, txn1, txn2])
+
+
+def encoded(txns):
+    return [base64.b64decode(encoding.msgpack_encode(txn)) for txn in txns]
+
+
+class TestSwapGroupTemplate:
+    @pytest.mark.parametrize('amount', [1, 15000, 2 ** 64 - 1])
+    def test_matches_algosdk(self, params, amount):
+        user = account.generate_account()[1]
+        template = SwapGroupTemplate(APP_ID, SWAP_ASSET, NEW_ASSET, params)
+        assert template.encode(user, amount, params.first, params.last) == \
+            encoded(algosdk_swap_group(params, user, amount))
+
+    def test_patches_per_request_fields(self, params):
+        template = SwapGroupTemplate(APP_ID, SWAP_ASSET, NEW_ASSET, params)
+        for first in [1, 127, 128, 65536, 2 ** 32]:
+            params.first = first
+            params.last = first + 1000
+            user = account.generate_account()[1]
+            assert template.encode(user, 7, first, first + 1000) == encoded(algosdk_swap_group(params, user, 7))
+
+    def test_build(self, params):
+        user = account.generate_account()[1]
+        txns = swap_group_template(APP_ID, SWAP_ASSET, NEW_ASSET, params).build(user, 10, params)
+        expected = algosdk_swap_group(params, user, 10)
+        assert [txn.get_txid() for txn in txns] == [txn.get_txid() for txn in expected]
+        assert txns[2].foreign_assets == [SWAP_ASSET, NEW_ASSET]
+
+    def test_shared_per_app_and_assets(self, params):
+        template = swap_group_template(APP_ID, SWAP_ASSET, NEW_ASSET, params)
+        assert swap_group_template(APP_ID, SWAP_ASSET, NEW_ASSET, params) is template
+        assert swap_group_template(APP_ID + 1, SWAP_ASSET, NEW_ASSET, params) is not template
+
+    def test_zero_amount(self, params):
+        with pytest.raises(ValueError):
+            SwapGroupTemplate(APP_ID, SWAP_ASSET, NEW_ASSET, params).encode(
+                account.generate_account()[1], 0, params.first, params.last)
+
+
+class TestTransactionTemplate:
+    def test_empty_slot(self, params):
+        # a zero placeholder is left out of the encoding, so there is nothing to patch
+        txn = transaction.PaymentTxn(account.generate_account()[1], params, account.generate_account()[1], 0)
+        with pytest.raises(ValueError):
+            TransactionTemplate(txn, {'amt': 'amount'})
+
+    def test_ungrouped_zero_value(self, params):
+        sender, receiver = account.generate_account()[1], account.generate_account()[1]
+        template = TransactionTemplate(transaction.PaymentTxn(sender, params, receiver, 1), {'amt': 'amount'})
+        assert template.encode({'amount': 0}) == encoded([transaction.PaymentTxn(sender, params, receiver, 0)])[0]
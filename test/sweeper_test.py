@@ -0,0 +1,130 @@
+import base64
+import threading
+import time
+from concurrent.futures import wait
+
+import pytest
+from algosdk import account, encoding
+from algosdk.future import transaction
+from contracts.timed_asset_lock_contract.sweeper import DELETE_FEE, Lock, UnlockSweeper, build_delete
+from .testing_utils import FakeAlgodClient
+
+ASSET_ID = 384303832
+
+
+class ChainClockAlgodClient(FakeAlgodClient):
+    """
+    Every block is stamped with `timestamp`, unless the test has given its round a block
+    """
+    def __init__(self, timestamp=0, **kwargs):
+        super().__init__(**kwargs)
+        self.timestamp = timestamp
+
+    def block_info(self, block=None, response_format='json', **kwargs):
+        self.blocks.setdefault(block, {'ts': self.timestamp})
+        return super().block_info(block, response_format, **kwargs)
+
+
+def global_state(receiver, unlock_time):
+    def entry(key, value):
+        if isinstance(value, int):
+            value = {'type': 2, 'uint': value}
+        else:
+            value = {'type': 1, 'bytes': base64.b64encode(value).decode()}
+        return {'key': base64.b64encode(key).decode(), 'value': value}
+    return {'params': {'global-state': [entry(b'asset_id', ASSET_ID),
+                                        entry(b'receiver_address_key', encoding.decode_address(receiver)),
+                                        entry(b'unlock_time', unlock_time)]}}
+
+
+@pytest.fixture
+def receiver():
+    return account.generate_account()
+
+
+def lock_apps(client, receiver_address, unlock_times):
+    for app_id, unlock_time in enumerate(unlock_times, 1):
+        client.apps[app_id] = global_state(receiver_address, unlock_time)
+    return list(range(1, len(unlock_times) + 1))
+
+
+class TestUnlockSweeper:
+    def test_sweep_deletes_expired_apps(self, receiver):
+        client = ChainClockAlgodClient()
+        sweeper = UnlockSweeper(client, [receiver[0]], batch_size=2)
+        locks = sweeper.add_apps(lock_apps(client, receiver[1], [300, 100, 200, 100]))
+        assert [lock.unlock_time for lock in locks] == [300, 100, 200, 100]
+        assert client.count('application_info') == 4
+        assert sweeper.next_unlock_time() == 100
+
+        submitted = sweeper.sweep(250)
+        wait([future for _, future in submitted])
+        sweeper.tracker.stop()
+        # due apps are deleted earliest first, by their receiver
+        assert [lock.app_id for lock, _ in submitted] == [2, 4, 3]
+        assert len(client.sent) == 3 and all(len(group) == 1 for group in client.sent)
+        delete = client.sent[0][0].transaction
+        assert isinstance(delete, transaction.ApplicationDeleteTxn)
+        assert (delete.sender, delete.fee, delete.foreign_assets) == (receiver[1], DELETE_FEE, [ASSET_ID])
+        assert sorted(lock.app_id for lock in sweeper.unlocked) == [2, 3, 4]
+        assert len(sweeper) == 1 and sweeper.next_unlock_time() == 300
+        # the apps' state isn't read again
+        assert client.count('application_info') == 4
+        assert sweeper.sweep(250) == []
+
+    def test_unreadable_app_is_skipped(self, receiver):
+        client = ChainClockAlgodClient()
+        sweeper = UnlockSweeper(client, [receiver[0]])
+        app_ids = lock_apps(client, receiver[1], [100, 200])
+        del client.apps[1]
+        locks = sweeper.add_apps(app_ids)
+        assert [lock.app_id for lock in locks] == [2]
+        assert len(sweeper) == 1
+
+    def test_run_waits_for_unlock_time_and_block(self, receiver):
+        unlock_time = int(time.time()) + 1
+        client = ChainClockAlgodClient(timestamp=unlock_time - 10, last_round=5)
+        # the first block stamped after the unlock time is the one after the current round, it holds
+        # an app call's local state delta keyed by account index
+        client.blocks[7] = {'ts': unlock_time,
+                            'txns': [{'txn': {'type': 'appl'}, 'dt': {'ld': {0: {'lock_count': {'at': 2}}}}}]}
+        sweeper = UnlockSweeper(client, [receiver[0]])
+        sweeper.add_apps(lock_apps(client, receiver[1], [unlock_time]))
+        sweeper.run(until_empty=True)
+        assert time.time() >= unlock_time
+        assert client.count('status_after_block') >= 1
+        assert [lock.status for lock in sweeper.unlocked] == ['unlocked']
+
+    def test_added_lock_wakes_sweeper(self, receiver):
+        client = ChainClockAlgodClient(timestamp=int(time.time()))
+        sweeper = UnlockSweeper(client, [receiver[0]])
+        sweeper.add(Lock(1, ASSET_ID, receiver[1], int(time.time()) + 10 ** 6))
+        thread = threading.Thread(target=sweeper.run)
+        thread.start()
+        sweeper.add(Lock(2, ASSET_ID, receiver[1], 0))
+        deadline = time.time() + 5
+        while not sweeper.unlocked and time.time() < deadline:
+            time.sleep(0.01)
+        sweeper.stop()
+        thread.join(5)
+        assert not thread.is_alive()
+        assert [lock.app_id for lock in sweeper.unlocked] == [2]
+        assert len(sweeper) == 1
+
+    def test_failed_delete_is_reported(self, receiver):
+        client = ChainClockAlgodClient()
+        sweeper = UnlockSweeper(client, [receiver[0]])
+        lock = sweeper.add(Lock(1, ASSET_ID, receiver[1], 0))
+        params = client.suggested_params()
+        params.fee, params.flat_fee = DELETE_FEE, True
+        client.transactions[build_delete(params, lock).get_txid()] = 'logic eval error'
+        submitted = sweeper.sweep(0)
+        wait([future for _, future in submitted])
+        sweeper.tracker.stop()
+        assert sweeper.failed == [lock] and sweeper.unlocked == []
+        assert 'logic eval error' in lock.error
+
+    def test_unknown_receiver_is_rejected(self, receiver):
+        sweeper = UnlockSweeper(ChainClockAlgodClient(), [receiver[0]])
+        with pytest.raises(ValueError, match='no key'):
+            sweeper.add(Lock(1, ASSET_ID, account.generate_account()[1], 0))
@@ -7,7 +7,8 @@ from algosdk.v2client import algod
 from algosdk import account, mnemonic, constants
 from algosdk.encoding import encode_address, is_valid_address
 from algosdk.error import AlgodHTTPError, TemplateInputError
-from akita_inu_asa_utils import read_local_state, read_global_state, wait_for_txn_confirmation
+from akita_inu_asa_utils import read_local_state, read_global_state, wait_for_txn_confirmation, get_algod_client, \
+    get_suggested_params
 from .testing_utils import clear_build_folder
 
 
@@ -25,7 +26,7 @@ def test_config():
 def client(test_config):
     algod_address = test_config['algodAddress']
     algod_token = test_config['algodToken']
-    client = algod.AlgodClient(algod_token, algod_address)
+    client = get_algod_client(algod_token, algod_address)
     return client
 
 
@@ -51,7 +52,7 @@ def wallet_2(test_config, asset_id, client):
     wallet_2 = {'mnemonic': wallet_mnemonic, 'public_key': public_key, 'private_key': private_key}
     fund_account(wallet_2['public_key'], os.environ['fund_account_mnemonic'])
 
-    params = client.suggested_params()
+    params = get_suggested_params(client)
     txn, txn_id = opt_in_asset_signed_txn(private_key, public_key, params, asset_id)
     client.send_transactions([txn])
     wait_for_txn_confirmation(client, txn_id, 5)
@@ -62,7 +63,7 @@ def wallet_2(test_config, asset_id, client):
 def asset_id(test_config, wallet_1, client):
     from akita_inu_asa_utils import( create_asa_signed_txn,
         asset_id_from_create_txn)
-    params = client.suggested_params()
+    params = get_suggested_params(client)
     txn, txn_id = create_asa_signed_txn(wallet_1['public_key'],
                                         wallet_1['private_key'],
                                         params,
@@ -119,7 +120,7 @@ def assert_adversary_actions(app_id, wallet, client, asset_id,):
 
 def cash_out(client, public_key, private_key, app_id, asset_ids):
     from akita_inu_asa_utils import delete_app_signed_txn
-    params = client.suggested_params()
+    params = get_suggested_params(client)
     txn, txn_id = delete_app_signed_txn(private_key, public_key, params, app_id, asset_ids=asset_ids)
     client.send_transactions([txn])
     wait_for_txn_confirmation(client, txn_id, 5)
@@ -128,7 +129,7 @@ def cash_out(client, public_key, private_key, app_id, asset_ids):
 def opt_out(wallet, app_id, asset_ids, client):
     from akita_inu_asa_utils import clear_state_out_app_signed_txn
 
-    params = client.suggested_params()
+    params = get_suggested_params(client)
     public_key = wallet['public_key']
     private_key = wallet['private_key']
     txn, txn_id = clear_state_out_app_signed_txn(private_key,
@@ -146,7 +147,7 @@ def opt_in(public_key, private_key, params, app_public_key, app_id,asset_id, cli
 
 def send_3_group(public_key, private_key, app_public_key, app_id, numAlgos, numAsset, asset_id, client):
     from algosdk.future import transaction
-    params = client.suggested_params()
+    params = get_suggested_params(client)
     txn0 = transaction.PaymentTxn(public_key,
                                   params,
                                   app_public_key,
@@ -173,7 +174,7 @@ def send_3_group(public_key, private_key, app_public_key, app_id, numAlgos, numA
 
 def send_3_group_out_of_order(public_key, private_key, app_public_key, app_id, numAlgos, numAsset, asset_id, client):
     from algosdk.future import transaction
-    params = client.suggested_params()
+    params = get_suggested_params(client)
     txn2 = transaction.PaymentTxn(public_key,
                                   params,
                                   app_public_key,
@@ -203,8 +204,8 @@ class TestTimedAssetLockContract:
         clear_build_folder()
         import os
         compile_app(client)
-        assert os.path.exists('./build/asset_timed_vault_approval.compiled')
-        assert os.path.exists('./build/asset_timed_vault_clear.compiled')
+        assert os.path.exists('./build/asset_timed_vault_approval.bin')
+        assert os.path.exists('./build/asset_timed_vault_clear.bin')
         assert os.path.exists('./build/asset_timed_vault_approval.teal')
         assert os.path.exists('./build/asset_timed_vault_clear.teal')
         assert os.path.exists('./build/globalSchema')
@@ -273,7 +274,7 @@ class TestTimedAssetLockContract:
 
         public_key = wallet_1['public_key']
         private_key = wallet_1['private_key']
-        params = client.suggested_params()
+        params = get_suggested_params(client)
 
         txn, txn_id = delete_app_signed_txn(private_key, public_key, params, app_id, [asset_id])
         with pytest.raises(AlgodHTTPError):
@@ -309,7 +310,7 @@ class TestTimedAssetLockContract:
             cash_out(client, public_key, private_key, app_id, [asset_id])
 
         # opt back in so you can fully cash out
-        opt_in(public_key,private_key, client.suggested_params(), get_application_address(app_id), app_id, asset_id, client)
+        opt_in(public_key,private_key, get_suggested_params(client), get_application_address(app_id), app_id, asset_id, client)
 
         cash_out(client, public_key, private_key, app_id, [asset_id])
         local_state = read_local_state(client, public_key, app_id)
@@ -0,0 +1,206 @@
+import base64
+
+import pytest
+from algosdk import account
+from algosdk.future import transaction
+from akita_inu_asa_utils import generate_teal, get_application_address
+from akita_inu_asa_utils.assembler import assemble
+from akita_inu_asa_utils.evaluator import Ledger, LogicError
+from contracts.timed_asset_multi_lock import program
+from contracts.timed_asset_multi_lock.deployment import APP_FUNDING, LOCKS_PER_GROUP, build_add_assets, \
+    build_close_out, build_lock_groups, build_opt_in, build_sweep, build_unlock, decode_locked_totals, decode_locks, \
+    lock_id_from_logs
+from .testing_utils import FakeAlgodClient
+
+UNLOCK_TIME = 2000
+
+
+@pytest.fixture
+def params():
+    return FakeAlgodClient().suggested_params()
+
+
+@pytest.fixture
+def ledger():
+    return Ledger(latest_timestamp=1000)
+
+
+def new_account(ledger):
+    public_key = account.generate_account()[1]
+    ledger.fund(public_key, 10000000)
+    return public_key
+
+
+@pytest.fixture
+def creator(ledger):
+    return new_account(ledger)
+
+
+@pytest.fixture
+def vault(ledger, params, creator):
+    asset_id = ledger.create_asset(creator, 10 ** 6)
+    txn = transaction.ApplicationCreateTxn(creator, params, transaction.OnComplete.NoOpOC,
+                                           assemble(generate_teal(program.approval_program)),
+                                           assemble(generate_teal(program.clear_program)),
+                                           transaction.StateSchema(1 + program.MAX_ASSETS, 0),
+                                           transaction.StateSchema(1, program.MAX_LOCKS_PER_ACCOUNT))
+    app_id = ledger.evaluate([txn])[0].created_app_id
+    ledger.evaluate([transaction.PaymentTxn(creator, params, get_application_address(app_id), APP_FUNDING)])
+    ledger.evaluate(build_add_assets(params, creator, app_id, [asset_id]))
+    return app_id, asset_id
+
+
+def receiver(ledger, params, app_id, asset_id):
+    public_key = new_account(ledger)
+    ledger.opt_in_asset(public_key, asset_id)
+    ledger.evaluate([build_opt_in(params, public_key, app_id)])
+    return public_key
+
+
+def key_values(state):
+    # state as the key-value list algod returns
+    return [{'key': base64.b64encode(key).decode(),
+             'value': {'type': 1, 'bytes': base64.b64encode(value).decode()} if isinstance(value, bytes)
+             else {'type': 2, 'uint': value}} for key, value in state.items()]
+
+
+def locks_of(ledger, public_key, app_id):
+    return decode_locks(key_values(ledger.account(public_key).local_states[app_id]))
+
+
+def totals_of(ledger, app_id):
+    return decode_locked_totals(key_values(ledger.apps[app_id].global_state))
+
+
+def lock_ids(results):
+    return [lock_id_from_logs([base64.b64encode(log).decode() for log in result.logs])
+            for result in results[1::2]]
+
+
+class TestMultiLock:
+    def test_many_locks_in_one_group(self, ledger, params, creator, vault):
+        app_id, asset_id = vault
+        receivers = [receiver(ledger, params, app_id, asset_id) for _ in range(3)]
+        locks = [(receivers[index % 3], asset_id, 100 + index, UNLOCK_TIME + index)
+                 for index in range(LOCKS_PER_GROUP)]
+        groups = build_lock_groups(params, creator, app_id, locks)
+        assert len(groups) == 1 and len(groups[0]) == 16
+        assert lock_ids(ledger.evaluate(groups[0])) == list(range(1, LOCKS_PER_GROUP + 1))
+        assert ledger.asset_balance(get_application_address(app_id), asset_id) == sum(lock[2] for lock in locks)
+        assert ledger.apps[app_id].global_state[b'next_lock_id'] == LOCKS_PER_GROUP + 1
+        assert totals_of(ledger, app_id) == {asset_id: sum(lock[2] for lock in locks)}
+        assert locks_of(ledger, receivers[1], app_id) == {
+            2: {'asset_id': asset_id, 'amount': 101, 'unlock_time': UNLOCK_TIME + 1},
+            5: {'asset_id': asset_id, 'amount': 104, 'unlock_time': UNLOCK_TIME + 4},
+            8: {'asset_id': asset_id, 'amount': 107, 'unlock_time': UNLOCK_TIME + 7}}
+
+    def test_unlock_after_unlock_time(self, ledger, params, creator, vault):
+        app_id, asset_id = vault
+        holder = receiver(ledger, params, app_id, asset_id)
+        ledger.evaluate(build_lock_groups(params, creator, app_id, [(holder, asset_id, 10, UNLOCK_TIME),
+                                                                    (holder, asset_id, 20, UNLOCK_TIME * 2)])[0])
+        with pytest.raises(LogicError, match='assert failed'):
+            ledger.evaluate([build_unlock(params, holder, app_id, asset_id, 1)])
+        ledger.latest_timestamp = UNLOCK_TIME
+        results = ledger.evaluate([build_unlock(params, holder, app_id, asset_id, 1)])
+        assert len(results[0].inner_txns) == 1
+        assert ledger.asset_balance(holder, asset_id) == 10
+        assert set(locks_of(ledger, holder, app_id)) == {2}
+        assert totals_of(ledger, app_id) == {asset_id: 20}
+        # a lock is released once
+        with pytest.raises(LogicError):
+            ledger.evaluate([build_unlock(params, holder, app_id, asset_id, 1)])
+
+    def test_close_out_needs_every_lock_released(self, ledger, params, creator, vault):
+        app_id, asset_id = vault
+        holder = receiver(ledger, params, app_id, asset_id)
+        ledger.evaluate(build_lock_groups(params, creator, app_id, [(holder, asset_id, 10, UNLOCK_TIME)])[0])
+        with pytest.raises(LogicError, match='assert failed'):
+            ledger.evaluate([build_close_out(params, holder, app_id)])
+        ledger.latest_timestamp = UNLOCK_TIME
+        ledger.evaluate([build_unlock(params, holder, app_id, asset_id, 1)])
+        ledger.evaluate([build_close_out(params, holder, app_id)])
+        assert ledger.local_state(holder, app_id) is None
+
+    def test_only_receiver_unlocks(self, ledger, params, creator, vault):
+        app_id, asset_id = vault
+        holder = receiver(ledger, params, app_id, asset_id)
+        other = receiver(ledger, params, app_id, asset_id)
+        ledger.evaluate(build_lock_groups(params, creator, app_id, [(holder, asset_id, 10, UNLOCK_TIME)])[0])
+        ledger.latest_timestamp = UNLOCK_TIME
+        with pytest.raises(LogicError):
+            ledger.evaluate([build_unlock(params, other, app_id, asset_id, 1)])
+
+    def test_only_creator_locks(self, ledger, params, creator, vault):
+        app_id, asset_id = vault
+        holder = receiver(ledger, params, app_id, asset_id)
+        other = receiver(ledger, params, app_id, asset_id)
+        ledger.evaluate([transaction.AssetTransferTxn(creator, params, other, 10, asset_id)])
+        with pytest.raises(LogicError, match='assert failed'):
+            ledger.evaluate(build_lock_groups(params, other, app_id, [(holder, asset_id, 10, UNLOCK_TIME)])[0])
+
+    def test_lock_needs_deposit(self, ledger, params, creator, vault):
+        app_id, asset_id = vault
+        holder = receiver(ledger, params, app_id, asset_id)
+        lock_call = build_lock_groups(params, creator, app_id, [(holder, asset_id, 10, UNLOCK_TIME)])[0][1]
+        lock_call.group = None
+        with pytest.raises(LogicError, match='assert failed'):
+            ledger.evaluate([lock_call])
+
+    def test_receiver_lock_limit(self, ledger, params, creator, vault):
+        app_id, asset_id = vault
+        holder = receiver(ledger, params, app_id, asset_id)
+        locks = [(holder, asset_id, 1, UNLOCK_TIME)] * program.MAX_LOCKS_PER_ACCOUNT
+        for group in build_lock_groups(params, creator, app_id, locks):
+            ledger.evaluate(group)
+        assert len(locks_of(ledger, holder, app_id)) == program.MAX_LOCKS_PER_ACCOUNT
+        with pytest.raises(LogicError, match='exceeds schema'):
+            ledger.evaluate(build_lock_groups(params, creator, app_id, [(holder, asset_id, 1, UNLOCK_TIME)])[0])
+
+    def test_released_slot_is_reused(self, ledger, params, creator, vault):
+        app_id, asset_id = vault
+        holder = receiver(ledger, params, app_id, asset_id)
+        ledger.evaluate(build_lock_groups(params, creator, app_id, [(holder, asset_id, 10, UNLOCK_TIME)] * 2)[0])
+        ledger.latest_timestamp = UNLOCK_TIME
+        ledger.evaluate([build_unlock(params, holder, app_id, asset_id, 1)])
+        ledger.evaluate(build_lock_groups(params, creator, app_id, [(holder, asset_id, 30, UNLOCK_TIME)])[0])
+        assert locks_of(ledger, holder, app_id) == {
+            2: {'asset_id': asset_id, 'amount': 10, 'unlock_time': UNLOCK_TIME},
+            3: {'asset_id': asset_id, 'amount': 30, 'unlock_time': UNLOCK_TIME}}
+        assert len(ledger.account(holder).local_states[app_id]) == 3
+
+    def test_cleared_locks_can_be_swept(self, ledger, params, creator, vault):
+        app_id, asset_id = vault
+        holder = receiver(ledger, params, app_id, asset_id)
+        other = receiver(ledger, params, app_id, asset_id)
+        ledger.evaluate(build_lock_groups(params, creator, app_id, [(holder, asset_id, 10, UNLOCK_TIME),
+                                                                    (holder, asset_id, 20, UNLOCK_TIME),
+                                                                    (other, asset_id, 40, UNLOCK_TIME)])[0])
+        # nothing to sweep while every asset is locked
+        with pytest.raises(LogicError, match='assert failed'):
+            ledger.evaluate([build_sweep(params, creator, app_id, asset_id)])
+        ledger.evaluate([transaction.ApplicationClearStateTxn(holder, params, app_id)])
+        assert ledger.local_state(holder, app_id) is None
+        assert totals_of(ledger, app_id) == {asset_id: 40}
+        # only the creator sweeps
+        with pytest.raises(LogicError, match='assert failed'):
+            ledger.evaluate([build_sweep(params, other, app_id, asset_id)])
+        creator_balance = ledger.asset_balance(creator, asset_id)
+        ledger.evaluate([build_sweep(params, creator, app_id, asset_id)])
+        assert ledger.asset_balance(creator, asset_id) == creator_balance + 30
+        assert ledger.asset_balance(get_application_address(app_id), asset_id) == 40
+        # the other receiver's lock is untouched
+        ledger.latest_timestamp = UNLOCK_TIME
+        ledger.evaluate([build_unlock(params, other, app_id, asset_id, 3)])
+        assert ledger.asset_balance(other, asset_id) == 40
+        assert totals_of(ledger, app_id) == {asset_id: 0}
+
+    def test_asset_added_once(self, ledger, params, creator, vault):
+        app_id, asset_id = vault
+        with pytest.raises(LogicError, match='assert failed'):
+            ledger.evaluate(build_add_assets(params, creator, app_id, [asset_id]))
+
+    def test_delete_is_rejected(self, ledger, params, creator, vault):
+        app_id, _ = vault
+        with pytest.raises(LogicError):
+            ledger.evaluate([transaction.ApplicationDeleteTxn(creator, params, app_id)])
@@ -0,0 +1,73 @@
+import base64
+import io
+import json
+
+import pytest
+from algosdk import account, encoding
+from algosdk.future import transaction
+from contracts.timed_asset_lock_contract import transaction_builder
+from contracts.timed_asset_lock_contract.transaction_builder import build_transaction, stream_batch
+from .testing_utils import FakeAlgodClient
+
+ASSET_ID = 44887300
+APP_ID = 1234
+
+
+@pytest.fixture
+def addresses():
+    return [account.generate_account()[1] for _ in range(2)]
+
+
+@pytest.fixture
+def programs(monkeypatch):
+    programs = {'approval_program': b'\x05\x81\x01', 'clear_program': b'\x05\x81\x01',
+                'global_schema': transaction.StateSchema(3, 3), 'local_schema': transaction.StateSchema(0, 0)}
+    loads = []
+    monkeypatch.setattr(transaction_builder, 'load_programs', lambda client: loads.append(client) or programs)
+    return loads
+
+
+def specs(sender, escrow):
+    return [
+        {'op': 'create', 'sender': sender, 'asset_id': ASSET_ID, 'receiver': escrow, 'end_time': 1636903860},
+        {'op': 'pay', 'sender': sender, 'escrow': escrow},
+        {'op': 'opt_in', 'sender': sender, 'app_id': APP_ID, 'asset_id': ASSET_ID},
+        {'op': 'setup', 'sender': sender, 'app_id': APP_ID, 'asset_id': ASSET_ID},
+        {'op': 'pay_asset', 'sender': sender, 'escrow': escrow, 'asset_id': ASSET_ID, 'amount': 100},
+        {'op': 'delete', 'sender': sender, 'app_id': APP_ID, 'asset_id': ASSET_ID},
+    ]
+
+
+class TestBatch:
+    def test_streams_every_op(self, addresses, programs):
+        client = FakeAlgodClient()
+        lines = (json.dumps(spec) for spec in specs(*addresses) * 3)
+        out = io.StringIO()
+        assert stream_batch(client, lines, out) == (18, 0)
+        txns = [encoding.future_msgpack_decode(line) for line in out.getvalue().splitlines()]
+        on_complete = transaction.OnComplete
+        assert [(txn.type, getattr(txn, 'on_complete', None)) for txn in txns[:6]] == [
+            ('appl', on_complete.NoOpOC), ('pay', None), ('appl', on_complete.OptInOC),
+            ('appl', on_complete.NoOpOC), ('axfer', None), ('appl', on_complete.DeleteApplicationOC)]
+        assert txns[0].index == 0 and txns[3].index == APP_ID
+        assert txns[1].amt == 1300000 and txns[4].amount == 100
+        assert client.count('suggested_params') == 1
+        assert len(programs) == 1
+
+    def test_raw_output_and_bad_lines(self, addresses):
+        client = FakeAlgodClient()
+        pay = specs(*addresses)[1]
+        lines = [json.dumps(pay), '', '{not json', json.dumps({'op': 'mint', 'sender': addresses[0]}),
+                 json.dumps(dict(pay, amount=5))]
+        out = io.BytesIO()
+        errors = io.StringIO()
+        assert stream_batch(client, lines, out, raw=True, errors=errors) == (2, 2)
+        assert errors.getvalue().startswith('line 3:')
+        params = client.suggested_params()
+        expected = [transaction.PaymentTxn(addresses[0], params, addresses[1], 1300000),
+                    transaction.PaymentTxn(addresses[0], params, addresses[1], 5)]
+        assert out.getvalue() == b''.join(base64.b64decode(encoding.msgpack_encode(txn)) for txn in expected)
+
+    def test_create_needs_programs(self, addresses):
+        with pytest.raises(ValueError):
+            build_transaction(specs(*addresses)[0], FakeAlgodClient().suggested_params())